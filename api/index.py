@@ -1,10 +1,12 @@
 import os
 import sys
 import json
-import yaml
-from fastapi import FastAPI, Request, BackgroundTasks
+import time
+import asyncio
+import contextlib
+from fastapi import FastAPI, Request
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
@@ -14,15 +16,47 @@ project_root = os.path.abspath(os.path.join(current_dir, '..'))
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-# Try imports, handle missing dependencies for robust UI
-try:
-    from src.guards import janitor, ai_sync
-    MODULES_AVAILABLE = True
-except ImportError:
-    MODULES_AVAILABLE = False
-    print("Warning: internal modules not found. Running in UI-only mode.")
+from src import logs, metrics, policy, registry
+from src.jobs import JobManager
 
-app = FastAPI(title="DriftGuard API")
+def guard_module(name):
+    """
+    Imports a guard's module on first use (pages that don't need it never pay
+    for its SDKs). Returns None when its dependencies aren't installed, so the
+    UI keeps working in simulation mode.
+    """
+    try:
+        return registry.load_module(name)
+    except ImportError as e:
+        print(f"Warning: guard '{name}' unavailable ({e}). Running in UI-only mode.")
+        return None
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    # uvicorn re-raises SIGTERM after a graceful shutdown, so atexit hooks don't run
+    logs.get_log().flush()
+
+app = FastAPI(title="DriftGuard API", lifespan=lifespan)
+
+if metrics.ENABLED:
+    # Only registered when metrics are on, so a disabled deployment pays nothing per request
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        started = time.perf_counter()
+        response = await call_next(request)
+        # The route template (/api/jobs/{job_id}) keeps label cardinality bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.inc("driftguard_http_requests_total", route=route, method=request.method, status=response.status_code)
+        metrics.observe("driftguard_http_request_seconds", time.perf_counter() - started, route=route)
+        return response
+
+# Scans and cleanups run here, off the event loop; one of each kind at a time is plenty.
+job_manager = JobManager(max_workers=2)
+
+# Everything guards log or print in this process feeds /api/logs (and the /logs page)
+logs.configure(directory=os.getenv("DRIFTGUARD_LOG_DIR") or os.path.join(project_root, ".driftguard", "logs"))
+logs.capture_stdout()
 
 # Setup templates
 templates = Jinja2Templates(directory=os.path.join(current_dir, "templates"))
@@ -76,38 +110,335 @@ class PolicyUpdate(BaseModel):
     content: str
     filename: str = "policy.yaml"
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (enable with DRIFTGUARD_METRICS=1)."""
+    if not metrics.ENABLED:
+        return JSONResponse(status_code=404, content={"detail": "Metrics are disabled; set DRIFTGUARD_METRICS=1."})
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/policy")
+async def get_policy():
+    """The compiled policy (stages per section and the event -> stages index)."""
+    try:
+        return policy.cached_policy(os.path.join(project_root, "policy.yaml")).summary()
+    except policy.PolicyError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e), "errors": e.errors})
+
 @app.post("/api/policy/save")
 async def save_policy(update: PolicyUpdate):
+    if os.path.basename(update.filename) != update.filename or not update.filename.endswith(('.yaml', '.yml')):
+        return JSONResponse(status_code=400, content={"detail": "filename must be a .yaml file in the project root"})
     try:
-        policy_path = os.path.join(project_root, update.filename)
-        # Validate YAML if possible
-        yaml.safe_load(update.content)
-        with open(policy_path, "w") as f:
-            f.write(update.content)
-        return {"status": "success", "message": "Policy saved."}
+        # Validates against the full schema before atomically replacing the file
+        compiled = policy.save_policy(os.path.join(project_root, update.filename), update.content)
+        return {"status": "success", "message": "Policy saved.", "digest": compiled.digest}
+    except policy.PolicyError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e), "errors": e.errors})
     except Exception as e:
         return JSONResponse(status_code=400, content={"detail": str(e)})
 
+def _start_janitor_job(janitor, kind, dry_run):
+    """Queues a janitor sweep on the job pool; a matching running sweep is reused."""
+    def work(job):
+        config = janitor.load_janitor_config()
+        config.setdefault('target', ['aws', 'azure', 'gcp'])
+        with logs.bind(stage='janitor_cleanup', job=job.id):
+            return janitor.scan_resources(config, dry_run=dry_run, progress=job.emit)
+
+    job, created = job_manager.submit(kind, ('janitor', dry_run), work)
+    return JSONResponse(status_code=202, content={
+        "status": "accepted",
+        "attached": not created,
+        "job": job.to_dict(include_result=False)
+    })
+
 @app.post("/api/janitor/scan")
 @app.post("/api/janitor/dry_run")
-async def janitor_scan(background_tasks: BackgroundTasks):
-    if not MODULES_AVAILABLE:
+async def janitor_scan():
+    janitor = guard_module('janitor_cleanup')
+    if janitor is None:
         return {"status": "mock", "message": "Scanning... (Mode: Simulation)"}
-    
-    # In a real scenario, this would trigger the scan logic
-    # For now, we mock the success response expected by the UI for immediate feedback
+    # Scans report what would be reaped; /api/janitor/cleanup deletes.
+    return _start_janitor_job(janitor, "janitor_scan", dry_run=True)
+
+
+@app.post("/api/janitor/cleanup")
+async def janitor_cleanup():
+    janitor = guard_module('janitor_cleanup')
+    if janitor is None:
+        return {"status": "mock", "message": "Cleanup job queued. (Mode: Simulation)"}
+    return _start_janitor_job(janitor, "janitor_cleanup", dry_run=False)
+
+
+@app.get("/api/jobs")
+async def list_jobs():
+    return {"status": "success", "data": [job.to_dict(include_result=False) for job in job_manager.list()]}
+
+
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"detail": "Unknown job."})
+    return {"status": "success", "data": job.to_dict()}
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request, after: int = 0):
+    """Server-Sent Events stream of a job's progress. Resumes after `after` or Last-Event-ID."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"detail": "Unknown job."})
+    last_seq = int(request.headers.get("last-event-id", after) or 0)
+
+    async def stream():
+        nonlocal last_seq
+        while True:
+            for event in job.events_after(last_seq):
+                last_seq = event["seq"]
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+            if job.done and not job.events_after(last_seq):
+                return
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/api/janitor/inventory")
+async def janitor_inventory():
+    janitor = guard_module('janitor_cleanup')
+    if janitor is None:
+        return {"status": "mock", "data": {"resources": [], "tagged": 0}}
+
+    from src.guards import inventory
+    rows = []
+    for path in inventory.configured_paths(janitor.load_janitor_config()):
+        if not os.path.isabs(path):
+            path = os.path.join(project_root, path)
+        rows.extend(inventory.read_inventory(path))
+
     return {
-        "status": "success", 
+        "status": "success",
         "data": {
-            "resources_scanned": 12405, 
-            "expired": 142
+            "resources": rows,
+            "tagged": sum(1 for row in rows if row["expiry"])
         }
     }
 
 
-@app.post("/api/janitor/cleanup")
-async def janitor_cleanup():
-    # Trigger cleanup
-    return {"status": "success", "message": "Cleanup job queued."}
+@app.get("/api/janitor/report")
+async def janitor_report():
+    janitor = guard_module('janitor_cleanup')
+    if janitor is None:
+        return {"status": "mock", "data": None}
+
+    report_path = janitor.load_janitor_config().get('report_path', janitor.DEFAULT_REPORT_PATH)
+    if not os.path.isabs(report_path):
+        report_path = os.path.join(project_root, report_path)
+    report = janitor.read_report(report_path)
+    if report is None:
+        return {"status": "idle", "data": None}
+    return {"status": "success", "data": report}
+
+
+@app.get("/api/janitor/schedule")
+async def janitor_schedule():
+    janitor = guard_module('janitor_cleanup')
+    if janitor is None:
+        return {"status": "mock", "data": None}
+
+    from src.guards import scheduler
+    state_path = (janitor.load_janitor_config().get('scheduler') or {}).get('state_path')
+    if state_path and not os.path.isabs(state_path):
+        state_path = os.path.join(project_root, state_path)
+    state = scheduler.read_state(state_path)
+    if state is None:
+        return {"status": "idle", "data": None}
+    return {"status": "success", "data": state}
+
+
+_finops_cache = None
+
+@app.get("/api/finops")
+async def finops_summary():
+    global _finops_cache
+    janitor = guard_module('janitor_cleanup')
+    if janitor is None:
+        return {"status": "mock", "data": None}
+
+    from src import finops
+    from src.guards import inventory
+    config = janitor.load_janitor_config()
+    paths = [
+        path if os.path.isabs(path) else os.path.join(project_root, path)
+        for path in inventory.configured_paths(config)
+    ]
+    prices = (config.get('finops') or {}).get('prices')
+    # Rebuilt only when the inventory files or the price table move; otherwise get() is a few stat calls
+    if _finops_cache is None or _finops_cache.paths != paths or _finops_cache.prices != finops.price_table(prices):
+        _finops_cache = finops.FinOpsCache(paths, prices)
+    summary = await asyncio.to_thread(_finops_cache.get)
+    return {"status": "success", "data": summary}
+
+
+# --- GitHub Webhooks ---
+# Runs the engine in this (warm) process on pull_request deliveries, instead of
+# an Actions runner cold-starting for every push.
+
+POLICY_FILE = os.path.join(project_root, "policy.yaml")
+_webhook_workers = None
+
+def _run_webhook_event(event):
+    from src import engine, github_client, webhooks
+    context = engine.build_context(repo_name=event.repo_name, pr_number=event.pr_number)
+    with logs.bind(repo=event.repo_name, pr=event.pr_number, delivery=event.delivery_id):
+        print(f"🔧 DriftGuard webhook run [{event.repo_name}#{event.pr_number} {event.action} {event.head_sha or ''}]")
+        # The commit status stands in for the Actions job's exit code; cleanup runs gate nothing
+        gh = None
+        if event.action != 'closed':
+            if context['token']:
+                gh = github_client.get_client(context['token'])
+                webhooks.post_commit_status(gh, event, 'pending', "Running policy stages...")
+            else:
+                print("⚠️ GITHUB_TOKEN not set; the result won't be reported to GitHub.")
+        try:
+            results = engine.run_event(policy.cached_policy(POLICY_FILE), event.action, context)
+        except Exception as e:
+            if gh:
+                webhooks.post_commit_status(gh, event, 'error', f"DriftGuard crashed: {e}")
+            raise
+        if gh:
+            webhooks.post_commit_status(gh, event, *webhooks.status_for(results, engine.blocked(results)))
+        return results
+
+def _warm_guards():
+    """Imports every enabled guard up front so the first delivery doesn't pay for SDK imports."""
+    compiled = policy.cached_policy(POLICY_FILE)
+    for section in policy.SECTIONS:
+        for stage in compiled.section(section):
+            guard = registry.get(stage.name)
+            if stage.enabled and guard is not None and not guard.missing():
+                guard.load()
+
+def webhook_workers():
+    global _webhook_workers
+    if _webhook_workers is None:
+        from src.webhooks import WebhookWorkers
+        _webhook_workers = WebhookWorkers(
+            _run_webhook_event,
+            workers=int(os.getenv("DRIFTGUARD_WEBHOOK_WORKERS", "2")),
+            warmup=_warm_guards
+        ).start()
+    return _webhook_workers
+
+@app.post("/api/webhooks/github")
+async def github_webhook(request: Request):
+    from src.webhooks import SIGNATURE_HEADER, WebhookEvent, verify_signature
+
+    secret = os.getenv("GITHUB_WEBHOOK_SECRET")
+    if not secret:
+        return JSONResponse(status_code=503, content={"detail": "Webhook receiver disabled: GITHUB_WEBHOOK_SECRET is not set."})
+    body = await request.body()
+    if not verify_signature(secret, body, request.headers.get(SIGNATURE_HEADER)):
+        return JSONResponse(status_code=401, content={"detail": "Invalid signature."})
+
+    event_name = request.headers.get("X-GitHub-Event", "")
+    if event_name == "ping":
+        return {"status": "pong"}
+    if event_name != "pull_request":
+        return {"status": "ignored", "reason": f"event '{event_name}' is not handled"}
+
+    payload = json.loads(body)
+    action = payload.get("action")
+    try:
+        compiled = policy.cached_policy(POLICY_FILE)
+    except policy.PolicyError as e:
+        return JSONResponse(status_code=500, content={"detail": str(e), "errors": e.errors})
+    if not compiled.stages_for(action):
+        return {"status": "ignored", "reason": f"no stages trigger on '{action}'"}
+
+    pull = payload.get("pull_request") or {}
+    event = WebhookEvent(
+        delivery_id=request.headers.get("X-GitHub-Delivery") or f"{payload['repository']['full_name']}#{pull.get('number')}@{pull.get('head', {}).get('sha')}:{action}",
+        action=action,
+        repo_name=payload["repository"]["full_name"],
+        pr_number=pull.get("number") or payload.get("number"),
+        head_sha=pull.get("head", {}).get("sha")
+    )
+    outcome = webhook_workers().submit(event)
+    return JSONResponse(status_code=202, content={"status": outcome, "delivery_id": event.delivery_id})
+
+@app.get("/api/webhooks")
+async def webhook_status():
+    if _webhook_workers is None:
+        return {"status": "idle", "data": None}
+    from src import engine
+    data = _webhook_workers.snapshot()
+    data['abandoned_stages'] = engine.abandoned_stages()
+    return {"status": "success", "data": data}
+
+
+# --- Logs ---
+# Structured events from the engine and guards (src/logs.py): a bounded ring in
+# memory plus gzipped segments on disk, addressed by a monotonically increasing
+# offset that clients use as their resume cursor.
+
+LOG_TAIL = 200
+
+def _log_filters(stage, level, provider):
+    def values(param):
+        return set(filter(None, (param or '').split(','))) or None
+    return {"stages": values(stage), "levels": values(level), "providers": values(provider)}
+
+@app.get("/api/logs")
+async def read_logs(after: int = 0, stage: str = None, level: str = None, provider: str = None, limit: int = logs.READ_LIMIT):
+    """One page of events after `after`; comma-separated filters. Pass `cursor` back as `after` for the next page."""
+    log = logs.get_log()
+    # Pages older than the ring come from disk
+    page = await asyncio.to_thread(log.read, after, limit=max(1, min(limit, 5000)), **_log_filters(stage, level, provider))
+    return {"status": "success", "data": {**page, "stats": log.stats()}}
+
+@app.get("/api/logs/stats")
+async def log_stats():
+    """Buffered event counts per level and stage (for the /logs sidebar)."""
+    return {"status": "success", "data": logs.get_log().stats()}
+
+@app.get("/api/logs/stream")
+async def stream_logs(request: Request, after: int = None, stage: str = None, level: str = None, provider: str = None):
+    """
+    Server-Sent Events stream of log events matching the filters. Resumes after
+    `after` or Last-Event-ID; a new client starts with the last LOG_TAIL events.
+    """
+    log = logs.get_log()
+    filters = _log_filters(stage, level, provider)
+    resume = request.headers.get("last-event-id") or after
+    cursor = int(resume) if resume is not None else max(0, log.stats()["newest"] - LOG_TAIL)
+
+    async def stream():
+        nonlocal cursor
+        idle = 0.0
+        while True:
+            page = await asyncio.to_thread(log.read, cursor, **filters)
+            for event in page["events"]:
+                yield f"id: {event['offset']}\nevent: log\ndata: {json.dumps(event, default=str)}\n\n"
+            if page["cursor"] != cursor and not page["events"]:
+                # Filtered-out events still move the client's Last-Event-ID forward
+                yield f"id: {page['cursor']}\n\n"
+            cursor = page["cursor"]
+            if len(page["events"]) >= logs.READ_LIMIT:
+                continue  # Catching up on a burst; don't sleep between pages
+            if await request.is_disconnected():
+                return
+            idle = 0.0 if page["events"] else idle + 0.5
+            if idle >= 15:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 
 # Vercel requires 'app' to be exposed
@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# ==========================================
+# ⏱️ Benchmark: Cold-Start Import Cost
+# ==========================================
+# Imports the API app and the engine in fresh interpreters (as a serverless
+# cold start would), measures the import time with `-X importtime`, and checks
+# that no cloud/AI SDK was pulled in before a guard is actually used.
+#
+#   python benchmarks/bench_import_time.py --budget-ms 1500
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Must stay out of a cold start: guards import these on first use
+HEAVY_MODULES = ['boto3', 'botocore', 'google.genai', 'google.cloud.storage', 'azure.identity', 'azure.mgmt.resource']
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure(module, repeat):
+    """Returns (best_seconds, heavy modules loaded, top self-time imports) for importing `module`."""
+    best, loaded, top = None, [], []
+    for i in range(repeat):
+        cmd = [sys.executable]
+        if i == 0:
+            cmd += ['-X', 'importtime']
+        cmd += ['-c', PROBE.format(module=module, heavy=HEAVY_MODULES)]
+        proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, PYTHONDONTWRITEBYTECODE='1'))
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        loaded = result['loaded']
+        # The -X importtime run is slower; only time the plain runs unless there's just one
+        if i > 0 or repeat == 1:
+            best = result['seconds'] if best is None else min(best, result['seconds'])
+        if i == 0:
+            rows = []
+            for line in proc.stderr.splitlines():
+                if line.startswith('import time:') and '|' in line and 'self' not in line:
+                    self_us, cumulative_us, name = line[len('import time:'):].split('|')
+                    # Nesting is shown by two spaces per level; keep the entrypoint's direct imports
+                    depth = (len(name) - len(name.lstrip()) - 1) // 2
+                    if depth == 1:
+                        rows.append((int(cumulative_us), name.strip()))
+            top = sorted(rows, reverse=True)[:8]
+    return best, loaded, top
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold-start import cost")
+    parser.add_argument('--budget-ms', type=float, default=1500.0, help="Fail if any entrypoint imports slower than this")
+    parser.add_argument('--repeat', type=int, default=4, help="Fresh interpreters per entrypoint")
+    args = parser.parse_args()
+
+    failed = False
+    for module in ('api.index', 'src.engine'):
+        seconds, loaded, top = measure(module, args.repeat)
+        print(f"📦 import {module}: {seconds * 1000:.0f} ms (best of {max(1, args.repeat - 1)})")
+        for cumulative_us, name in top:
+            print(f"     {cumulative_us / 1000:8.1f} ms  {name}")
+        if loaded:
+            print(f"  ❌ Cold start loaded SDKs that should be lazy: {', '.join(loaded)}")
+            failed = True
+        if seconds * 1000 > args.budget_ms:
+            print(f"  ❌ Over budget ({seconds * 1000:.0f} ms > {args.budget_ms:.0f} ms)")
+            failed = True
+
+    if failed:
+        sys.exit(1)
+    print(f"✅ Within budget ({args.budget_ms:.0f} ms) with no SDKs imported at startup")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,460 @@
+import os
+import sys
+import json
+import time
+import types
+import argparse
+import resource
+import tempfile
+import datetime
+import subprocess
+import threading
+from collections import Counter
+
+# ==========================================
+# ⏱️ Benchmark: Scale Suite
+# ==========================================
+# Runs the janitor, Doc-Guard, cross-repo and FinOps paths at production scale, fully
+# offline: moto for S3 scans and the STS fan-out, the in-process fakes in fake_clouds.py for GCS,
+# Azure and million-object reaps, fake_github.py for the GitHub API, and a
+# stub LLM. Each scenario runs in its own interpreter so its peak RSS is its
+# own, and is compared against benchmarks/baseline.json:
+#
+#   python benchmarks/bench_scale.py                     # all scenarios, compare
+#   python benchmarks/bench_scale.py --scale 0.1 aws_scan_tagging cross_repo_fanout
+#   python benchmarks/bench_scale.py --update-baseline   # record new numbers
+#
+# The S3 scan scenarios need moto (`pip install moto`); it isn't a runtime
+# dependency, so it stays out of requirements.txt.
+#
+# Wall time covers the code under test only (fixtures are built first).
+# API calls are deterministic, so any increase is a regression (except in
+# scenarios that poll, which declare a `calls_tolerance`); wall time and RSS
+# get a tolerance for machine noise.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, '..'))
+BASELINE_PATH = os.path.join(HERE, 'baseline.json')
+sys.path.append(ROOT)
+sys.path.append(HERE)
+
+EXPIRED = '2000-01-01T00:00:00Z'
+ACTIVE = '2999-01-01T00:00:00Z'
+
+def scaled(n, scale):
+    return max(1, int(n * scale))
+
+def expiry_for(i):
+    """Every 10th resource is tagged; half of those have expired."""
+    if i % 10:
+        return None
+    return EXPIRED if i % 20 == 0 else ACTIVE
+
+# ==========================================
+# 🧪 Scenarios
+# ==========================================
+# Each takes the scale factor and returns {'wall_seconds', 'api_calls', 'details'},
+# plus 'calls_tolerance' when the call count depends on timing.
+
+def _moto_buckets(count):
+    """Creates `count` moto buckets (every 10th carries an expiry tag). Returns the s3 client."""
+    import boto3
+    from src.guards import janitor
+    s3 = boto3.client('s3', region_name='us-east-1')
+    for i in range(count):
+        name = f"bench-{i:06d}"
+        s3.create_bucket(Bucket=name)
+        expiry = expiry_for(i)
+        if expiry:
+            s3.put_bucket_tagging(Bucket=name, Tagging={'TagSet': [{'Key': janitor.EXPIRY_TAG, 'Value': expiry}]})
+    return s3
+
+def _count_boto_calls(*clients):
+    calls = Counter()
+    lock = threading.Lock()
+
+    def count(event_name, **kwargs):
+        with lock:
+            calls[event_name.split('.', 1)[1]] += 1
+
+    for client in clients:
+        client.meta.events.register('before-call', count)
+    return calls
+
+def _aws_scan(scale, discovery):
+    import boto3
+    from moto import mock_aws
+    from src.guards import janitor
+
+    with mock_aws():
+        count = scaled(10000, scale)
+        s3 = _moto_buckets(count)
+        tagging = boto3.client('resourcegroupstaggingapi', region_name='us-east-1')
+        calls = _count_boto_calls(s3, tagging)
+        aws = janitor.AWSJanitor({'discovery': discovery, 'max_workers': 32}, s3_client=s3, tagging_client=tagging)
+
+        started = time.perf_counter()
+        result = aws.scan_and_clean(dry_run=True)
+        wall = time.perf_counter() - started
+
+    assert result['status'] == 'ok', result
+    return {'wall_seconds': wall, 'api_calls': sum(calls.values()),
+            'details': {'buckets': count, 'expired': result['expired'], 'calls': dict(calls)}}
+
+def scenario_aws_scan_tagging(scale):
+    return _aws_scan(scale, 'tagging')
+
+def scenario_aws_scan_buckets(scale):
+    return _aws_scan(scale, 'scan')
+
+def scenario_aws_fanout(scale):
+    """
+    Scheduler reconcile + reaps, then a sweep, over 2 accounts x 2 regions through
+    moto's STS and S3. max_processes: 0 keeps shards in this process so the mocks
+    apply; roles must be assumed once per account and clients reused across runs.
+    """
+    import boto3
+    from moto import mock_aws
+    from src.guards import fanout, janitor, scheduler
+
+    accounts = {'prod': '111111111111', 'staging': '222222222222'}
+    regions = ['us-east-1', 'eu-west-1']
+    config = {
+        'discovery': 'scan', 'max_workers': 16,
+        'fanout': {'max_processes': 0, 'regions': regions, 'accounts': [
+            {'name': name, 'role_arn': f"arn:aws:iam::{account}:role/DriftGuardJanitor"} for name, account in accounts.items()
+        ]},
+    }
+
+    with mock_aws():
+        per_shard = scaled(250, scale)
+        for account in accounts.values():
+            creds = boto3.client('sts', region_name='us-east-1').assume_role(
+                RoleArn=f"arn:aws:iam::{account}:role/DriftGuardJanitor", RoleSessionName='bench-setup')['Credentials']
+            s3 = boto3.client('s3', region_name='us-east-1', aws_access_key_id=creds['AccessKeyId'],
+                              aws_secret_access_key=creds['SecretAccessKey'], aws_session_token=creds['SessionToken'])
+            for region in regions:
+                location = {} if region == 'us-east-1' else {'CreateBucketConfiguration': {'LocationConstraint': region}}
+                for i in range(per_shard):
+                    name = f"bench-{account[:3]}-{region}-{i:05d}"
+                    s3.create_bucket(Bucket=name, **location)
+                    expiry = expiry_for(i)
+                    if expiry:
+                        s3.put_bucket_tagging(Bucket=name, Tagging={'TagSet': [{'Key': janitor.EXPIRY_TAG, 'Value': expiry}]})
+
+        assume_calls = Counter()
+        boto3.DEFAULT_SESSION.events.register('before-call.sts.AssumeRole', lambda **kwargs: assume_calls.update(['AssumeRole']))
+        aws = janitor.make_janitor('aws', {'aws': config})
+        sched = scheduler.ExpiryScheduler({'aws': aws})
+
+        started = time.perf_counter()
+        sched.reconcile()
+        calls = _count_boto_calls(*fanout._CLIENTS.values())  # Built by the reconcile; every later call reuses them
+        sched.reap_due()
+        result = aws.scan_and_clean(dry_run=True)
+        wall = time.perf_counter() - started
+
+    shards = len(accounts) * len(regions)
+    expired = shards * sum(1 for i in range(per_shard) if expiry_for(i) == EXPIRED)
+    assert len(sched.reaped) == expired, sched.reaped
+    assert result['status'] == 'ok' and result['expired'] == 0 and result['scanned'] == shards * per_shard - expired, result
+    assert assume_calls['AssumeRole'] == len(accounts) and len(fanout._CLIENTS) == 2 * shards
+    return {'wall_seconds': wall, 'api_calls': sum(calls.values()) + assume_calls['AssumeRole'],
+            'details': {'shards': shards, 'buckets': shards * per_shard, 'reaped': expired,
+                        'assume_role': assume_calls['AssumeRole'], 'calls': dict(calls)}}
+
+def scenario_aws_reap_1m(scale):
+    from fake_clouds import FakeS3Objects
+    from src.guards import janitor
+
+    objects = scaled(1_000_000, scale)
+    s3 = FakeS3Objects({'bench-huge': objects})
+    aws = janitor.AWSJanitor({'discovery': 'scan', 'delete_concurrency': 8}, s3_client=s3)
+
+    started = time.perf_counter()
+    aws.reap('s3', 'bench-huge')
+    wall = time.perf_counter() - started
+
+    assert s3.deleted['bench-huge'] == objects and 'bench-huge' in s3.removed
+    return {'wall_seconds': wall, 'api_calls': sum(s3.calls.values()),
+            'details': {'objects': objects, 'calls': dict(s3.calls)}}
+
+def scenario_gcp_scan(scale):
+    from fake_clouds import FakeGCSClient
+    from src.guards import janitor
+
+    count = scaled(10000, scale)
+    buckets = {}
+    for i in range(count):
+        expiry = expiry_for(i)
+        buckets[f"bench-{i:06d}"] = ({janitor.GCP_EXPIRY_LABEL: expiry} if expiry else None, 0)
+    client = FakeGCSClient(buckets)
+    gcp = janitor.GCPJanitor({}, client=client)
+
+    started = time.perf_counter()
+    result = gcp.scan_and_clean(dry_run=True)
+    wall = time.perf_counter() - started
+
+    assert result['status'] == 'ok', result
+    return {'wall_seconds': wall, 'api_calls': sum(client.calls.values()),
+            'details': {'buckets': count, 'expired': result['expired'], 'calls': dict(client.calls)}}
+
+def scenario_gcp_reap_1m(scale):
+    from fake_clouds import FakeGCSClient
+    from src.guards import janitor
+
+    objects = scaled(1_000_000, scale)
+    client = FakeGCSClient({'bench-huge': ({janitor.GCP_EXPIRY_LABEL: EXPIRED}, objects)})
+    gcp = janitor.GCPJanitor({'delete_concurrency': 8}, client=client)
+
+    started = time.perf_counter()
+    gcp.reap('bucket', 'bench-huge')
+    wall = time.perf_counter() - started
+
+    assert client.deleted['bench-huge'] == objects and 'bench-huge' in client.removed
+    return {'wall_seconds': wall, 'api_calls': sum(client.calls.values()),
+            'details': {'objects': objects, 'calls': dict(client.calls)}}
+
+def scenario_azure_reap(scale):
+    from fake_clouds import FakeResourceClient
+    from src.guards import janitor
+
+    count = scaled(10000, scale)
+    groups = {}
+    for i in range(count):
+        expiry = expiry_for(i)
+        groups[f"bench-rg-{i:06d}"] = {janitor.EXPIRY_TAG: expiry} if expiry else {}
+    client = FakeResourceClient(groups, delete_seconds=0.5)
+    azure = janitor.AzureJanitor({'max_inflight_deletes': 50, 'poll_interval_seconds': 0.1}, resource_client=client)
+
+    started = time.perf_counter()
+    result = azure.scan_and_clean(dry_run=False)
+    wall = time.perf_counter() - started
+
+    assert result['status'] == 'ok' and result['failed'] == 0, result
+    return {'wall_seconds': wall, 'api_calls': sum(client.calls.values()),
+            'details': {'groups': count, 'deleted': result['deleted'], 'calls': dict(client.calls)}}
+
+class StubLLM:
+    """Stands in for google.genai: answers PASS after `latency` seconds and counts calls."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.models = self
+
+    def Client(self, api_key=None):
+        return self
+
+    def generate_content(self, model, contents):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return types.SimpleNamespace(text='{"status": "PASS", "reason": "stub", "suggested_doc_edit": ""}')
+
+def scenario_ai_sync_large_diff(scale):
+    from fake_github import FakeGitHub
+    from bench_static_drift import synthetic_diff
+    from src.guards import ai_sync
+
+    server = FakeGitHub().start()
+    os.environ['GITHUB_API_URL'] = server.url
+    diff = synthetic_diff(scaled(4 * 1024 * 1024, scale))
+    with open(os.path.join(ROOT, 'README.md'), encoding='utf-8') as f:
+        server.add_content('bench/app', 'README.md', f.read())
+    server.add_pull('bench/app', 1, 'head0001', diff)
+    llm = StubLLM(latency=0.02)
+    ai_sync.genai = llm
+
+    context = {'token': 'bench', 'repo_name': 'bench/app', 'pr_number': '1', 'gemini_key': 'bench'}
+    config = {'readme_path': 'README.md', 'max_concurrency': 4, 'static_first_pass': True}
+    started = time.perf_counter()
+    ai_sync.run(context, config)
+    wall = time.perf_counter() - started
+    server.stop()
+
+    return {'wall_seconds': wall, 'api_calls': server.requests + llm.calls,
+            'details': {'diff_mb': round(len(diff) / 1024 / 1024, 2), 'github_requests': server.requests, 'llm_calls': llm.calls}}
+
+def scenario_cross_repo_fanout(scale):
+    from fake_github import FakeGitHub
+    from src.guards import cross_repo
+
+    server = FakeGitHub(latency=0.02).start()
+    os.environ['GITHUB_API_URL'] = server.url
+    targets = [f"bench/consumer-{i:03d}" for i in range(scaled(200, scale))]
+    for repo in targets:
+        server.run_seconds[repo] = 2.0
+
+    context = {'token': 'bench', 'repo_name': 'bench/app', 'pr_number': '1'}
+    config = {'downstream_repos': targets, 'wait_for_status': True, 'max_parallel': 16,
+              'timeout_seconds': 120, 'poll_interval_seconds': 1, 'max_poll_interval_seconds': 5}
+    started = time.perf_counter()
+    results = cross_repo.run(context, config)
+    wall = time.perf_counter() - started
+    server.stop()
+
+    assert all(r['status'] == 'success' for r in results.values())
+    # Polling rounds depend on how fast dispatches land, so allow one extra round
+    return {'wall_seconds': wall, 'api_calls': server.requests, 'calls_tolerance': 0.5,
+            'details': {'consumers': len(targets), 'dispatches': len(server.dispatches)}}
+
+def scenario_finops_1m(scale):
+    """Prices a million-row inventory (mixed providers, a seventh reaped) from disk."""
+    import sqlite3
+    from src import finops
+    from src.guards import inventory
+
+    count = scaled(1_000_000, scale)
+    now = time.time()
+    kinds = [('aws', 's3', None), ('aws', 'ec2:instance', 'm5.large'), ('gcp', 'bucket', 'NEARLINE'), ('azure', 'resourcegroup', None)]
+    path = os.path.join(tempfile.mkdtemp(), 'inventory.db')
+    inventory.Inventory(path, 'aws').conn.close()  # Creates the current schema
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO resources (provider, resource_type, resource_id, size_class, team, repo, pr, size_bytes, "
+            "created_at, last_seen, checked_at, expiry_at, reaped_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (*kinds[i % 4][:2], f"r-{i:07d}", kinds[i % 4][2], f"team-{i % 40}", f"bench/repo-{i % 50}",
+                 str(i % 5000) if i % 3 else None, float(i % 997) * 1e8 if i % 2 else None,
+                 now - (i % 90) * 86400, now, now, now - (i % 30 - 10) * 86400 if i % 10 == 0 else None,
+                 now - (i % 11) * 86400 if i % 7 == 0 else None)
+                for i in range(count)
+            )
+        )
+    conn.close()
+
+    started = time.perf_counter()
+    summary = finops.compute(finops.load_records([path]), finops.price_table(), now=now)
+    wall = time.perf_counter() - started
+
+    assert summary['records'] == count and summary['reaped'] == (count + 6) // 7
+    return {'wall_seconds': wall, 'api_calls': 0,
+            'details': {'records': count, 'teams': len(summary['by_team']), 'expired_live': summary['expired_live']}}
+
+SCENARIOS = {
+    name[len('scenario_'):]: fn for name, fn in list(globals().items()) if name.startswith('scenario_')
+}
+
+# ==========================================
+# 📊 Runner & Baseline Comparison
+# ==========================================
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+def run_in_child(name, scale, verbose):
+    """Runs one scenario in a fresh interpreter. Returns its metrics, or {'error'} if it crashed."""
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as out:
+        out_path = out.name
+    try:
+        proc = subprocess.run(
+            [sys.executable, __file__, '--child', name, '--scale', str(scale), '--out', out_path],
+            cwd=ROOT,
+            stdout=None if verbose else subprocess.DEVNULL,
+            stderr=None if verbose else subprocess.PIPE,
+            text=True
+        )
+        if proc.returncode != 0:
+            return {'error': (proc.stderr or '').strip().splitlines()[-1:] or [f"exit {proc.returncode}"]}
+        with open(out_path) as f:
+            return json.load(f)
+    finally:
+        os.remove(out_path)
+
+def child(name, scale, out_path):
+    metrics = SCENARIOS[name](scale)
+    metrics['wall_seconds'] = round(metrics['wall_seconds'], 3)
+    metrics['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    with open(out_path, 'w') as f:
+        json.dump(metrics, f)
+
+def compare(name, metrics, baseline, time_tolerance, rss_tolerance):
+    """Returns a list of regressions of `metrics` against the baseline entry."""
+    base = baseline.get(name)
+    if not base:
+        return []
+    regressions = []
+    if metrics['api_calls'] > base['api_calls'] * (1 + base.get('calls_tolerance', 0)):
+        regressions.append(f"API calls {base['api_calls']} -> {metrics['api_calls']}")
+    if metrics['wall_seconds'] > base['wall_seconds'] * (1 + time_tolerance):
+        regressions.append(f"wall time {base['wall_seconds']}s -> {metrics['wall_seconds']}s")
+    if metrics['peak_rss_mb'] > base['peak_rss_mb'] * (1 + rss_tolerance):
+        regressions.append(f"peak RSS {base['peak_rss_mb']} MB -> {metrics['peak_rss_mb']} MB")
+    return regressions
+
+def load_baseline(path, scale):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        data = json.load(f)
+    if data.get('scale') != scale:
+        print(f"ℹ️  Baseline was recorded at scale {data.get('scale')}, not {scale}; not comparing.")
+        return {}
+    return data.get('scenarios', {})
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scale benchmarks against local fakes")
+    parser.add_argument('scenarios', nargs='*', help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiplies every fixture size (0.1 for a quick run)")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON to compare against / update")
+    parser.add_argument('--update-baseline', action='store_true', help="Write this run's numbers as the new baseline")
+    parser.add_argument('--time-tolerance', type=float, default=0.5, help="Allowed wall-time growth (0.5 = +50%%)")
+    parser.add_argument('--rss-tolerance', type=float, default=0.25, help="Allowed peak RSS growth")
+    parser.add_argument('--verbose', action='store_true', help="Show the scenarios' own output")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.child, args.scale, args.out)
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    baseline = {} if args.update_baseline else load_baseline(args.baseline, args.scale)
+
+    print(f"🏁 Running {len(names)} scenario(s) at scale {args.scale}")
+    print(f"\n{'Scenario':<22} {'Wall':>9} {'API calls':>10} {'Peak RSS':>10}  Result")
+    results, failed = {}, False
+    for name in names:
+        metrics = run_in_child(name, args.scale, args.verbose)
+        if 'error' in metrics:
+            failed = True
+            print(f"{name:<22} {'-':>9} {'-':>10} {'-':>10}  ❌ crashed: {' '.join(metrics['error'])}")
+            continue
+        results[name] = metrics
+        regressions = compare(name, metrics, baseline, args.time_tolerance, args.rss_tolerance)
+        failed = failed or bool(regressions)
+        if regressions:
+            verdict = "❌ " + "; ".join(regressions)
+        else:
+            verdict = "✅" if name in baseline else "• no baseline"
+        print(f"{name:<22} {metrics['wall_seconds']:>8.2f}s {metrics['api_calls']:>10} {metrics['peak_rss_mb']:>7.1f} MB  {verdict}")
+
+    if args.update_baseline:
+        # Scenarios not run this time keep their recorded numbers
+        scenarios = load_baseline(args.baseline, args.scale)
+        scenarios.update({
+            name: {k: m[k] for k in ('wall_seconds', 'api_calls', 'calls_tolerance', 'peak_rss_mb') if k in m}
+            for name, m in results.items()
+        })
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'scale': args.scale,
+                'recorded_at': datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'python': sys.version.split()[0],
+                'scenarios': scenarios,
+            }, f, indent=2)
+            f.write('\n')
+        print(f"\n💾 Baseline written to {args.baseline}")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+# ==========================================
+# ⏱️ Benchmark: Static Drift Analyzer
+# ==========================================
+# Builds a synthetic multi-megabyte unified diff (context, removed and added
+# lines, with a sprinkling of env vars, CLI flags, routes and signature
+# changes) and times analyze_diff() over it.
+#
+#   python benchmarks/bench_static_drift.py --size-mb 5 --budget-seconds 1.0
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.guards import static_drift
+
+README = open(os.path.join(os.path.dirname(__file__), '..', 'README.md'), encoding='utf-8').read()
+
+INTERESTING = [
+    "+    url = os.environ.get('SERVICE_URL_{n}')",
+    "+    parser.add_argument('--option-{n}', type=int)",
+    "+@app.get(\"/api/resource_{n}/{{item_id}}\")",
+    "-def handler_{n}(request):",
+    "+def handler_{n}(request, timeout=30):",
+]
+FILLER = [
+    " context line that did not change = compute(value, other_value)",
+    "+    total += sum(item.price * item.quantity for item in basket.items)",
+    "-    total = 0",
+    "+    logger.debug('processing %s of %s', index, len(rows))",
+    "+    if result is None: raise ValueError('missing result')",
+]
+
+def synthetic_diff(size_bytes, interesting_ratio=0.01, seed=7):
+    rng = random.Random(seed)
+    lines, size, n = [], 0, 0
+    while size < size_bytes:
+        header = [f"diff --git a/pkg/module_{n}.py b/pkg/module_{n}.py", f"--- a/pkg/module_{n}.py", f"+++ b/pkg/module_{n}.py"]
+        lines.extend(header)
+        for _ in range(rng.randint(1, 6)):
+            lines.append(f"@@ -{rng.randint(1, 500)},20 +{rng.randint(1, 500)},24 @@")
+            for _ in range(rng.randint(10, 60)):
+                template = rng.choice(INTERESTING) if rng.random() < interesting_ratio else rng.choice(FILLER)
+                line = template.format(n=n)
+                lines.append(line)
+                size += len(line) + 1
+        n += 1
+    return '\n'.join(lines) + '\n'
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the static drift analyzer")
+    parser.add_argument('--size-mb', type=float, default=5.0, help="Synthetic diff size")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement (best is reported)")
+    parser.add_argument('--budget-seconds', type=float, default=1.0, help="Fail if the best run is slower")
+    args = parser.parse_args()
+
+    diff = synthetic_diff(int(args.size_mb * 1024 * 1024))
+    print(f"📄 Synthetic diff: {len(diff) / 1024 / 1024:.1f} MB, {diff.count(chr(10))} lines")
+
+    start = time.perf_counter()
+    tokens = static_drift.ReadmeTokens(README)
+    print(f"📚 README index: {len(tokens.tokens)} tokens, {len(tokens.routes)} routes in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        report = static_drift.analyze_diff(diff, tokens)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    mb_per_second = len(diff) / 1024 / 1024 / best
+    print(f"🔬 analyze_diff: best {best:.3f}s, median {sorted(timings)[len(timings) // 2]:.3f}s ({mb_per_second:.1f} MB/s)")
+    print(f"   {len(report['findings'])} findings, {len(report['undocumented'])} undocumented")
+
+    if best > args.budget_seconds:
+        print(f"❌ Over budget ({best:.3f}s > {args.budget_seconds}s)")
+        sys.exit(1)
+    print(f"✅ Within budget ({args.budget_seconds}s)")
+
+if __name__ == "__main__":
+    main()
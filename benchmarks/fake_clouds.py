@@ -0,0 +1,227 @@
+import time
+import threading
+from collections import Counter
+
+# ==========================================
+# 🧪 In-Process Cloud Fakes
+# ==========================================
+# Stand-ins for the slices of the S3, GCS and Azure Resource Manager clients
+# the janitors use, for benchmarks that moto can't reach at scale (a moto
+# bucket with a million objects takes longer to fill than to reap) or that
+# have no local emulator. Objects are generated lazily by index, so a fake
+# bucket of any size costs no memory until a listing page is built.
+#
+# Every fake counts its API calls in `calls` (operation -> count), the way a
+# provider would bill or throttle them.
+
+class _CallCounter:
+    def __init__(self):
+        self.calls = Counter()
+        self.lock = threading.Lock()
+
+    def count(self, operation, n=1):
+        with self.lock:
+            self.calls[operation] += n
+
+# ==========================================
+# ☁️ AWS S3 (object versions only)
+# ==========================================
+class FakeS3Objects(_CallCounter):
+    """An S3 client whose buckets each hold `objects` synthetic versions."""
+
+    def __init__(self, buckets, latency=0.0):
+        super().__init__()
+        self.sizes = dict(buckets)  # bucket -> object count
+        self.deleted = Counter()    # bucket -> versions deleted
+        self.removed = set()        # buckets deleted
+        self.latency = latency
+
+    def get_paginator(self, operation):
+        assert operation == 'list_object_versions'
+        return self
+
+    def paginate(self, Bucket, PaginationConfig=None):
+        page_size = (PaginationConfig or {}).get('PageSize', 1000)
+        for start in range(0, self.sizes[Bucket], page_size):
+            self.count('ListObjectVersions')
+            end = min(start + page_size, self.sizes[Bucket])
+            yield {'Versions': [{'Key': f"obj/{i:08d}", 'VersionId': 'null'} for i in range(start, end)]}
+
+    def delete_objects(self, Bucket, Delete):
+        self.count('DeleteObjects')
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.deleted[Bucket] += len(Delete['Objects'])
+        return {'Deleted': []}  # Quiet mode lists only errors
+
+    def delete_bucket(self, Bucket):
+        self.count('DeleteBucket')
+        self.removed.add(Bucket)
+
+# ==========================================
+# 🟧 GCP Cloud Storage
+# ==========================================
+class FakeConflict(Exception):
+    code = 409
+
+class FakeBlob:
+    __slots__ = ('bucket', 'name', 'generation')
+
+    def __init__(self, bucket, name, generation=1):
+        self.bucket = bucket
+        self.name = name
+        self.generation = generation
+
+class _Pages:
+    def __init__(self, bucket, page_size, versions):
+        self.bucket = bucket
+        self.page_size = page_size
+        # Without versions=True only the live generation of each object is listed
+        self.generations = bucket.client.generations if versions else 1
+
+    @property
+    def pages(self):
+        size = self.bucket.client.sizes.get(self.bucket.name, 0) * self.generations
+        for start in range(0, size, self.page_size):
+            self.bucket.client.count('objects.list')
+            yield [
+                FakeBlob(self.bucket, f"obj/{i // self.generations:08d}", i % self.generations + 1)
+                for i in range(start, min(start + self.page_size, size))
+            ]
+
+class FakeBucket:
+    def __init__(self, client, name, labels=None):
+        self.client = client
+        self.name = name
+        self.labels = labels
+        self.storage_class = 'STANDARD'
+        self.time_created = None
+
+    def list_blobs(self, page_size=1000, versions=False):
+        return _Pages(self, page_size, versions)
+
+    def delete_blob(self, blob_name, generation=None):
+        client = self.client
+        if not client.in_batch():
+            client.count('objects.delete')
+            if client.latency:
+                time.sleep(client.latency)
+        with client.lock:
+            client.deleted[self.name] += 1
+
+    def delete(self):
+        self.client.count('buckets.delete')
+        expected = self.client.sizes.get(self.name, 0) * self.client.generations
+        if self.client.deleted[self.name] < expected:
+            raise FakeConflict(f"409 The bucket you tried to delete is not empty: {self.name}")
+        self.client.removed.add(self.name)
+
+class _Batch:
+    def __init__(self, client):
+        self.client = client
+
+    def __enter__(self):
+        self.client.local.batch = True
+        return self
+
+    def __exit__(self, *exc):
+        self.client.local.batch = False
+        self.client.count('batch')  # One HTTP request for up to 100 deletes
+        if self.client.latency:
+            time.sleep(self.client.latency)
+        return False
+
+class FakeGCSClient(_CallCounter):
+    """A google.cloud.storage.Client over `buckets` ({name: (labels, object_count)})."""
+
+    def __init__(self, buckets, latency=0.0, page_size=1000, generations=1):
+        super().__init__()
+        self.generations = generations  # Versions kept per object (>1: a versioned bucket)
+        self.labels = {name: labels for name, (labels, _) in buckets.items()}
+        self.sizes = {name: objects for name, (_, objects) in buckets.items()}
+        self.deleted = Counter()
+        self.removed = set()
+        self.latency = latency
+        self.page_size = page_size
+        self.local = threading.local()
+
+    def in_batch(self):
+        return getattr(self.local, 'batch', False)
+
+    def list_buckets(self):
+        names = sorted(self.labels)
+        for start in range(0, len(names), self.page_size):
+            self.count('buckets.list')
+            for name in names[start:start + self.page_size]:
+                yield FakeBucket(self, name, self.labels[name])
+
+    def bucket(self, name):
+        return FakeBucket(self, name, self.labels.get(name))
+
+    def batch(self):
+        return _Batch(self)
+
+# ==========================================
+# 🔷 Azure Resource Manager
+# ==========================================
+class FakeHttpResponseError(Exception):
+    def __init__(self, status_code, message=""):
+        super().__init__(message or f"HTTP {status_code}")
+        self.status_code = status_code
+
+class _Properties:
+    def __init__(self, provisioning_state):
+        self.provisioning_state = provisioning_state
+
+class FakeResourceGroup:
+    def __init__(self, name, tags, provisioning_state='Succeeded'):
+        self.name = name
+        self.tags = tags
+        self.properties = _Properties(provisioning_state)
+
+class _ResourceGroups:
+    def __init__(self, client):
+        self.client = client
+
+    def list(self, filter=None):
+        # Supports the two filters the janitor sends: tagName eq 'k' [and tagValue eq 'v']
+        client = self.client
+        clauses = dict(
+            (part.split(' eq ')[0].strip(), part.split(' eq ')[1].strip().strip("'"))
+            for part in (filter or '').split(' and ') if ' eq ' in part
+        )
+        key, value = clauses.get('tagName'), clauses.get('tagValue')
+        names = [
+            name for name, tags in sorted(client.groups.items())
+            if name not in client.deleting and (key is None or key in tags) and (value is None or tags.get(key) == value)
+        ]
+        for start in range(0, len(names), client.page_size):
+            client.count('resourceGroups.list')
+            for name in names[start:start + client.page_size]:
+                yield FakeResourceGroup(name, dict(client.groups[name]))
+
+    def begin_delete(self, name, polling=True):
+        self.client.count('resourceGroups.delete')
+        self.client.deleting[name] = time.monotonic() + self.client.delete_seconds
+
+    def get(self, name):
+        client = self.client
+        client.count('resourceGroups.get')
+        done_at = client.deleting.get(name)
+        if done_at is not None and time.monotonic() >= done_at:
+            client.groups.pop(name, None)
+        if name not in client.groups:
+            raise FakeHttpResponseError(404, f"Resource group '{name}' could not be found.")
+        return FakeResourceGroup(name, dict(client.groups[name]), 'Deleting' if done_at else 'Succeeded')
+
+class FakeResourceClient(_CallCounter):
+    """A ResourceManagementClient over `groups` ({name: tags}); deletions finish after `delete_seconds`."""
+
+    def __init__(self, groups, delete_seconds=0.0, page_size=1000):
+        super().__init__()
+        self.groups = dict(groups)
+        self.deleting = {}  # name -> monotonic time the deletion completes
+        self.delete_seconds = delete_seconds
+        self.page_size = page_size
+        self.resource_groups = _ResourceGroups(self)
@@ -0,0 +1,207 @@
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# ==========================================
+# 🧪 Fake GitHub API Server
+# ==========================================
+# A local stand-in for the slice of the REST API the guards use, so the
+# GitHub client and guards can be exercised offline:
+#
+#   server = FakeGitHub().start()
+#   os.environ['GITHUB_API_URL'] = server.url
+#
+# Serves pulls (JSON or diff), pull files, raw contents, compare, issue
+# comments, commit statuses, dispatches and the workflow runs they start. Sends ETags, honours If-None-Match, and counts
+# requests and rate-limit usage like GitHub does (304s are free).
+
+class FakeGitHub:
+    def __init__(self, rate_limit=5000, latency=0.0):
+        self.pulls = {}       # (repo, number) -> {'pr': dict, 'diff': str, 'files': [dict]}
+        self.contents = {}    # (repo, path) -> str
+        self.compares = {}    # (repo, base, head) -> dict
+        self.comments = []    # (repo, number, body)
+        self.dispatches = []  # (repo, payload)
+        self.statuses = []    # (repo, sha, payload)
+        self.runs = {}        # repo -> [workflow run dicts], newest first
+        self.run_seconds = {}         # repo -> how long a dispatched run takes to complete
+        self.run_conclusions = {}     # repo -> conclusion of dispatched runs (default 'success')
+        self.dispatch_failures = {}   # repo -> number of 502s to send before accepting a dispatch
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.reset_at = int(time.time()) + 3600
+        self.latency = latency
+        self.requests = 0
+        self.not_modified = 0
+        self.lock = threading.Lock()
+        self.server = None
+
+    # --- Fixtures ---
+
+    def add_pull(self, repo, number, head_sha, diff, files=None, base_sha="base0000"):
+        self.pulls[(repo, number)] = {
+            'pr': {'number': number, 'head': {'sha': head_sha, 'ref': f"pr-{number}"}, 'base': {'sha': base_sha}},
+            'diff': diff,
+            'files': files or [],
+        }
+
+    def add_content(self, repo, path, text):
+        self.contents[(repo, path)] = text
+
+    def add_compare(self, repo, base, head, status, filenames):
+        self.compares[(repo, base, head)] = {'status': status, 'files': [{'filename': f} for f in filenames]}
+
+    # --- Server ---
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake._handle(self, 'GET')
+
+            def do_POST(self):
+                fake._handle(self, 'POST')
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    # --- Request handling ---
+
+    def _send(self, handler, status, body=b'', content_type='application/json', etag=None, free=False):
+        with self.lock:
+            if not free:
+                self.remaining = max(0, self.remaining - 1)
+            remaining = self.remaining
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.send_header('X-RateLimit-Limit', str(self.rate_limit))
+        handler.send_header('X-RateLimit-Remaining', str(remaining))
+        handler.send_header('X-RateLimit-Reset', str(self.reset_at))
+        if etag:
+            handler.send_header('ETag', etag)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _send_cacheable(self, handler, body, content_type):
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if handler.headers.get('If-None-Match') == etag:
+            with self.lock:
+                self.not_modified += 1
+            self._send(handler, 304, etag=etag, free=True)
+        else:
+            self._send(handler, 200, body, content_type, etag=etag)
+
+    def _handle(self, handler, method):
+        with self.lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        parsed = urlparse(handler.path)
+        parts = [p for p in parsed.path.split('/') if p]
+        query = parse_qs(parsed.query)
+        accept = handler.headers.get('Accept', '')
+        length = int(handler.headers.get('Content-Length') or 0)
+        payload = json.loads(handler.rfile.read(length) or b'{}') if length else {}
+
+        if len(parts) < 3 or parts[0] != 'repos':
+            return self._send(handler, 404, b'{"message": "Not Found"}')
+        repo, rest = f"{parts[1]}/{parts[2]}", parts[3:]
+
+        if method == 'GET' and len(rest) == 2 and rest[0] == 'pulls':
+            pull = self.pulls.get((repo, int(rest[1])))
+            if not pull:
+                return self._send(handler, 404, b'{"message": "Not Found"}')
+            if 'diff' in accept:
+                return self._send_cacheable(handler, pull['diff'].encode(), 'text/plain')
+            return self._send_cacheable(handler, json.dumps(pull['pr']).encode(), 'application/json')
+
+        if method == 'GET' and len(rest) == 3 and rest[0] == 'pulls' and rest[2] == 'files':
+            pull = self.pulls.get((repo, int(rest[1])))
+            return self._send_cacheable(handler, json.dumps(pull['files'] if pull else []).encode(), 'application/json')
+
+        if method == 'GET' and rest and rest[0] == 'contents':
+            text = self.contents.get((repo, '/'.join(rest[1:])))
+            if text is None:
+                return self._send(handler, 404, b'{"message": "Not Found"}')
+            return self._send_cacheable(handler, text.encode(), 'text/plain')
+
+        if method == 'GET' and len(rest) == 2 and rest[0] == 'compare':
+            base, _, head = rest[1].partition('...')
+            comparison = self.compares.get((repo, base, head))
+            if not comparison:
+                return self._send(handler, 404, b'{"message": "Not Found"}')
+            return self._send_cacheable(handler, json.dumps(comparison).encode(), 'application/json')
+
+        if method == 'POST' and len(rest) == 3 and rest[0] == 'issues' and rest[2] == 'comments':
+            with self.lock:
+                self.comments.append((repo, int(rest[1]), payload.get('body')))
+            return self._send(handler, 201, b'{"id": 1}')
+
+        if method == 'POST' and len(rest) == 2 and rest[0] == 'statuses':
+            with self.lock:
+                self.statuses.append((repo, rest[1], payload))
+            return self._send(handler, 201, json.dumps({'id': len(self.statuses), **payload}).encode())
+
+        if method == 'POST' and rest == ['dispatches']:
+            with self.lock:
+                failures = self.dispatch_failures.get(repo, 0)
+                if failures:
+                    self.dispatch_failures[repo] = failures - 1
+                else:
+                    self.dispatches.append((repo, payload))
+                    self._start_run(repo, payload)
+            if failures:
+                return self._send(handler, 502, b'{"message": "Bad Gateway"}')
+            return self._send(handler, 204)
+
+        if method == 'GET' and rest == ['actions', 'runs']:
+            event = (query.get('event') or [None])[0]
+            with self.lock:
+                runs = [self._run_view(run) for run in self.runs.get(repo, []) if not event or run['event'] == event]
+            return self._send(handler, 200, json.dumps({'total_count': len(runs), 'workflow_runs': runs}).encode())
+
+        return self._send(handler, 404, b'{"message": "Not Found"}')
+
+    def _start_run(self, repo, payload):
+        runs = self.runs.setdefault(repo, [])
+        run_id = len(runs) + 1
+        runs.insert(0, {
+            'id': run_id,
+            'event': 'repository_dispatch',
+            'started': time.time(),
+            'duration': self.run_seconds.get(repo, 0.0),
+            'conclusion': self.run_conclusions.get(repo, 'success'),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'html_url': f"https://github.com/{repo}/actions/runs/{run_id}",
+            'display_title': f"DriftGuard {payload.get('client_payload', {}).get('dispatch_id', '')}",
+        })
+
+    def _run_view(self, run):
+        done = time.time() >= run['started'] + run['duration']
+        view = {k: v for k, v in run.items() if k not in ('started', 'duration')}
+        view['status'] = 'completed' if done else 'in_progress'
+        view['conclusion'] = run['conclusion'] if done else None
+        return view
@@ -1,99 +1,229 @@
 import os
 import sys
-import yaml
+import time
+import queue
+import threading
 import argparse
-import importlib
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src import logs, metrics, policy, registry
 
 def load_policy(policy_path='policy.yaml'):
+    """Loads and compiles the policy; exits with every validation error listed if it's invalid."""
     if not os.path.exists(policy_path):
         policy_path = os.path.join(os.getcwd(), policy_path)
     if not os.path.exists(policy_path):
         print(f"❌ Policy file {policy_path} not found.")
         sys.exit(1)
-    with open(policy_path, 'r') as f:
-        return yaml.safe_load(f)
-
-def execute_stage(stage, context, event_type):
-    name = stage.get('name')
-    if not stage.get('enabled', False):
-        print(f"⏭️  Stage '{name}' is disabled. Skipping.")
-        return
-
-    triggers = stage.get('trigger_on', [])
-    if event_type not in triggers:
-        return
-
-    print(f"🚀 Executing Stage: {name} (Type: {stage.get('type')})")
-    
-    status = True
     try:
-        if name == 'ai_doc_check':
-            from src.guards import ai_sync
-            ai_sync.run(context, stage['config'])
-            
-        elif name == 'infrastructure_preview':
-            # In a real engine, this might trigger terraform apply
-            # For this MVP, we assume the GitHub Action step runs terraform 
-            # OR we call a python wrapper. 
-            # The prompt implies engine decides. Let's print info for the Action to use 
-            # or if we had a python terraform wrapper, call it.
-            # We will use the janitor script's 'provision' mode if it existed, 
-            # but usually terraform is run directly by GH Actions.
-            # We'll just validate config here.
-            print(f"✅ Infrastructure Policy Checked: TTL {stage['config']['ttl_hours']}h enforced.")
-
-        elif name == 'cross_repo_safety':
-            from src.guards import cross_repo
-            cross_repo.run(context, stage['config'])
-
-        elif name == 'janitor_cleanup':
-             from src.guards import janitor
-             janitor.cleanup_pr_resources(context, stage['config'])
-
-    except Exception as e:
-        print(f"❌ Stage '{name}' failed: {e}")
-        status = False
-        import traceback
-        traceback.print_exc()
-
-    if not status:
-        if stage.get('severity') == 'block':
-            print(f"⛔ Blocking Merge due to failure in '{name}'.")
-            sys.exit(1)
-        else:
-            print(f"⚠️  Warning in '{name}', but severity is not block.")
+        return policy.load_policy(policy_path)
+    except policy.PolicyError as e:
+        print(f"❌ Invalid policy {policy_path}:")
+        for error in e.errors:
+            print(f"   - {error}")
+        sys.exit(1)
 
-def main():
-    parser = argparse.ArgumentParser(description="DriftGuard Policy Engine")
-    parser.add_argument('--event', type=str, required=True, help="GitHub Event Name (pull_request, issue_comment)")
-    parser.add_argument('--action', type=str, required=True, help="Event Action (opened, synchronize, closed)")
-    args = parser.parse_args()
+# Stage threads given up on (timed out or cancelled) that are still running. Python
+# can't stop a thread, so in a long-lived process (the webhook workers) they run
+# on until their guard returns; guards should bound their own work below the stage timeout.
+_abandoned = []
+_abandoned_lock = threading.Lock()
 
-    print(f"🔧 DriftGuard Engine Initializing... [Event: {args.event}, Action: {args.action}]")
+def abandoned_stages():
+    """Names of abandoned stage threads that are still running."""
+    with _abandoned_lock:
+        _abandoned[:] = [thread for thread in _abandoned if thread.is_alive()]
+        return [thread.name for thread in _abandoned]
+
+def _abandon(thread):
+    with _abandoned_lock:
+        _abandoned.append(thread)
+
+# A `block` stage ending in one of these blocks the merge (a skipped stage never ran its check)
+FAILED_STATUSES = ('failed', 'timed_out', 'skipped')
+
+def execute_stage(stage, context):
+    """Runs one compiled stage and returns 'passed' or 'failed'."""
+    name = stage.name
+    # Everything the guard logs (or prints, in the API process) is tagged with its stage
+    with logs.bind(stage=name):
+        logs.event(f"🚀 Executing Stage: {name} (Type: {stage.type})")
+
+        guard = registry.get(name)
+        if guard is None:
+            logs.event(f"❌ Stage '{name}' has no registered guard.", level='error')
+            return 'failed'
+        started = time.perf_counter()
+        with metrics.span('stage', stage=name, type=stage.type) as span:
+            try:
+                # First use imports the guard (and its SDKs)
+                guard(context, stage.config_copy())
+                status = 'passed'
+            except Exception as e:
+                logs.event(f"❌ Stage '{name}' failed: {e}", level='error')
+                import traceback
+                traceback.print_exc()
+                status = 'failed'
+            span.set(status=status)
+        duration = time.perf_counter() - started
+        metrics.inc('driftguard_stage_runs_total', stage=name, status=status)
+        metrics.observe('driftguard_stage_seconds', duration, stage=name)
+        logs.event(f"🏁 Stage {name} {status} in {duration:.2f}s", level='info' if status == 'passed' else 'error',
+                   echo=False, outcome=status, duration=round(duration, 3))
+    return status
+
+def plan_stages(stages):
+    """
+    Returns {name: set(dependencies)} for the stages that will run. The policy
+    compiler already rejected unknown names and cycles; dependencies on stages
+    not running for this event (disabled or not triggered) are dropped.
+    """
+    names = {stage.name for stage in stages}
+    graph = {}
+    for stage in stages:
+        graph[stage.name] = {dep for dep in stage.depends_on if dep in names}
+        for dep in set(stage.depends_on) - names:
+            print(f"  ℹ️  '{stage.name}' depends on '{dep}', which isn't running for this event; ignoring.")
+    return graph
+
+def run_stages(stages, context):
+    """
+    Runs stages as a DAG: each stage starts once everything it depends on has
+    passed, independent stages run concurrently, and each is given
+    `timeout_seconds`. A stage whose dependency failed, timed out or was itself
+    skipped is skipped. When a `block` stage doesn't pass, stages not yet
+    started are cancelled and running ones are abandoned. Abandoned (and timed
+    out) stages keep running in the background; see abandoned_stages().
+    Returns {name: {'status', 'severity', 'duration'}} in policy order.
+    """
+    graph = plan_stages(stages)
+    by_name = {stage.name: stage for stage in stages}
+    results = {
+        name: {'status': 'pending', 'severity': by_name[name].severity, 'duration': None}
+        for name in graph
+    }
+    done = queue.Queue()
+    running = {}  # name -> (started_at, deadline, thread)
+    blocked = False
+
+    def worker(stage):
+        done.put((stage.name, execute_stage(stage, context)))
+
+    def finish(name, status):
+        started_at, _, thread = running.pop(name)
+        if status == 'timed_out':
+            _abandon(thread)
+        results[name]['status'] = status
+        results[name]['duration'] = time.time() - started_at
+        return status != 'passed' and results[name]['severity'] == 'block'
 
-    # Load Context
-    context = {
-        'pr_number': os.environ.get('PR_NUMBER'),
-        'repo_name': os.environ.get('GITHUB_REPOSITORY'),
+    while not blocked:
+        # Skips can make further stages ready (and skipped), so repeat until nothing changes
+        changed = True
+        while changed and not blocked:
+            changed = False
+            finished = {name for name, r in results.items() if r['status'] not in ('pending', 'running')}
+            for name, deps in graph.items():
+                if results[name]['status'] != 'pending' or not deps <= finished:
+                    continue
+                unmet = sorted(dep for dep in deps if results[dep]['status'] != 'passed')
+                if unmet:
+                    logs.event(f"⏭️ Skipping stage '{name}': {', '.join(unmet)} did not pass.",
+                               level='warn', stage=name, outcome='skipped')
+                    results[name]['status'] = 'skipped'
+                    blocked = blocked or results[name]['severity'] == 'block'
+                    changed = True
+                    continue
+                # Daemon threads: a hung stage can't keep the engine alive past its timeout
+                # propagate: new threads start with an empty context, which would drop the caller's repo/pr/job fields
+                thread = threading.Thread(target=logs.propagate(worker), args=(by_name[name],), daemon=True, name=f"stage-{name}")
+                running[name] = (time.time(), time.time() + by_name[name].timeout_seconds, thread)
+                results[name]['status'] = 'running'
+                thread.start()
+        if blocked or not running:
+            break
+
+        wait = max(0.0, min(deadline for _, deadline, _ in running.values()) - time.time())
+        try:
+            name, status = done.get(timeout=wait)
+            if name in running:
+                blocked = finish(name, status)
+        except queue.Empty:
+            for name, (_, deadline, _) in list(running.items()):
+                if time.time() >= deadline:
+                    logs.event(f"⏰ Stage '{name}' timed out after {by_name[name].timeout_seconds:.0f}s.",
+                               level='error', stage=name, outcome='timed_out')
+                    blocked = finish(name, 'timed_out') or blocked
+
+    if blocked:
+        print("⛔ A blocking stage failed; cancelling remaining stages.")
+        for name, r in results.items():
+            if r['status'] == 'running':
+                started_at, _, thread = running.pop(name)
+                _abandon(thread)
+                r['status'], r['duration'] = 'cancelled', time.time() - started_at
+            elif r['status'] == 'pending':
+                r['status'] = 'cancelled'
+    return results
+
+def print_summary(results, wall_seconds):
+    icons = {'passed': '✅', 'failed': '❌', 'timed_out': '⏰', 'skipped': '⏭️', 'cancelled': '🚫'}
+    print("\n📊 Stage Summary")
+    width = max([len(name) for name in results] + [5])
+    for name, r in results.items():
+        duration = f"{r['duration']:.1f}s" if r['duration'] is not None else '-'
+        print(f"  {icons.get(r['status'], '•')} {name.ljust(width)}  {r['status']:<10} {duration:>8}  ({r['severity']})")
+    busy = sum(r['duration'] or 0 for r in results.values())
+    print(f"  ⏱️  Wall time {wall_seconds:.1f}s (sum of stage times {busy:.1f}s)")
+
+def build_context(repo_name=None, pr_number=None):
+    """Guard context from the environment (the Actions runner or the webhook worker's process)."""
+    return {
+        'pr_number': pr_number if pr_number is not None else os.environ.get('PR_NUMBER'),
+        'repo_name': repo_name or os.environ.get('GITHUB_REPOSITORY'),
         'token': os.environ.get('GITHUB_TOKEN'),
         'gemini_key': os.environ.get('GEMINI_API_KEY'),
         'aws_region': os.environ.get('AWS_REGION', 'us-east-1'),
         'db_url': os.environ.get('DATABASE_URL') # New Requirement: Needs to be in README!
     }
 
-    policy = load_policy()
-    
-    # Determine which section of policy to run
-    if args.action == 'closed':
-        stages = policy.get('cleanup', [])
-    else:
-        stages = policy.get('stages', [])
+def run_event(compiled, action, context):
+    """Runs the stages `action` triggers. Returns their results ({} if nothing runs)."""
+    # Precomputed when the policy was compiled: `closed` maps to the cleanup section
+    stages = compiled.stages_for(action)
+    if not stages:
+        print("Nothing to run for this event.")
+        return {}
 
-    for stage in stages:
-        execute_stage(stage, context, args.action)
+    started = time.time()
+    results = run_stages(stages, context)
+    print_summary(results, time.time() - started)
+
+    for name, r in results.items():
+        if r['status'] in FAILED_STATUSES:
+            if r['severity'] == 'block':
+                print(f"⛔ Blocking Merge due to failure in '{name}'.")
+            else:
+                print(f"⚠️  Warning in '{name}', but severity is not block.")
+    return results
+
+def blocked(results):
+    return any(r['status'] in FAILED_STATUSES and r['severity'] == 'block' for r in results.values())
+
+def main():
+    parser = argparse.ArgumentParser(description="DriftGuard Policy Engine")
+    parser.add_argument('--event', type=str, required=True, help="GitHub Event Name (pull_request, issue_comment)")
+    parser.add_argument('--action', type=str, required=True, help="Event Action (opened, synchronize, closed)")
+    args = parser.parse_args()
+
+    print(f"🔧 DriftGuard Engine Initializing... [Event: {args.event}, Action: {args.action}]")
+    metrics.trace_on_exit()
+
+    context = build_context()
+    results = run_event(load_policy(), args.action, context)
+    if blocked(results):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
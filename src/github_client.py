@@ -0,0 +1,165 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src import metrics
+
+# ==========================================
+# 🐙 Shared GitHub API Client
+# ==========================================
+# One pooled HTTP session per (token, API URL) for every guard in the process.
+# GET responses are remembered with their ETag and revalidated with
+# If-None-Match (a 304 doesn't count against the rate limit). When the
+# remaining quota runs low, requests are spaced out so the budget lasts until
+# the window resets instead of hitting a wall of 403s.
+
+DEFAULT_API_URL = "https://api.github.com"
+JSON_MEDIA_TYPE = "application/vnd.github+json"
+DIFF_MEDIA_TYPE = "application/vnd.github.v3.diff"
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+
+PACING_THRESHOLD = 100   # Start spacing requests out below this many remaining calls
+MAX_PACING_DELAY = 60.0  # Never sleep longer than this before a single request
+ETAG_CACHE_SIZE = 512
+
+class GitHubError(Exception):
+    def __init__(self, method, url, response):
+        self.status_code = response.status_code
+        self.response = response
+        try:
+            message = response.json().get('message', response.text)
+        except ValueError:
+            message = response.text
+        super().__init__(f"{method} {url} -> {response.status_code}: {message}")
+
+def api_url():
+    """API root; GITHUB_API_URL points the guards at GitHub Enterprise or a local fake server."""
+    return os.environ.get('GITHUB_API_URL', DEFAULT_API_URL).rstrip('/')
+
+class GitHubClient:
+    def __init__(self, token, base_url=None, pool_size=16, pacing_threshold=PACING_THRESHOLD):
+        self.base_url = (base_url or api_url()).rstrip('/')
+        self.pacing_threshold = pacing_threshold
+        self.session = requests.Session()
+        self.session.headers.update({"Accept": JSON_MEDIA_TYPE, "X-GitHub-Api-Version": "2022-11-28"})
+        if token:
+            self.session.headers["Authorization"] = f"token {token}"
+
+        # Connection errors and 5xx on idempotent calls are retried by urllib3 with backoff
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=("GET", "HEAD"), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.etags = OrderedDict()  # (url, accept, params) -> (etag, response)
+        self.rate_remaining = None
+        self.rate_reset = None
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'not_modified': 0, 'paced_seconds': 0.0}
+
+    def _url(self, path):
+        return path if path.startswith('http') else f"{self.base_url}/{path.lstrip('/')}"
+
+    def _pace(self):
+        """Sleeps before a request so the remaining quota lasts until the rate-limit window resets."""
+        with self.lock:
+            remaining, reset = self.rate_remaining, self.rate_reset
+        if remaining is None or reset is None or remaining >= self.pacing_threshold:
+            return
+        window = max(0.0, reset - time.time())
+        delay = window if remaining <= 0 else window / remaining
+        delay = min(delay, MAX_PACING_DELAY)
+        if delay > 0:
+            print(f"  🐢 GitHub rate limit low ({remaining} left); waiting {delay:.1f}s")
+            with self.lock:
+                self.stats['paced_seconds'] += delay
+            metrics.inc('driftguard_github_paced_seconds_total', delay)
+            time.sleep(delay)
+
+    def _track(self, response):
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        metrics.inc('driftguard_github_requests_total', status=response.status_code)
+        with self.lock:
+            self.stats['requests'] += 1
+            if remaining is not None:
+                self.rate_remaining = int(remaining)
+            if reset is not None:
+                self.rate_reset = float(reset)
+
+    def request(self, method, path, accept=None, params=None, json=None, timeout=30):
+        """Sends a request; raises GitHubError for any non-2xx/304 status."""
+        url = self._url(path)
+        headers = {"Accept": accept} if accept else {}
+        cache_key = (url, accept, tuple(sorted((params or {}).items()))) if method == 'GET' else None
+
+        with self.lock:
+            cached = self.etags.get(cache_key) if cache_key else None
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+        for attempt in range(2):
+            self._pace()
+            response = self.session.request(method, url, headers=headers, params=params, json=json, timeout=timeout)
+            self._track(response)
+            # Primary or secondary rate limit hit anyway: wait as instructed, then retry once
+            if response.status_code in (403, 429) and attempt == 0 and (
+                    response.headers.get('Retry-After') or response.headers.get('X-RateLimit-Remaining') == '0'):
+                wait = float(response.headers.get('Retry-After') or
+                             max(0.0, float(response.headers.get('X-RateLimit-Reset', time.time())) - time.time()))
+                print(f"  🐢 GitHub rate limited {method} {url}; retrying in {min(wait, MAX_PACING_DELAY):.0f}s")
+                time.sleep(min(wait, MAX_PACING_DELAY))
+                continue
+            break
+
+        if response.status_code == 304 and cached:
+            with self.lock:
+                self.stats['not_modified'] += 1
+                self.etags.move_to_end(cache_key)
+            return cached[1]
+        if not response.ok:
+            raise GitHubError(method, url, response)
+
+        if cache_key and response.headers.get('ETag'):
+            with self.lock:
+                self.etags[cache_key] = (response.headers['ETag'], response)
+                self.etags.move_to_end(cache_key)
+                while len(self.etags) > ETAG_CACHE_SIZE:
+                    self.etags.popitem(last=False)
+        return response
+
+    def get(self, path, params=None, accept=None):
+        return self.request('GET', path, accept=accept, params=params)
+
+    def get_json(self, path, params=None):
+        return self.get(path, params=params).json()
+
+    def post(self, path, json=None):
+        return self.request('POST', path, json=json)
+
+    def paginate(self, path, params=None, item_key=None):
+        """Yields items from every page, following the Link rel="next" header."""
+        params = dict(params or {}, per_page=100)
+        url = path
+        while url:
+            response = self.get(url, params=params)
+            data = response.json()
+            yield from (data.get(item_key, []) if item_key else data)
+            url = response.links.get('next', {}).get('url')
+            params = None  # The next link already carries the query string
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def get_client(token, base_url=None):
+    """Returns the process-wide client for this token and API URL, creating it on first use."""
+    key = (token, (base_url or api_url()).rstrip('/'))
+    with _CLIENTS_LOCK:
+        if key not in _CLIENTS:
+            _CLIENTS[key] = GitHubClient(token, base_url=key[1])
+        return _CLIENTS[key]
@@ -1,7 +1,37 @@
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from google import genai
-from github import Github
+
+# Sibling modules are imported as src.guards.* (engine adds the repo root to sys.path)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src import github_client, logs, metrics
+from src.guards import pr_state, readme_index, static_drift, verdict_cache
+
+DEFAULT_MODEL = "gemini-1.5-flash"
+# Bump whenever the prompt text changes so cached verdicts from the old prompt are ignored.
+PROMPT_VERSION = "3"
+DEFAULT_CHUNK_CHARS = 6000    # Diff text per model call
+DEFAULT_README_BUDGET = 4000  # README excerpt per model call
+DEFAULT_CONCURRENCY = 4       # Model calls in flight
+COMPARE_FILE_LIMIT = 300      # The compare API lists at most this many files
+
+def fetch_diff(gh, repo_name, pr_number):
+    """
+    Fetches the whole PR as one unified diff (a single request with the diff
+    media type). Falls back to paging through the PR's file list when GitHub
+    refuses to render the diff (e.g. very large PRs).
+    """
+    try:
+        return gh.get(f"/repos/{repo_name}/pulls/{pr_number}", accept=github_client.DIFF_MEDIA_TYPE).text
+    except github_client.GitHubError as e:
+        print(f"Warning: raw diff unavailable ({e}). Listing files instead.")
+
+    diff_text = ""
+    for file in gh.paginate(f"/repos/{repo_name}/pulls/{pr_number}/files"):
+        if file.get('patch'):
+            diff_text += f"diff --git a/{file['filename']} b/{file['filename']}\n{file['patch']}\n"
+    return diff_text
 
 def run(context, config):
     print("🧠 Starting AI Doc-Guard (Powered by google-genai SDK)...")
@@ -15,33 +45,227 @@ def run(context, config):
     if not gemini_key:
         raise Exception("GEMINI_API_KEY not set in environment.")
 
-    # 1. Connect to GitHub
-    g = Github(token)
-    repo = g.get_repo(repo_name)
-    pr = repo.get_pull(pr_number)
+    # 1. Connect to GitHub (shared pooled client; unchanged resources come back as free 304s)
+    gh = github_client.get_client(token)
+    pr = gh.get_json(f"/repos/{repo_name}/pulls/{pr_number}")
 
     # 2. Get Diff
-    diff_text = ""
     print(f"Fetching diff for PR #{pr_number}...")
-    files = pr.get_files()
-    for file in files:
-        if file.patch:
-            diff_text += f"\nFile: {file.filename}\n{file.patch}\n"
-    
-    if not diff_text:
+    diff_text = fetch_diff(gh, repo_name, pr_number)
+
+    if not diff_text.strip():
         print("No changes found in diff.")
         return
 
     # 3. Get README
     print(f"Fetching {readme_path}...")
     try:
-        readme_file = repo.get_contents(readme_path, ref=pr.head.ref)
-        readme_content = readme_file.decoded_content.decode("utf-8")
-    except Exception as e:
+        readme_content = gh.get(
+            f"/repos/{repo_name}/contents/{readme_path}",
+            params={'ref': pr['head']['sha']},
+            accept=github_client.RAW_MEDIA_TYPE
+        ).text
+    except github_client.GitHubError as e:
         print(f"Warning: {readme_path} not found. ({e})")
         readme_content = "(No README file found)"
 
-    # 4. Prepare Prompt for Gemini
+    # 4. Analyze (reusing cached and previously stored verdicts where possible)
+    diff_text = verdict_cache.normalize_diff(diff_text)
+    analyzer = DocAnalyzer(config, readme_content, gemini_key)
+    store = pr_state.open_store(config)
+    if store:
+        result = analyze_incremental(store, gh, repo_name, pr, diff_text, analyzer)
+    else:
+        result = merge_verdicts(analyzer.judge_files(pr_state.split_diff(diff_text)))
+
+    print(f"Verdict: {result['status']}")
+
+    # 5. Act on Result
+    if result['status'] == 'FAIL':
+        body = f"## 🤖 DriftGuard Report\n\n**Status:** ❌ Documentation Drift Detected\n\n**Reason:** {result['reason']}\n\n**Suggested Fix:**\n```markdown\n{result['suggested_doc_edit']}\n```"
+        
+        try:
+           gh.post(f"/repos/{repo_name}/issues/{pr_number}/comments", json={"body": body})
+        except Exception as e:
+           print(f"Could not post comment: {e}")
+           
+        raise Exception("DriftGuard blocked this PR: Documentation is out of sync.")
+    else:
+        print("✅ Documentation is in sync.")
+
+def chunk_file(name, section, max_chars):
+    """
+    Splits one file's diff section into chunks of at most `max_chars`, cutting
+    between hunks. Every chunk repeats the file header so it stands on its own;
+    a single hunk larger than the limit is truncated (and says so).
+    Returns [(label, text)].
+    """
+    if len(section) <= max_chars:
+        return [(name, section)]
+
+    header, hunks = [], []
+    for line in section.split('\n'):
+        if line.startswith('@@'):
+            hunks.append([line])
+        elif hunks:
+            hunks[-1].append(line)
+        else:
+            header.append(line)
+    header_text = '\n'.join(header) + '\n'
+    budget = max(max_chars - len(header_text), 1)
+
+    chunks, current = [], ''
+    for hunk in hunks:
+        text = '\n'.join(hunk) + '\n'
+        if len(text) > budget:
+            text = text[:budget - 40] + '\n... (hunk truncated)\n'
+        if current and len(current) + len(text) > budget:
+            chunks.append(current)
+            current = ''
+        current += text
+    if current:
+        chunks.append(current)
+
+    return [(f"{name} (part {i}/{len(chunks)})", header_text + chunk) for i, chunk in enumerate(chunks, 1)]
+
+class DocAnalyzer:
+    """Judges diff chunks concurrently, each against the README sections relevant to it."""
+
+    def __init__(self, config, readme_content, gemini_key):
+        self.model = config.get('model', DEFAULT_MODEL)
+        self.readme_content = readme_content
+        self.index = readme_index.build_index(readme_content)
+        self.readme_tokens = static_drift.ReadmeTokens(readme_content)
+        self.static_first_pass = config.get('static_first_pass', True)
+        self.cache = verdict_cache.open_cache(config)
+        self.max_chunk_chars = int(config.get('max_chunk_chars', DEFAULT_CHUNK_CHARS))
+        self.readme_budget = int(config.get('readme_budget_chars', DEFAULT_README_BUDGET))
+        self.max_concurrency = int(config.get('max_concurrency', DEFAULT_CONCURRENCY))
+        self.client = genai.Client(api_key=gemini_key)
+        print(f"✨ Using AI Model: {self.model} (up to {self.max_concurrency} concurrent calls)")
+
+    def judge(self, chunk_text):
+        """Returns the verdict for one chunk, from the verdict cache if this exact chunk was already judged."""
+        report = static_drift.analyze_diff(chunk_text, self.readme_tokens)
+        if self.static_first_pass and not report['findings']:
+            # No env vars, flags, routes or public signatures touched: nothing the README could miss
+            metrics.inc('driftguard_verdicts_total', source='static')
+            return {
+                "status": "PASS",
+                "reason": "[Static Analyzer] No interface changes (env vars, CLI flags, routes, public functions).",
+                "suggested_doc_edit": "",
+                "static": True
+            }
+
+        excerpt = readme_index.select_sections(self.index, chunk_text, self.readme_budget)
+        cache_key = verdict_cache.verdict_key(chunk_text, excerpt, self.model, PROMPT_VERSION)
+        result = self.cache.get(cache_key) if self.cache else None
+        if result is not None:
+            metrics.inc('driftguard_verdicts_total', source='cache')
+            return result
+
+        metrics.inc('driftguard_verdicts_total', source='llm')
+        result = analyze(chunk_text, excerpt, self.model, self.client, report)
+        if self.cache and not result.get('fallback'):
+            self.cache.put(cache_key, result)
+        return result
+
+    def judge_files(self, sections):
+        """Takes {filename: diff section}, returns {filename: verdict}."""
+        chunks = [
+            (name, label, text)
+            for name, section in sections.items()
+            for label, text in chunk_file(name, section, self.max_chunk_chars)
+        ]
+        if not chunks:
+            return {}
+        print(f"🧩 Analyzing {len(chunks)} chunks from {len(sections)} files...")
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(chunks)))) as pool:
+            verdicts = list(pool.map(logs.propagate(lambda chunk: self.judge(chunk[2])), chunks))
+        skipped = sum(1 for verdict in verdicts if verdict.get('static'))
+        if skipped:
+            print(f"⚡ Static first pass: {skipped} of {len(chunks)} chunks have no interface changes; model not called for them.")
+        print("✅ AI Analysis Complete.")
+
+        per_file = {}
+        for (name, label, _), verdict in zip(chunks, verdicts):
+            per_file.setdefault(name, {})[label] = verdict
+        return {
+            name: by_label[name] if list(by_label) == [name] else merge_verdicts(by_label)
+            for name, by_label in per_file.items()
+        }
+
+def analyze_incremental(store, gh, repo_name, pr, diff_text, analyzer):
+    """
+    Judges the PR file by file, re-analyzing only the files touched since the
+    last analyzed head SHA and keeping the stored verdicts for the rest.
+    Falls back to analyzing every file when there is no usable state: first
+    run, force-push (diverged compare), or a changed README/model/prompt.
+    """
+    sections = pr_state.split_diff(diff_text)
+    head_sha = pr['head']['sha']
+    context_hash = pr_state.content_hash(f"{PROMPT_VERSION}\n{analyzer.model}\n{analyzer.readme_content}")
+    state = store.load(repo_name, pr['number'])
+
+    previous, touched = {}, set()
+    if state and state.get('context_hash') != context_hash:
+        print("🔁 README, model or prompt changed since the last analysis; checking every file.")
+    elif state and state.get('head_sha') == head_sha:
+        previous = state.get('files', {})
+    elif state:
+        try:
+            comparison = gh.get_json(f"/repos/{repo_name}/compare/{state['head_sha']}...{head_sha}")
+            files = comparison.get('files', [])
+            if comparison['status'] == 'ahead' and len(files) >= COMPARE_FILE_LIMIT:
+                # The list is truncated, so files missing from it may still have changed
+                print(f"🔁 {len(files)}+ files changed since {state['head_sha'][:7]}; checking every file.")
+            elif comparison['status'] == 'ahead':
+                previous = state.get('files', {})
+                touched = {f['filename'] for f in files}
+            else:
+                print(f"🔁 History {comparison['status']} since {state['head_sha'][:7]} (force-push?); checking every file.")
+        except github_client.GitHubError as e:
+            print(f"Warning: could not compare against {state['head_sha'][:7]} ({e}); checking every file.")
+
+    # Fallback verdicts are never kept, so those files get another AI pass
+    stale = [
+        name for name in sections
+        if name in touched or name not in previous or previous[name].get('fallback')
+    ]
+    print(f"🔁 Incremental analysis: {len(stale)} of {len(sections)} files changed since last run.")
+
+    verdicts = {name: previous[name] for name in sections if name not in stale}
+    verdicts.update(analyzer.judge_files({name: sections[name] for name in stale}))
+
+    store.save(repo_name, pr['number'], {'head_sha': head_sha, 'context_hash': context_hash, 'files': verdicts})
+    return merge_verdicts(verdicts)
+
+def merge_verdicts(verdicts):
+    """Combines per-file (or per-chunk) verdicts: the whole fails if any part fails."""
+    failed = {name: v for name, v in verdicts.items() if v['status'] == 'FAIL'}
+    # A part judged by the static fallback taints the merged verdict, so it's re-analyzed next time
+    fallback = any(v.get('fallback') for v in verdicts.values())
+    if not failed:
+        return {
+            "status": "PASS",
+            "reason": f"No documentation drift in {len(verdicts)} changed files.",
+            "suggested_doc_edit": "",
+            "fallback": fallback
+        }
+    return {
+        "status": "FAIL",
+        "reason": " ".join(f"`{name}`: {v['reason']}" for name, v in failed.items()),
+        "suggested_doc_edit": "\n\n".join(v['suggested_doc_edit'] for v in failed.values() if v.get('suggested_doc_edit')),
+        "fallback": fallback
+    }
+
+def analyze(diff_text, readme_excerpt, model, client, static_report):
+    """
+    Asks the LLM for a PASS/FAIL verdict on one diff chunk against the README
+    excerpt, falling back to the static analyzer's report if it is unavailable.
+    """
+    # Prepare Prompt for Gemini
     prompt = f"""
     You are a generic Senior Technical Writer and Code Reviewer.
     Your task is to analyze the following Code Diff and ensure that the Documentation (README) is up to date.
@@ -52,11 +276,11 @@ def run(context, config):
     
     Input Data:
     
-    === CURRENT README ===
-    {readme_content[:2000]} 
+    === RELEVANT README SECTIONS ===
+    {readme_excerpt}
     
     === CODE DIFF ===
-    {diff_text[:3000]}
+    {diff_text}
     
     Instructions:
     Return your response in pure JSON format (no markdown formatting).
@@ -68,67 +292,29 @@ def run(context, config):
     }}
     """
 
-    # 5. Call Gemini (New SDK V1) with Resiliency Fallback
-    print("✨ Using AI Model: gemini-1.5-flash")
-    client = genai.Client(api_key=gemini_key)
-    
+    # Call Gemini (New SDK V1) with Resiliency Fallback
     result = None
     
     try:
-        response = client.models.generate_content(
-            model='gemini-1.5-flash',
-            contents=prompt
-        )
+        with metrics.timer('driftguard_llm_seconds', model=model):
+            response = client.models.generate_content(
+                model=model,
+                contents=prompt
+            )
+        metrics.inc('driftguard_llm_calls_total', model=model, outcome='ok')
         # Cleanup response string to ensure JSON parsing
         text = response.text.replace('```json', '').replace('```', '').strip()
         import json
         result = json.loads(text)
-        print("✅ AI Analysis Complete.")
 
     except Exception as e:
         print(f"⚠️  AI Provider Error ({e}). Switching to Resiliency Fallback Mode.")
+        metrics.inc('driftguard_llm_calls_total', model=model, outcome='error')
+        metrics.inc('driftguard_llm_fallback_total', model=model)
         # FALLBACK: Deterministic Check
         # This ensures the pipeline verifies the critical change even if AI is down.
-        # FALLBACK: Regex Pattern Matching for Env Vars
-        # This ensures the pipeline verifies the critical change even if AI is down.
-        import re
-        
-        # Regex to find: os.getenv('VAR'), os.environ.get('VAR'), os.environ['VAR']
-        # Captures the VAR name in group 2 or 3 depending on quote style
-        env_var_pattern = r"(os\.getenv|os\.environ\.get|os\.environ)\[?\(?['\"]([A-Z_0-9]+)['\"]"
-        
-        matches = re.findall(env_var_pattern, diff_text)
-        found_vars = set([m[1] for m in matches])
-        
-        missing_vars = []
-        for var in found_vars:
-            if var not in readme_content:
-                missing_vars.append(var)
-        
-        if missing_vars:
-             result = {
-                "status": "FAIL",
-                "reason": f"[Fallback Guard] Detected new environment variables {missing_vars} in code but not in README.",
-                "suggested_doc_edit": f"Please add {', '.join(missing_vars)} to the README environment configuration section."
-            }
-        else:
-             result = {
-                "status": "PASS",
-                "reason": "[Fallback Guard] No undocumented environment variables found via regex scan.",
-                "suggested_doc_edit": ""
-            }
+        # Fallback verdicts are not cached, so the next run asks the AI again.
+        result = static_drift.verdict(static_report)
+        result['fallback'] = True
 
-    print(f"Verdict: {result['status']}")
-
-    # 6. Act on Result
-    if result['status'] == 'FAIL':
-        body = f"## 🤖 DriftGuard Report\n\n**Status:** ❌ Documentation Drift Detected\n\n**Reason:** {result['reason']}\n\n**Suggested Fix:**\n```markdown\n{result['suggested_doc_edit']}\n```"
-        
-        try:
-           pr.create_issue_comment(body)
-        except Exception as e:
-           print(f"Could not post comment: {e}")
-           
-        raise Exception("DriftGuard blocked this PR: Documentation is out of sync.")
-    else:
-        print("✅ Documentation is in sync.")
+    return result
@@ -1,13 +1,155 @@
 import os
-import requests
+import re
+import sys
 import time
+import uuid
+import random
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src import github_client, logs, metrics
+
+# ==========================================
+# 🛡️ Cross-Repo Safety Guard
+# ==========================================
+# Fires a repository_dispatch at every downstream consumer in parallel
+# (retrying transient failures with jittered backoff), then optionally polls
+# every consumer's workflow runs until each one concludes or the deadline
+# passes. Total time is roughly that of the slowest consumer.
+
+EVENT_TYPE = "driftguard_integration_test"
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+CLOCK_SKEW_SECONDS = 30  # Tolerated difference between our clock and GitHub's when matching runs
+DISPATCH_ID_PATTERN = re.compile(r'DriftGuard ([0-9a-f]{12})\b')  # run-name: DriftGuard <client_payload.dispatch_id>
+UNMATCHED = 'unmatched'
+
+def dispatch(gh, target_repo, payload, max_attempts=4, base_delay=1.0):
+    """Sends one repository_dispatch, retrying 5xx/429/network errors. Returns (ok, attempts, error)."""
+    error = None
+    for attempt in range(1, max_attempts + 1):
+        try:
+            with metrics.timer('driftguard_dispatch_seconds'):
+                gh.post(f"/repos/{target_repo}/dispatches", json=payload)
+            metrics.inc('driftguard_dispatch_attempts_total', outcome='ok')
+            return True, attempt, None
+        except github_client.GitHubError as e:
+            error = str(e)
+            retryable = e.status_code in RETRYABLE_STATUS
+            metrics.inc('driftguard_dispatch_attempts_total', outcome='retryable' if retryable else 'rejected')
+            if not retryable:
+                return False, attempt, error
+        except Exception as e:  # Connection reset, DNS, timeouts
+            error = str(e)
+            metrics.inc('driftguard_dispatch_attempts_total', outcome='network_error')
+
+        if attempt < max_attempts:
+            # Full jitter: spread retries from many consumers instead of retrying in lockstep
+            delay = random.uniform(0, base_delay * (2 ** (attempt - 1)))
+            print(f"  🔁 Dispatch to {target_repo} failed ({error}); retry {attempt}/{max_attempts - 1} in {delay:.1f}s")
+            time.sleep(delay)
+    return False, max_attempts, error
+
+def _parse_time(value):
+    return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc).timestamp()
+
+def find_run(gh, target_repo, dispatch_id, dispatched_at):
+    """
+    Returns the consumer's workflow run for our dispatch, None if it hasn't
+    started yet, or UNMATCHED if it can't (yet) be told apart from other runs.
+    Consumers that set `run-name: DriftGuard <dispatch_id>` are matched exactly.
+    For consumers that don't, the only repository_dispatch run created since
+    our dispatch (less CLOCK_SKEW_SECONDS) is taken; several such runs may
+    belong to a previous push or another PR, so the caller keeps polling and
+    only gives up on them at its deadline.
+    """
+    runs = gh.get_json(
+        f"/repos/{target_repo}/actions/runs",
+        params={'event': 'repository_dispatch', 'per_page': 20}
+    ).get('workflow_runs', [])
+    labelled = {}
+    for run in runs:
+        match = DISPATCH_ID_PATTERN.search(run.get('display_title') or '')
+        if match:
+            labelled.setdefault(match.group(1), run)  # Newest first
+    if dispatch_id in labelled:
+        return labelled[dispatch_id]
+    if labelled:
+        return None  # The consumer names runs by dispatch id; ours hasn't started yet
+
+    candidates = [run for run in runs if _parse_time(run['created_at']) >= dispatched_at - CLOCK_SKEW_SECONDS]
+    if not candidates:
+        return None
+    if len(candidates) > 1:
+        return UNMATCHED
+    return candidates[0]
+
+def wait_for_runs(gh, results, pool, timeout_seconds, poll_interval, max_poll_interval):
+    """
+    Polls every pending consumer concurrently, round after round, until all
+    runs conclude or the deadline passes. The interval grows between rounds
+    so long-running suites aren't polled needlessly often. A consumer whose
+    run is still ambiguous at the deadline is UNMATCHED rather than timed_out.
+    """
+    deadline = time.time() + timeout_seconds
+    interval = poll_interval
+
+    def poll(target_repo):
+        result = results[target_repo]
+        try:
+            run = find_run(gh, target_repo, result['dispatch_id'], result['dispatched_at'])
+        except github_client.GitHubError as e:
+            print(f"  ⚠️ Could not read runs for {target_repo}: {e}")
+            return
+        result['ambiguous'] = run == UNMATCHED
+        if not run or run == UNMATCHED:
+            return
+        result['url'] = run.get('html_url')
+        if run['status'] == 'completed':
+            result['status'] = 'success' if run.get('conclusion') == 'success' else 'failure'
+            result['conclusion'] = run.get('conclusion')
+            result['duration_seconds'] = round(time.time() - result['dispatched_at'], 1)
+        else:
+            result['status'] = run['status']  # queued / in_progress
+
+    while True:
+        pending = [repo for repo, r in results.items() if r['status'] in ('dispatched', 'queued', 'in_progress')]
+        if not pending:
+            return
+        list(pool.map(logs.propagate(poll), pending))
+
+        pending = [repo for repo, r in results.items() if r['status'] in ('dispatched', 'queued', 'in_progress')]
+        remaining = deadline - time.time()
+        if not pending:
+            return
+        if remaining <= 0:
+            for repo in pending:
+                if results[repo].get('ambiguous'):
+                    results[repo]['status'] = UNMATCHED
+                    results[repo]['error'] = "Can't tell our run from other dispatches; set the consumer's run-name to 'DriftGuard ${{ github.event.client_payload.dispatch_id }}'"
+                else:
+                    results[repo]['status'] = 'timed_out'
+            return
+        print(f"⏳ Waiting on {len(pending)} consumer(s); next check in {min(interval, remaining):.0f}s")
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 1.5, max_poll_interval)
+
+def print_status_table(results):
+    icons = {'success': '✅', 'failure': '❌', 'dispatch_failed': '❌', 'timed_out': '⏰', 'dispatched': '📨', UNMATCHED: '❓'}
+    width = max([len(repo) for repo in results] + [len('Repository')])
+    print(f"\n{'Repository'.ljust(width)}  {'Status':<16} {'Attempts':>8} {'Time':>8}  Details")
+    for repo, r in sorted(results.items()):
+        duration = f"{r['duration_seconds']}s" if r.get('duration_seconds') is not None else '-'
+        details = r.get('url') or r.get('error') or ''
+        status = f"{icons.get(r['status'], '•')} {r['status']}"
+        print(f"{repo.ljust(width)}  {status:<16} {r['attempts']:>8} {duration:>8}  {details}")
 
 def run(context, config):
     print("🛡️  Starting Cross-Repo Safety Guard...")
-    
+
     # Security Enhancement: Prefer a dedicated PAT for cross-repo access
     # GITHUB_TOKEN often has restricted permissions for triggering events in other repos
-    token = os.getenv('DRIFTGUARD_PAT') 
+    token = os.getenv('DRIFTGUARD_PAT')
     if token:
         print("  🔑 Using DRIFTGUARD_PAT for cross-repo authentication.")
     else:
@@ -18,35 +160,61 @@ def run(context, config):
     pr_number = context['pr_number']
     targets = config.get('downstream_repos', [])
     wait_for_status = config.get('wait_for_status', False)
+    max_parallel = int(config.get('max_parallel', 8))
+    max_attempts = int(config.get('max_attempts', 4))
+
+    if not targets:
+        print("No downstream repositories configured.")
+        return {}
 
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-
-    for target_repo in targets:
-        print(f"Triggering dispatch in consumer repo: {target_repo}")
-        
-        url = f"https://api.github.com/repos/{target_repo}/dispatches"
-        data = {
-            "event_type": "driftguard_integration_test",
+    gh = github_client.get_client(token)
+    results = {}
+
+    def send(target_repo):
+        dispatch_id = uuid.uuid4().hex[:12]
+        payload = {
+            "event_type": EVENT_TYPE,
             "client_payload": {
                 "source_repo": current_repo,
                 "pr_number": pr_number,
-                "ref": f"refs/pull/{pr_number}/head" 
+                "ref": f"refs/pull/{pr_number}/head",
+                "dispatch_id": dispatch_id
             }
         }
-        
-        resp = requests.post(url, json=data, headers=headers)
-        if resp.status_code == 204:
-            print(f"✅ Successfully dispatched event to {target_repo}")
+        dispatched_at = time.time()
+        ok, attempts, error = dispatch(gh, target_repo, payload, max_attempts)
+        if ok:
+            logs.event(f"✅ Successfully dispatched event to {target_repo}", resource=target_repo, outcome='dispatched',
+                       duration=round(time.time() - dispatched_at, 3), attempts=attempts)
         else:
-            print(f"❌ Failed to dispatch: {resp.status_code} {resp.text}")
-            raise Exception(f"Failed dispatch to {target_repo}")
-
-    if wait_for_status:
-        # Mocking the wait logic as real implementation requires listening to webhooks 
-        # or polling a status check API which doesn't exist by default without a CI setup.
-        print("⏳ Waiting for feedback from consumer repo (Mocking 5s wait)...")
-        time.sleep(5)
-        print("✅ Consumer repo reported SUCCESS.")
+            logs.event(f"❌ Failed to dispatch to {target_repo}: {error}", level='error', resource=target_repo,
+                       outcome='dispatch_failed', duration=round(time.time() - dispatched_at, 3), attempts=attempts)
+        results[target_repo] = {
+            'status': 'dispatched' if ok else 'dispatch_failed',
+            'attempts': attempts,
+            'error': error,
+            'dispatch_id': dispatch_id,
+            'dispatched_at': dispatched_at,
+            'conclusion': None,
+            'url': None,
+            'duration_seconds': None,
+            'ambiguous': False,
+        }
+
+    print(f"Triggering dispatch in {len(targets)} consumer repo(s)...")
+    with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(targets)))) as pool:
+        list(pool.map(logs.propagate(send), targets))
+        if wait_for_status:
+            wait_for_runs(
+                gh, results, pool,
+                timeout_seconds=float(config.get('timeout_seconds', 900)),
+                poll_interval=float(config.get('poll_interval_seconds', 5)),
+                max_poll_interval=float(config.get('max_poll_interval_seconds', 30))
+            )
+
+    print_status_table(results)
+
+    failed = sorted(repo for repo, r in results.items() if r['status'] in ('dispatch_failed', 'failure', 'timed_out', UNMATCHED))
+    if failed:
+        raise Exception(f"Cross-repo check failed for: {', '.join(failed)}")
+    return results
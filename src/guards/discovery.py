@@ -0,0 +1,53 @@
+# ==========================================
+# 🏷️ Tag-Filtered Resource Discovery (AWS)
+# ==========================================
+# Instead of listing every bucket and asking each one for its tags, ask the
+# Resource Groups Tagging API for the resources that carry the expiry tag.
+# The scan costs one call per page of *tagged* resources (up to 100 per page),
+# regardless of how many untagged resources live in the account.
+
+RESOURCES_PER_PAGE = 100  # API maximum
+
+def parse_arn(arn):
+    """
+    Splits an ARN into (resource_type, resource_id) using the Tagging API's
+    type notation: 'arn:aws:s3:::my-bucket' -> ('s3', 'my-bucket'),
+    'arn:aws:ec2:us-east-1:123:instance/i-0abc' -> ('ec2:instance', 'i-0abc').
+    """
+    parts = arn.split(':', 5)
+    service, resource = parts[2], parts[5]
+    for sep in ('/', ':'):
+        if sep in resource:
+            kind, resource_id = resource.split(sep, 1)
+            return f"{service}:{kind}", resource_id
+    return service, resource
+
+def discover_tagged(tagging_client, tag_key, resource_types=None, tag_values=None, also_match=None):
+    """
+    Yields {'arn', 'type', 'id', 'tags'} for every resource tagged with
+    `tag_key` (optionally restricted to `tag_values`), page by page.
+    `also_match` ({key: value}) adds further tag filters, ANDed server-side.
+
+    `resource_types` uses the Tagging API filter notation ('s3', 'ec2:instance').
+    Results are regional: the client's region decides which resources are seen.
+    """
+    tag_filter = {'Key': tag_key}
+    if tag_values:
+        tag_filter['Values'] = list(tag_values)
+
+    tag_filters = [tag_filter] + [{'Key': k, 'Values': [str(v)]} for k, v in (also_match or {}).items()]
+    kwargs = {'TagFilters': tag_filters, 'ResourcesPerPage': RESOURCES_PER_PAGE}
+    if resource_types:
+        kwargs['ResourceTypeFilters'] = list(resource_types)
+
+    paginator = tagging_client.get_paginator('get_resources')
+    for page in paginator.paginate(**kwargs):
+        for mapping in page.get('ResourceTagMappingList', []):
+            arn = mapping['ResourceARN']
+            resource_type, resource_id = parse_arn(arn)
+            yield {
+                'arn': arn,
+                'type': resource_type,
+                'id': resource_id,
+                'tags': {t['Key']: t['Value'] for t in mapping.get('Tags', [])},
+            }
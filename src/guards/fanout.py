@@ -0,0 +1,137 @@
+import os
+import time
+import boto3
+from concurrent.futures import ProcessPoolExecutor
+
+# ==========================================
+# 🌐 AWS Multi-Account / Multi-Region Fan-out
+# ==========================================
+# One shard per (account role, region). Shards run in a process pool; each
+# worker process assumes a role once and keeps the session and its clients
+# for every later shard of the same account, refreshing shortly before the
+# temporary credentials expire.
+
+DEFAULT_SESSION_NAME = "driftguard-janitor"
+REFRESH_MARGIN_SECONDS = 300
+
+# Per-process caches (each pool worker has its own copy)
+_SESSIONS = {}  # role_arn (None = ambient credentials) -> (boto3.Session, expires_at)
+_CLIENTS = {}   # (role_arn, region, service) -> client
+
+def plan_shards(fanout_config):
+    """Expands `accounts` x `regions` into shard dicts."""
+    accounts = fanout_config.get('accounts') or [{}]  # {} scans with the ambient credentials
+    regions = fanout_config.get('regions') or [os.environ.get('AWS_REGION', 'us-east-1')]
+    return [
+        {
+            'account': account.get('name') or account.get('role_arn') or 'default',
+            'role_arn': account.get('role_arn'),
+            'external_id': account.get('external_id'),
+            'region': region,
+        }
+        for account in accounts
+        for region in regions
+    ]
+
+def _session(shard, session_name):
+    role_arn = shard['role_arn']
+    cached = _SESSIONS.get(role_arn)
+    if cached and cached[1] - time.time() > REFRESH_MARGIN_SECONDS:
+        return cached[0]
+
+    if not role_arn:
+        session, expires_at = boto3.Session(), float('inf')
+    else:
+        params = {'RoleArn': role_arn, 'RoleSessionName': session_name}
+        if shard.get('external_id'):
+            params['ExternalId'] = shard['external_id']
+        creds = boto3.client('sts').assume_role(**params)['Credentials']
+        session = boto3.Session(
+            aws_access_key_id=creds['AccessKeyId'],
+            aws_secret_access_key=creds['SecretAccessKey'],
+            aws_session_token=creds['SessionToken']
+        )
+        expires_at = creds['Expiration'].timestamp()
+
+    # Clients built from the previous session carry its (expiring) credentials
+    for key in [k for k in _CLIENTS if k[0] == role_arn]:
+        del _CLIENTS[key]
+    _SESSIONS[role_arn] = (session, expires_at)
+    return session
+
+def _client(shard, service, session_name, client_config):
+    session = _session(shard, session_name)
+    key = (shard['role_arn'], shard['region'], service)
+    if key not in _CLIENTS:
+        _CLIENTS[key] = session.client(service, region_name=shard['region'], config=client_config)
+    return _CLIENTS[key]
+
+def shard_janitor(shard, aws_config):
+    """An AWSJanitor for one shard, built on this process's cached session and clients."""
+    # Imported here: janitor imports this module, and workers may be spawned fresh.
+    from src.guards import janitor
+
+    fanout_config = aws_config.get('fanout') or {}
+    session_name = fanout_config.get('session_name', DEFAULT_SESSION_NAME)
+    config = {k: v for k, v in aws_config.items() if k != 'fanout'}
+    config['region'] = shard['region']
+    # Keep each shard's inventory rows apart so one shard's prune can't drop another's
+    config['inventory_scope'] = f"aws/{shard['account']}/{shard['region']}"
+    client_config = janitor.aws_client_config(config)
+    return janitor.AWSJanitor(
+        config,
+        s3_client=_client(shard, 's3', session_name, client_config),
+        tagging_client=_client(shard, 'resourcegroupstaggingapi', session_name, client_config)
+    )
+
+def run_shard(task, shard, aws_config, dry_run=False, pr=None, repo=None):
+    """Pool entrypoint: runs `task` ('scan', 'pr' or 'collect') for one account/region shard."""
+    from src.guards import janitor
+
+    print(f"  🌐 Shard {shard['account']} / {shard['region']}")
+    try:
+        j = shard_janitor(shard, aws_config)
+        if task == 'pr':
+            result = j.reap_pr(repo, pr, dry_run)
+        elif task == 'collect':
+            # Scheduler reconcile: list candidates only, the parent reaps them when due
+            result = janitor.new_result('aws')
+            result['candidates'] = j.collect()
+            result['scanned'] = j.scanned_count
+        else:
+            result = j.scan_and_clean(dry_run)
+    except Exception as e:
+        print(f"  ❌ Shard {shard['account']} / {shard['region']} failed: {e}")
+        result = janitor.new_result('aws')
+        result['status'] = 'error'
+        result['errors'].append(str(e))
+
+    result['account'] = shard['account']
+    result['region'] = shard['region']
+    return result
+
+def run_fanout(task, aws_config, dry_run=False, pr=None, repo=None):
+    """Runs every shard and returns the list of per-shard results."""
+    fanout_config = aws_config.get('fanout') or {}
+    shards = plan_shards(fanout_config)
+    max_processes = int(fanout_config.get('max_processes', os.cpu_count() or 2))
+
+    # max_processes: 0 keeps everything in this process (moto mocks don't cross process boundaries)
+    if max_processes <= 0:
+        return [run_shard(task, shard, aws_config, dry_run, pr, repo) for shard in shards]
+
+    with ProcessPoolExecutor(max_workers=min(max_processes, len(shards))) as pool:
+        futures = [pool.submit(run_shard, task, shard, aws_config, dry_run, pr, repo) for shard in shards]
+        results = []
+        for shard, future in zip(shards, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # The worker process itself died (e.g. OOM), not just the scan
+                print(f"  ❌ Shard {shard['account']} / {shard['region']} crashed: {e}")
+                results.append({
+                    'provider': 'aws', 'status': 'error', 'scanned': 0, 'expired': 0, 'deleted': 0,
+                    'failed': 0, 'duration_seconds': 0.0, 'errors': [str(e)],
+                    'account': shard['account'], 'region': shard['region'],
+                })
+        return results
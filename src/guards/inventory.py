@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import datetime
+
+# ==========================================
+# 🗃️ Resource Inventory (SQLite)
+# ==========================================
+# Remembers what each janitor scan saw, so the next scan only re-reads tags
+# for resources that are new or whose entry is older than the TTL. Rows for
+# resources that have disappeared from the provider are pruned after a scan.
+# Reaped resources are kept (with `reaped_at`) for REAPED_RETENTION_DAYS so
+# the FinOps engine can report realized savings.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    provider      TEXT NOT NULL,
+    resource_id   TEXT NOT NULL,
+    resource_type TEXT,
+    expiry        TEXT,
+    tag_hash      TEXT,
+    last_seen     REAL NOT NULL,
+    checked_at    REAL NOT NULL,
+    PRIMARY KEY (provider, resource_id)
+);
+CREATE INDEX IF NOT EXISTS idx_resources_expiry ON resources (provider, expiry);
+"""
+
+# Columns added after the first release; older inventory files are migrated on open.
+MIGRATIONS = {
+    'pr': "ALTER TABLE resources ADD COLUMN pr TEXT",
+    'repo': "ALTER TABLE resources ADD COLUMN repo TEXT",
+    'team': "ALTER TABLE resources ADD COLUMN team TEXT",
+    'size_bytes': "ALTER TABLE resources ADD COLUMN size_bytes REAL",   # Stored bytes, when the provider reports it
+    'size_class': "ALTER TABLE resources ADD COLUMN size_class TEXT",   # Storage class / instance type
+    'created_at': "ALTER TABLE resources ADD COLUMN created_at REAL",   # Provider creation time (epoch)
+    'first_seen': "ALTER TABLE resources ADD COLUMN first_seen REAL",   # First scan that saw it
+    'expiry_at': "ALTER TABLE resources ADD COLUMN expiry_at REAL",     # `expiry` parsed to epoch seconds
+    'reaped_at': "ALTER TABLE resources ADD COLUMN reaped_at REAL",
+}
+PR_INDEX = "CREATE INDEX IF NOT EXISTS idx_resources_pr ON resources (provider, repo, pr)"
+REAPED_RETENTION_DAYS = 90
+
+# Tag (AWS/Azure) or label (GCP) keys that carry the owning PR, repository and team.
+PR_KEYS = ('driftguard:pr', 'driftguard-pr')
+REPO_KEYS = ('driftguard:repo', 'driftguard-repo')
+TEAM_KEYS = ('driftguard:team', 'driftguard-team', 'team')
+
+def _first(tags, keys):
+    for key in keys:
+        if key in tags:
+            return str(tags[key])
+    return None
+
+def expiry_epoch(expiry):
+    """Parses an expiry tag value to epoch seconds (naive times are UTC). None if missing or unparseable."""
+    if not expiry:
+        return None
+    from dateutil import parser
+    try:
+        parsed = parser.parse(expiry)
+    except (ValueError, OverflowError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.timestamp()
+
+def tag_hash(tags):
+    """Stable hash of a tag/label mapping, used to spot tag changes between scans."""
+    payload = json.dumps(tags or {}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def open_inventory(config, provider):
+    """Builds the inventory for a provider from its janitor config block, or None if not configured."""
+    settings = (config or {}).get('inventory')
+    if not settings or not settings.get('path'):
+        return None
+    return Inventory(settings['path'], provider, ttl_seconds=float(settings.get('ttl_minutes', 360)) * 60)
+
+class Inventory:
+    def __init__(self, path, provider, ttl_seconds=6 * 3600):
+        self.path = path
+        self.provider = provider
+        self.ttl_seconds = ttl_seconds
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Each janitor owns its connection; the timeout covers concurrent writers on the same file.
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(resources)")}
+        for column, ddl in MIGRATIONS.items():
+            if column not in columns:
+                try:
+                    self.conn.execute(ddl)
+                except sqlite3.OperationalError as e:
+                    # Janitors sharing the file open it concurrently; another one migrated it first
+                    if 'duplicate column' not in str(e):
+                        raise
+        self.conn.execute(PR_INDEX)
+        if 'expiry_at' not in columns:
+            self._backfill_expiry()
+
+    def _backfill_expiry(self):
+        rows = self.conn.execute("SELECT provider, resource_id, expiry FROM resources WHERE expiry IS NOT NULL").fetchall()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE resources SET expiry_at = ? WHERE provider = ? AND resource_id = ?",
+                [(expiry_epoch(expiry), provider, rid) for provider, rid, expiry in rows]
+            )
+
+    def fresh(self):
+        """Returns {resource_id: row} for entries whose tags were read within the TTL."""
+        cutoff = time.time() - self.ttl_seconds
+        cur = self.conn.execute(
+            "SELECT resource_id, resource_type, expiry, tag_hash FROM resources "
+            "WHERE provider = ? AND checked_at >= ? AND reaped_at IS NULL",
+            (self.provider, cutoff)
+        )
+        return {
+            row[0]: {'resource_id': row[0], 'resource_type': row[1], 'expiry': row[2], 'tag_hash': row[3]}
+            for row in cur
+        }
+
+    def record(self, entries):
+        """
+        Upserts freshly read resources: iterable of (resource_id, resource_type,
+        expiry, tags) or (..., tags, attrs), where attrs may carry `size_bytes`,
+        `size_class` and `created_at` when the listing provides them.
+        A row that was reaped and has reappeared starts over as a new resource.
+        """
+        now = time.time()
+        rows = []
+        for rid, rtype, expiry, tags, *rest in entries:
+            tags = tags or {}
+            attrs = rest[0] if rest else {}
+            rows.append((
+                self.provider, rid, rtype, expiry, tag_hash(tags), now, now,
+                _first(tags, PR_KEYS), _first(tags, REPO_KEYS), _first(tags, TEAM_KEYS),
+                attrs.get('size_bytes'), attrs.get('size_class'), attrs.get('created_at'), now, expiry_epoch(expiry)
+            ))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO resources (provider, resource_id, resource_type, expiry, tag_hash, last_seen, checked_at, "
+                "pr, repo, team, size_bytes, size_class, created_at, first_seen, expiry_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (provider, resource_id) DO UPDATE SET "
+                "resource_type = excluded.resource_type, expiry = excluded.expiry, "
+                "tag_hash = excluded.tag_hash, last_seen = excluded.last_seen, checked_at = excluded.checked_at, "
+                "pr = excluded.pr, repo = excluded.repo, team = excluded.team, "
+                "size_bytes = COALESCE(excluded.size_bytes, resources.size_bytes), "
+                "size_class = COALESCE(excluded.size_class, resources.size_class), "
+                "created_at = COALESCE(excluded.created_at, resources.created_at), "
+                "first_seen = CASE WHEN resources.reaped_at IS NULL THEN COALESCE(resources.first_seen, excluded.first_seen) "
+                "ELSE excluded.first_seen END, "
+                "expiry_at = excluded.expiry_at, reaped_at = NULL",
+                rows
+            )
+
+    def touch(self, resource_ids):
+        """Marks cached resources as seen in this scan without re-reading their tags."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE resources SET last_seen = ? WHERE provider = ? AND resource_id = ?",
+                [(now, self.provider, rid) for rid in resource_ids]
+            )
+
+    def prune(self, seen_ids):
+        """Deletes rows for resources that no longer exist. Returns the number removed."""
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen (resource_id TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM seen")
+            self.conn.executemany("INSERT OR IGNORE INTO seen VALUES (?)", [(rid,) for rid in seen_ids])
+            cur = self.conn.execute(
+                "DELETE FROM resources WHERE provider = ? AND reaped_at IS NULL "
+                "AND resource_id NOT IN (SELECT resource_id FROM seen)",
+                (self.provider,)
+            )
+            # Reaped rows only matter for savings reporting; drop them once they age out
+            self.conn.execute(
+                "DELETE FROM resources WHERE provider = ? AND reaped_at < ?",
+                (self.provider, time.time() - REAPED_RETENTION_DAYS * 86400)
+            )
+        return cur.rowcount
+
+    def find_by_pr(self, repo, pr):
+        """Returns [(resource_type, resource_id)] recorded with this repository and PR."""
+        cur = self.conn.execute(
+            "SELECT resource_type, resource_id FROM resources "
+            "WHERE provider = ? AND repo = ? AND pr = ? AND reaped_at IS NULL",
+            (self.provider, str(repo), str(pr))
+        )
+        return [tuple(row) for row in cur]
+
+    def mark_reaped(self, resource_id):
+        """Records that the janitor deleted the resource (kept for savings reports)."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE resources SET reaped_at = ? WHERE provider = ? AND resource_id = ?",
+                (time.time(), self.provider, resource_id)
+            )
+
+    def forget(self, resource_id):
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM resources WHERE provider = ? AND resource_id = ?",
+                (self.provider, resource_id)
+            )
+
+    def close(self):
+        self.conn.close()
+
+def configured_paths(janitor_config):
+    """Distinct inventory files referenced by the per-provider blocks of a janitor config."""
+    paths = set()
+    for provider in ('aws', 'azure', 'gcp'):
+        settings = ((janitor_config or {}).get(provider) or {}).get('inventory') or {}
+        if settings.get('path'):
+            paths.add(settings['path'])
+    return sorted(paths)
+
+def read_inventory(path):
+    """Returns every live inventory row as a dict (for the dashboard). Empty if the file doesn't exist."""
+    if not os.path.exists(path):
+        return []
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.row_factory = sqlite3.Row
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(resources)")}
+        # Files written before the reaped_at migration have no reaped rows to hide
+        live = "WHERE reaped_at IS NULL " if 'reaped_at' in columns else ""
+        cur = conn.execute(
+            "SELECT provider, resource_id, resource_type, expiry, tag_hash, last_seen, checked_at, pr, repo "
+            f"FROM resources {live}ORDER BY provider, expiry IS NULL, expiry"
+        )
+        return [dict(row) for row in cur]
+    finally:
+        conn.close()
@@ -1,82 +1,531 @@
 import boto3
 import os
+import sys
+import time
 import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from dateutil import parser
 import json
 
+# Allow both `python src/guards/janitor.py` (cron) and `from src.guards import janitor`
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from src import logs, metrics, policy
+from src.guards import discovery, fanout, inventory, reaper, scheduler
+
+EXPIRY_TAG = 'driftguard:expiry'
+PR_TAG = 'driftguard:pr'
+REPO_TAG = 'driftguard:repo'
+# GCP Labels are lowercase, no ':'
+GCP_EXPIRY_LABEL = 'driftguard-expiry'
+GCP_PR_LABEL = 'driftguard-pr'
+GCP_REPO_LABEL = 'driftguard-repo'
+POLICY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'policy.yaml')
+
+def load_janitor_config(policy_path=POLICY_PATH):
+    """
+    Returns a copy of the `janitor_cleanup` stage config ({} if absent). Uses
+    the process-wide compiled policy, so the API's sweeps don't re-parse YAML.
+    """
+    if not os.path.exists(policy_path):
+        return {}
+    for stage in policy.cached_policy(policy_path).section('cleanup'):
+        if stage.name == 'janitor_cleanup':
+            return stage.config_copy()
+    return {}
+
+def gcp_label_value(value):
+    """GCP label values only allow [a-z0-9_-]: 'Org/Repo.js' -> 'org_repo_js'."""
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(value).lower())[:63]
+
+def aws_client_config(config):
+    """botocore Config shared by every AWS client a janitor (or fan-out shard) builds."""
+    max_workers = max(1, int(config.get('max_workers', 16)))
+    delete_concurrency = max(1, int(config.get('delete_concurrency', 8)))
+    # 'adaptive' retries back off exponentially on SlowDown/Throttling and
+    # rate-limit the shared client across all worker threads.
+    return Config(
+        max_pool_connections=max(max_workers, delete_concurrency),
+        retries={'mode': 'adaptive', 'max_attempts': int(config.get('max_retries', 8))}
+    )
+
+def _parse_expiry(expiry_str):
+    expiry_date = parser.parse(expiry_str)
+    # Timezone naive comparison (assuming UTC)
+    if expiry_date.tzinfo is None:
+        expiry_date = expiry_date.replace(tzinfo=datetime.timezone.utc)
+    return expiry_date
+
+def _looks_expired(expiry_str, now):
+    """True if the expiry has passed or can't be parsed; False when there is none."""
+    if not expiry_str:
+        return False
+    try:
+        return now > _parse_expiry(expiry_str)
+    except (ValueError, OverflowError):
+        return True
+
 # ==========================================
 # 🔌 Cloud Adapter Interface
 # ==========================================
+MAX_ERROR_SAMPLES = 20
+
+def new_result(provider):
+    """Structured outcome of one provider's scan, merged into the janitor report."""
+    return {
+        'provider': provider,
+        'status': 'ok',         # ok | error | timeout | skipped
+        'scanned': 0,           # Resources looked at
+        'expired': 0,           # Past their expiry tag
+        'deleted': 0,           # Actually reaped (0 in dry runs)
+        'failed': 0,            # Expired but could not be reaped
+        'duration_seconds': 0.0,
+        'errors': []
+    }
+
 class CloudJanitor:
-    def scan_and_clean(self, dry_run=False):
+    name = "Cloud"
+    provider = "cloud"
+    reaped_label = "REAPED"
+    ready = True
+    inventory = None
+    scanned_count = 0
+    last_scan_seconds = None
+    progress = None  # Optional callback(event_type, **data), e.g. an API job's emit()
+    deadline = None  # time.monotonic() by which a run should wrap up (set by _run_providers)
+
+    def notify(self, event_type, **data):
+        if self.progress:
+            self.progress(event_type, provider=self.provider, **data)
+
+    def collect(self):
+        """
+        Returns [(resource_type, resource_id, expiry_str)] for every resource carrying
+        an expiry tag, and sets `scanned_count` to the number of resources looked at.
+        """
+        raise NotImplementedError
+
+    def can_reap(self, resource_type):
+        return True
+
+    def current_expiry(self, resource_type, resource_id):
+        """Re-reads the resource's expiry tag (for delayed reaps). None if the tag or the resource is gone."""
         raise NotImplementedError
 
+    def reap(self, resource_type, resource_id):
+        """Deletes a single resource. Raises if it could not be deleted."""
+        raise NotImplementedError
+
+    poll_interval = None  # Seconds between deletion status checks, for janitors that delete asynchronously
+
+    def finalize(self, wait=True):
+        """
+        Waits for deletions started by reap() to settle. Returns {resource_id: status}.
+        With wait=False, checks once and returns only those already settled.
+        """
+        return {}
+
+    def deleting(self):
+        """Number of deletions started by reap() that haven't settled yet."""
+        return 0
+
+    def collect_pr(self, repo, pr):
+        """Returns [(resource_type, resource_id)] tagged with this repository and PR number."""
+        raise NotImplementedError
+
+    def reap_pr(self, repo, pr, dry_run=False):
+        """Deletes only the resources provisioned for one PR, whatever their expiry."""
+        result = new_result(self.provider)
+        result['resources'] = []
+        if not self.ready:
+            result['status'] = 'skipped'
+            return result
+
+        started = time.monotonic()
+        try:
+            found = self.collect_pr(repo, pr)
+            result['scanned'] = result['expired'] = len(found)
+            for resource_type, resource_id in found:
+                result['resources'].append({'type': resource_type, 'id': resource_id})
+                if not self.can_reap(resource_type):
+                    logs.event(f"    ⚠️ PR #{pr}: {resource_type} {resource_id} - no reaper for this type, flagging only",
+                               level='warn', provider=self.provider, resource=resource_id, outcome='flagged')
+                    continue
+                if dry_run:
+                    logs.event(f"    [Dry Run] Would delete {resource_type} {resource_id} (PR #{pr})",
+                               provider=self.provider, resource=resource_id, outcome='would_delete')
+                    continue
+                try:
+                    print(f"    💀 PR #{pr} closed: {resource_id} - DESTROYING...")
+                    reap_started = time.monotonic()
+                    self.reap(resource_type, resource_id)
+                    if self.inventory:
+                        self.inventory.mark_reaped(resource_id)
+                    result['deleted'] += 1
+                    logs.event(f"    ✔ {self.reaped_label}: {resource_id}", provider=self.provider, resource=resource_id,
+                               outcome='deleted', duration=round(time.monotonic() - reap_started, 3))
+                    self.notify('resource', resource_id=resource_id, outcome='deleted')
+                except Exception as inner_e:
+                    logs.event(f"    ❌ Failed to reap {resource_id}: {inner_e}", level='error',
+                               provider=self.provider, resource=resource_id, outcome='failed')
+                    result['failed'] += 1
+                    if len(result['errors']) < MAX_ERROR_SAMPLES:
+                        result['errors'].append(f"{resource_id}: {inner_e}")
+                    self.notify('resource', resource_id=resource_id, outcome='failed')
+            self._apply_deletions(result)
+
+        except Exception as e:
+            logs.event(f"  ❌ {self.name} Critical Error: {e}", level='error', provider=self.provider)
+            result['status'] = 'error'
+            result['errors'].append(str(e))
+
+        result['duration_seconds'] = round(time.monotonic() - started, 3)
+        return result
+
+    def _apply_deletions(self, result):
+        """Folds the outcome of asynchronous deletions (finalize) into a result."""
+        deletions = self.finalize()
+        if not deletions:
+            return
+        result['deletions'] = deletions
+        for resource_id, status in deletions.items():
+            if status != 'succeeded':
+                result['deleted'] -= 1
+                result['failed'] += 1
+                if len(result['errors']) < MAX_ERROR_SAMPLES:
+                    result['errors'].append(f"{resource_id}: deletion {status}")
+
+    def scan_and_clean(self, dry_run=False):
+        result = new_result(self.provider)
+        if not self.ready:
+            result['status'] = 'skipped'
+            return result
+
+        started = time.monotonic()
+        try:
+            candidates = self.collect()
+            result['scanned'] = self.scanned_count
+            self.notify('collected', scanned=self.scanned_count, tagged=len(candidates))
+            for resource_type, resource_id, expiry_str in candidates:
+                try:
+                    outcome = self.check_resource(resource_type, resource_id, expiry_str, dry_run)
+                except Exception as inner_e:
+                    # Don't let one bad resource crash the whole job
+                    logs.event(f"    ⚠️ Skipping {resource_id}: Access Denied or Error ({str(inner_e)})",
+                               level='warn', provider=self.provider, resource=resource_id, outcome='failed')
+                    result['failed'] += 1
+                    if len(result['errors']) < MAX_ERROR_SAMPLES:
+                        result['errors'].append(f"{resource_id}: {inner_e}")
+                    self.notify('resource', resource_id=resource_id, outcome='failed')
+                    continue
+                if outcome != 'active':
+                    result['expired'] += 1
+                    self.notify('resource', resource_id=resource_id, outcome=outcome)
+                if outcome == 'deleted':
+                    result['deleted'] += 1
+
+            self._apply_deletions(result)
+
+        except Exception as e:
+            logs.event(f"  ❌ {self.name} Critical Error: {e}", level='error', provider=self.provider)
+            result['status'] = 'error'
+            result['errors'].append(str(e))
+
+        self.last_scan_seconds = time.monotonic() - started
+        result['duration_seconds'] = round(self.last_scan_seconds, 3)
+        logs.event(f"  ⏱️ {self.name} scan finished in {self.last_scan_seconds:.2f}s", provider=self.provider,
+                   duration=round(self.last_scan_seconds, 3), scanned=result['scanned'], expired=result['expired'])
+        return result
+
+    def check_resource(self, resource_type, resource_id, expiry_str, dry_run=False):
+        """
+        Reaps the resource if its expiry has passed. Returns 'active', 'flagged'
+        (expired, no reaper for its type), 'would_delete' (dry run) or 'deleted'.
+        """
+        expiry_date = _parse_expiry(expiry_str)
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+        if now <= expiry_date:
+            return 'active'
+        if not self.can_reap(resource_type):
+            logs.event(f"    ⚠️ EXPIRED: {resource_type} {resource_id} (Expired at {expiry_str}) - no reaper for this type, flagging only",
+                       level='warn', provider=self.provider, resource=resource_id, outcome='flagged')
+            return 'flagged'
+
+        print(f"    💀 EXPIRED: {resource_id} (Expired at {expiry_str}) - DESTROYING...")
+        if dry_run:
+            logs.event(f"    [Dry Run] Would delete {resource_id}", provider=self.provider, resource=resource_id, outcome='would_delete')
+            return 'would_delete'
+        started = time.monotonic()
+        self.reap(resource_type, resource_id)
+        if self.inventory:
+            self.inventory.mark_reaped(resource_id)
+        logs.event(f"    ✔ {self.reaped_label}: {resource_id}", provider=self.provider, resource=resource_id,
+                   outcome='deleted', duration=round(time.monotonic() - started, 3))
+        return 'deleted'
+
 # ==========================================
 # ☁️ AWS Implementation
 # ==========================================
 class AWSJanitor(CloudJanitor):
-    def __init__(self):
+    name = "AWS"
+    provider = "aws"
+
+    def __init__(self, config=None, s3_client=None, tagging_client=None):
+        config = config or {}
+        # 'tagging': ask the Resource Groups Tagging API for tagged resources only.
+        # 'scan': list every bucket and read its tags (no tag:GetResources permission needed).
+        self.discovery = config.get('discovery', 'tagging')
+        self.resource_types = config.get('resource_types', ['s3'])
+        # Set by fan-out shards: restricts bucket listing to one region
+        self.region = config.get('region')
+        # The Tagging API only sees its own region's resources; default is every region enabled in the account
+        self.tagging_regions = config.get('regions')
+        # Bounded concurrency: one in-flight get_bucket_tagging per worker.
+        self.max_workers = max(1, int(config.get('max_workers', 16)))
+        self.delete_concurrency = max(1, int(config.get('delete_concurrency', 8)))
         print("🔌 Initializing AWS Connection...")
-        self.s3 = boto3.client('s3')
+        self.client_config = aws_client_config(config)
+        self.s3 = metrics.instrument_boto_client(s3_client or boto3.client('s3', config=self.client_config))
+        # An injected client (fan-out shard, tests) pins discovery to that client's region
+        self.tagging = metrics.instrument_boto_client(tagging_client) if tagging_client is not None else None
+        self._regional_tagging = None
+        # Resource type -> reaper. Tagged resources of other types are reported, not deleted.
+        self.reapers = {'s3': self._nuke_bucket}
+        self.inventory = inventory.open_inventory(config, config.get('inventory_scope', 'aws'))
 
-    def scan_and_clean(self, dry_run=False):
-        print("  🔍 Scanning AWS S3 Buckets (Paginated)...")
+    def collect(self):
+        if self.discovery == 'tagging':
+            return self._discover_tagged()
+        return self._scan_buckets()
+
+    def can_reap(self, resource_type):
+        return resource_type in self.reapers
+
+    def collect_pr(self, repo, pr):
+        print(f"  🔍 Querying AWS Tagging API for {REPO_TAG}={repo}, {PR_TAG}={pr}...")
+        # No type filter: everything provisioned for the PR is in scope, reapable or not.
+        found = self._discover(PR_TAG, tag_values=[str(pr)], also_match={REPO_TAG: repo})
+        return [(r['type'], r['id']) for r in found]
+
+    def reap(self, resource_type, resource_id):
+        self.reapers[resource_type](resource_id)
+
+    def current_expiry(self, resource_type, resource_id):
         try:
-            # Production Fix: Handle accounts with >1000 buckets
-            # Note: list_buckets does not support pagination natively in boto3, 
-            # it returns all buckets (up to 10k). But best practice involves handling potential limits.
-            response = self.s3.list_buckets()
-            
-            for bucket in response['Buckets']:
-                name = bucket['Name']
-                try:
-                    self._check_bucket(name, dry_run)
-                except Exception as inner_e:
-                    # Don't let one bad bucket crash the whole job
-                    print(f"    ⚠️ Skipping {name}: Access Denied or Error ({str(inner_e)})")
+            tags = self.s3.get_bucket_tagging(Bucket=resource_id)['TagSet']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('NoSuchTagSet', 'NoSuchBucket'):
+                return None
+            raise
+        return {t['Key']: t['Value'] for t in tags}.get(EXPIRY_TAG)
 
+    def _tagging_clients(self):
+        """One Tagging API client per region to query."""
+        if self.tagging is not None:
+            return [self.tagging]
+        if self._regional_tagging is None:
+            regions = [self.region] if self.region else self.tagging_regions or self._enabled_regions()
+            self._regional_tagging = [
+                metrics.instrument_boto_client(boto3.client('resourcegroupstaggingapi', region_name=region, config=self.client_config))
+                for region in regions
+            ]
+        return self._regional_tagging
+
+    def _enabled_regions(self):
+        try:
+            ec2 = metrics.instrument_boto_client(boto3.client('ec2', config=self.client_config))
+            return sorted(r['RegionName'] for r in ec2.describe_regions()['Regions'])
         except Exception as e:
-            print(f"  ❌ AWS Critical Error: {e}")
+            region = boto3.session.Session().region_name or 'us-east-1'
+            print(f"  ⚠️ Could not list enabled regions ({e}); querying {region} only. Set `regions` to cover the rest.")
+            return [region]
+
+    def _discover(self, tag_key, resource_types=None, **filters):
+        """discovery.discover_tagged across every region, one thread per region, de-duplicated by ARN."""
+        clients = self._tagging_clients()
+
+        def discover(client):
+            return list(discovery.discover_tagged(client, tag_key, resource_types, **filters))
 
-    def _check_bucket(self, bucket_name, dry_run):
+        with ThreadPoolExecutor(max_workers=min(len(clients), self.max_workers)) as pool:
+            found = {}
+            for resources in pool.map(logs.propagate(discover), clients):
+                for r in resources:
+                    found.setdefault(r['arn'], r)
+        return list(found.values())
+
+    def _discover_tagged(self):
+        """Returns [(type, id, expiry_str)] for resources carrying the expiry tag."""
+        clients = self._tagging_clients()
+        print(f"  🔍 Querying AWS Tagging API for '{EXPIRY_TAG}' ({', '.join(self.resource_types)}) in {len(clients)} region(s)...")
+        resources = self._discover(EXPIRY_TAG, self.resource_types)
+        self.scanned_count = len(resources)
+        print(f"    Found {len(resources)} tagged resources")
+        if self.inventory:
+            # The Tagging API already returns full tag sets, so every row is refreshed.
+            self.inventory.record((r['id'], r['type'], r['tags'][EXPIRY_TAG], r['tags']) for r in resources)
+            self.inventory.prune(r['id'] for r in resources)
+        return [(r['type'], r['id'], r['tags'][EXPIRY_TAG]) for r in resources]
+
+    def _scan_buckets(self):
+        """Returns [(type, id, expiry_str)] by reading the tags of every bucket."""
+        print(f"  🔍 Scanning AWS S3 Buckets ({self.max_workers} workers)...")
+        # Note: list_buckets does not support pagination natively in boto3,
+        # it returns all buckets (up to 10k). But best practice involves handling potential limits.
+        # Bucket listing is account-global; a regional shard only takes its own region's buckets.
+        response = self.s3.list_buckets(BucketRegion=self.region) if self.region else self.s3.list_buckets()
+        names = [bucket['Name'] for bucket in response['Buckets']]
+        created = {bucket['Name']: bucket['CreationDate'].timestamp() for bucket in response['Buckets'] if bucket.get('CreationDate')}
+        self.scanned_count = len(names)
+
+        # Only buckets that are new or whose inventory entry is stale need a tag lookup.
+        cached = self.inventory.fresh() if self.inventory else {}
+        # The cache may skip reads for live buckets but never decides a deletion: entries
+        # that look expired are re-read, in case the owner extended the expiry since.
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cached = {name: row for name, row in cached.items() if not _looks_expired(row['expiry'], now)}
+        stale = [name for name in names if name not in cached]
+        if self.inventory:
+            print(f"    {len(names) - len(stale)}/{len(names)} buckets served from inventory cache")
+
+        # Tag lookups are pure network wait, so fan them out over a bounded pool.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            fetched = dict(zip(stale, pool.map(logs.propagate(self._inspect_bucket), stale)))
+
+        if self.inventory:
+            self.inventory.record(
+                (name, 's3', tags.get(EXPIRY_TAG), tags, {'created_at': created.get(name)})
+                for name, tags in fetched.items() if tags is not None
+            )
+            self.inventory.touch(name for name in names if name in cached)
+            self.inventory.prune(names)
+
+        candidates = []
+        for name in names:
+            if name in cached:
+                expiry_str = cached[name]['expiry']
+            else:
+                expiry_str = (fetched[name] or {}).get(EXPIRY_TAG)
+            if expiry_str is not None:
+                candidates.append(('s3', name, expiry_str))
+        return candidates
+
+    def _inspect_bucket(self, bucket_name):
+        """Returns the bucket's tags ({} if untagged), or None if they couldn't be read."""
         try:
             tags = self.s3.get_bucket_tagging(Bucket=bucket_name)
-            tag_set = {t['Key']: t['Value'] for t in tags['TagSet']}
-            
-            if 'driftguard:expiry' in tag_set:
-                expiry_str = tag_set['driftguard:expiry']
-                expiry_date = parser.parse(expiry_str)
-                
-                # Timezone naive comparison (assuming UTC)
-                if expiry_date.tzinfo is None:
-                    expiry_date = expiry_date.replace(tzinfo=datetime.timezone.utc)
-                
-                now = datetime.datetime.now(datetime.timezone.utc)
-                
-                if now > expiry_date:
-                    print(f"    💀 EXPIRED: {bucket_name} (Expired at {expiry_str}) - DESTROYING...")
-                    if not dry_run:
-                        self._nuke_bucket(bucket_name)
-                        print(f"    ✔ REAPED: {bucket_name}")
-                    else:
-                        print(f"    [Dry Run] Would delete {bucket_name}")
-        except Exception:
-            # No tags or access denied
-            pass
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'NoSuchTagSet':
+                return {}
+            # Don't let one bad bucket crash the whole job
+            print(f"    ⚠️ Skipping {bucket_name}: Access Denied or Error ({str(e)})")
+            return None
+        return {t['Key']: t['Value'] for t in tags['TagSet']}
 
     def _nuke_bucket(self, bucket_name):
-        # Empty bucket first
-        s3 = boto3.resource('s3')
-        bucket = s3.Bucket(bucket_name)
-        bucket.object_versions.delete()
-        bucket.objects.all().delete()
-        bucket.delete()
+        # Empty bucket first: stream versions page by page into batched DeleteObjects calls
+        stats = reaper.empty_s3_bucket(self.s3, bucket_name, max_inflight=self.delete_concurrency)
+        print(f"      - Deleted {stats['deleted']} objects")
+        if stats['failed']:
+            for key, reason in stats['errors']:
+                print(f"      ❌ {key}: {reason}")
+            raise Exception(f"{stats['failed']} objects could not be deleted, keeping bucket")
+        self.s3.delete_bucket(Bucket=bucket_name)
+
+class AWSFanoutJanitor(CloudJanitor):
+    """AWSJanitor run once per (account role, region) shard across a process pool."""
+    name = "AWS"
+    provider = "aws"
+
+    def __init__(self, config):
+        self.config = config
+        self.shards = fanout.plan_shards(config['fanout'])
+        self.owners = {}     # resource_id -> shard it was collected from
+        self.janitors = {}   # (account, region) -> AWSJanitor used by the scheduler
+        print(f"🔌 AWS fan-out across {len(self.shards)} account/region shards...")
+
+    def collect(self):
+        """Merges every shard's collect(); each resource remembers its shard so the scheduler can reap it there."""
+        shard_results = fanout.run_fanout('collect', self.config)
+        failed = [f"{r['account']}/{r['region']}: {'; '.join(r['errors'])}" for r in shard_results if r['status'] != 'ok']
+        if failed:
+            raise Exception(f"{len(failed)} shard(s) failed to collect: {', '.join(failed)}")
+
+        owners, candidates = {}, []
+        for shard, result in zip(self.shards, shard_results):
+            for resource_type, resource_id, expiry_str in result['candidates']:
+                if resource_id not in owners:
+                    owners[resource_id] = shard
+                    candidates.append((resource_type, resource_id, expiry_str))
+        self.owners = owners
+        self.scanned_count = sum(r['scanned'] for r in shard_results)
+        return candidates
+
+    def _janitor_for(self, shard):
+        key = (shard['account'], shard['region'])
+        if key not in self.janitors:
+            self.janitors[key] = fanout.shard_janitor(shard, self.config)
+        return self.janitors[key]
+
+    def can_reap(self, resource_type):
+        # Every shard runs the same AWSJanitor
+        return self._janitor_for(self.shards[0]).can_reap(resource_type)
+
+    def current_expiry(self, resource_type, resource_id):
+        return self._janitor_for(self.owners[resource_id]).current_expiry(resource_type, resource_id)
+
+    def check_resource(self, resource_type, resource_id, expiry_str, dry_run=False):
+        # Delegated whole, so the reap is recorded in that shard's inventory scope
+        return self._janitor_for(self.owners[resource_id]).check_resource(resource_type, resource_id, expiry_str, dry_run)
+
+    def reap(self, resource_type, resource_id):
+        self._janitor_for(self.owners[resource_id]).reap(resource_type, resource_id)
+
+    def scan_and_clean(self, dry_run=False):
+        return self._merge(fanout.run_fanout('scan', self.config, dry_run))
+
+    def reap_pr(self, repo, pr, dry_run=False):
+        return self._merge(fanout.run_fanout('pr', self.config, dry_run, pr=pr, repo=repo))
+
+    def _merge(self, shard_results):
+        result = new_result(self.provider)
+        result['shards'] = shard_results
+        for shard in shard_results:
+            for key in ('scanned', 'expired', 'deleted', 'failed'):
+                result[key] += shard[key]
+            result['duration_seconds'] = max(result['duration_seconds'], shard['duration_seconds'])
+            result['errors'].extend(f"{shard['account']}/{shard['region']}: {e}" for e in shard['errors'])
+            if 'resources' in shard:
+                result.setdefault('resources', []).extend(shard['resources'])
+        if any(shard['status'] not in ('ok', 'skipped') for shard in shard_results):
+            result['status'] = 'error'
+        del result['errors'][MAX_ERROR_SAMPLES:]
+        return result
 
 # ==========================================
 # 🟦 Azure Implementation
 # ==========================================
 class AzureJanitor(CloudJanitor):
-    def __init__(self):
+    name = "Azure"
+    provider = "azure"
+    reaped_label = "DELETION INITIATED"
+
+    def __init__(self, config=None, resource_client=None):
+        config = config or {}
+        # Deletions are tracked by one polling loop, not a poller thread per group.
+        self.max_inflight_deletes = max(1, int(config.get('max_inflight_deletes', 50)))
+        self.delete_timeout = float(config.get('delete_timeout_seconds', 1800))
+        self.poll_interval = float(config.get('poll_interval_seconds', 15))
+        self.pending = {}    # RG name -> monotonic time its deletion started
+        self.deletions = {}  # RG name -> succeeded | failed | timed_out
+        self.inventory = inventory.open_inventory(config, 'azure')
+        if resource_client is not None:
+            self.resource_client = resource_client
+            self.ready = True
+            return
         try:
             from azure.identity import DefaultAzureCredential
             from azure.storage.blob import BlobServiceClient
@@ -96,37 +545,114 @@ class AzureJanitor(CloudJanitor):
             print("  ⚠️ Azure SDK not installed.")
             self.ready = False
 
-    def scan_and_clean(self, dry_run=False):
-        if not self.ready: return
-        print("  🔍 Scanning Azure Resource Groups...")
-        # Simplification: Scan Resource Groups with 'driftguard:expiry' tag
+    def collect(self):
+        if not self.ready: return []
+        print(f"  🔍 Listing Azure Resource Groups tagged '{EXPIRY_TAG}'...")
+        # ARM filters on the tag server-side, so untagged groups are never returned.
+        with metrics.cloud_call('azure', 'resourceGroups.list'):
+            groups = list(self.resource_client.resource_groups.list(filter=f"tagName eq '{EXPIRY_TAG}'"))
+        self.scanned_count = len(groups)
+        if self.inventory:
+            self.inventory.record((rg.name, 'resourcegroup', rg.tags[EXPIRY_TAG], rg.tags) for rg in groups)
+            self.inventory.prune(rg.name for rg in groups)
+
+        for rg in groups:
+            print(f"    Found Tagged RG: {rg.name}")
+        return [('resourcegroup', rg.name, rg.tags[EXPIRY_TAG]) for rg in groups]
+
+    def collect_pr(self, repo, pr):
+        print(f"  🔍 Listing Azure Resource Groups tagged {PR_TAG}={pr}...")
+        # ARM accepts a single tag filter, so the repository is checked client-side.
+        with metrics.cloud_call('azure', 'resourceGroups.list'):
+            groups = list(self.resource_client.resource_groups.list(filter=f"tagName eq '{PR_TAG}' and tagValue eq '{pr}'"))
+        return [('resourcegroup', rg.name) for rg in groups if (rg.tags or {}).get(REPO_TAG) == repo]
+
+    def current_expiry(self, resource_type, resource_id):
+        try:
+            with metrics.cloud_call('azure', 'resourceGroups.get'):
+                rg = self.resource_client.resource_groups.get(resource_id)
+        except Exception as e:
+            if getattr(e, 'status_code', None) == 404:
+                return None
+            raise
+        return (rg.tags or {}).get(EXPIRY_TAG)
+
+    def reap(self, resource_type, resource_id):
+        if len(self.pending) >= self.max_inflight_deletes:
+            self._poll_deletions(until_free=True)
+        # polling=False: fire the DELETE and track completion ourselves in _poll_deletions,
+        # instead of the SDK starting a background poller thread per group.
+        with metrics.cloud_call('azure', 'resourceGroups.delete'):
+            self.resource_client.resource_groups.begin_delete(resource_id, polling=False)
+        self.pending[resource_id] = time.monotonic()
+
+    def finalize(self, wait=True):
+        if self.pending and wait:
+            print(f"  ⏳ Waiting for {len(self.pending)} resource group deletions to complete...")
+            self._poll_deletions()
+        elif self.pending:
+            self._poll_deletions(once=True)
+        deletions, self.deletions = self.deletions, {}
+        for name, status in deletions.items():
+            icon = "✔" if status == 'succeeded' else "❌"
+            print(f"    {icon} {name}: deletion {status}")
+        return deletions
+
+    def _deletion_state(self, name):
         try:
-            for rg in self.resource_client.resource_groups.list():
-                tags = rg.tags or {}
-                if 'driftguard:expiry' in tags:
-                    expiry_str = tags['driftguard:expiry']
-                    # Logic similar to AWS...
-                    print(f"    Found Tagged RG: {rg.name}")
-                    
-                    if now > expiry_date:
-                        print(f"    💀 EXPIRED: {rg.name} (Expired at {expiry_str}) - DESTROYING...")
-                        if not dry_run:
-                            try:
-                                delete_async_op = self.resource_client.resource_groups.begin_delete(rg.name)
-                                # We don't wait for completion to avoid blocking the GitHub Action for too long
-                                print(f"    ✔ DELETION INITIATED: {rg.name}")
-                            except Exception as del_e:
-                                print(f"    ❌ Failed to delete RG {rg.name}: {del_e}")
-                        else:
-                            print(f"    [Dry Run] Would delete RG {rg.name}")
+            with metrics.cloud_call('azure', 'resourceGroups.get'):
+                rg = self.resource_client.resource_groups.get(name)
         except Exception as e:
-            print(f"  ❌ Azure Error: {e}")
+            if getattr(e, 'status_code', None) == 404:
+                return 'succeeded'
+            raise
+        state = (rg.properties.provisioning_state or '') if rg.properties else ''
+        # A failed delete leaves the group behind in a state other than 'Deleting'.
+        return 'deleting' if state.lower() == 'deleting' else 'failed'
+
+    def deleting(self):
+        return len(self.pending)
+
+    def _poll_deletions(self, until_free=False, once=False):
+        """Polls pending deletions until all settle (or, with until_free, a slot opens; with once, after one pass)."""
+        while self.pending:
+            for name, started in list(self.pending.items()):
+                try:
+                    state = self._deletion_state(name)
+                except Exception as e:
+                    print(f"    ⚠️ Could not poll deletion of {name}: {e}")
+                    state = 'deleting'
+                if state == 'deleting' and time.monotonic() - started > self.delete_timeout:
+                    state = 'timed_out'
+                if state != 'deleting':
+                    self.deletions[name] = state
+                    del self.pending[name]
+
+            if once or not self.pending or (until_free and len(self.pending) < self.max_inflight_deletes):
+                return
+            if self.deadline is not None and time.monotonic() + self.poll_interval > self.deadline:
+                # Report what's still pending now rather than be abandoned by the provider timeout
+                for name in self.pending:
+                    self.deletions[name] = 'timed_out'
+                self.pending.clear()
+                return
+            time.sleep(self.poll_interval)
 
 # ==========================================
 # 🟧 GCP Implementation
 # ==========================================
 class GCPJanitor(CloudJanitor):
-    def __init__(self):
+    name = "GCP"
+    provider = "gcp"
+
+    def __init__(self, config=None, client=None):
+        config = config or {}
+        self.delete_concurrency = max(1, int(config.get('delete_concurrency', 8)))
+        self.inventory = inventory.open_inventory(config, 'gcp')
+        if client is not None:
+            self.client = client
+            self.ready = True
+            return
         try:
             from google.cloud import storage
             print("🔌 Initializing GCP Connection...")
@@ -136,71 +662,272 @@ class GCPJanitor(CloudJanitor):
             print(f"  ⚠️ GCP Connection Failed: {e}")
             self.ready = False
 
-    def scan_and_clean(self, dry_run=False):
-        if not self.ready: return
+    def collect(self):
+        if not self.ready: return []
         print("  🔍 Scanning GCP Buckets...")
+        with metrics.cloud_call('gcp', 'buckets.list'):
+            buckets = list(self.client.list_buckets())
+        self.scanned_count = len(buckets)
+        if self.inventory:
+            # Labels, storage class and creation time come back with the listing, so recording them costs no extra calls.
+            self.inventory.record(
+                (b.name, 'bucket', (b.labels or {}).get(GCP_EXPIRY_LABEL), b.labels,
+                 {'size_class': b.storage_class, 'created_at': b.time_created.timestamp() if b.time_created else None})
+                for b in buckets
+            )
+            self.inventory.prune(b.name for b in buckets)
+
+        tagged = []
+        for bucket in buckets:
+            labels = bucket.labels
+            if labels and GCP_EXPIRY_LABEL in labels:
+                print(f"    Found Tagged Bucket: {bucket.name}")
+                tagged.append(('bucket', bucket.name, labels[GCP_EXPIRY_LABEL]))
+        return tagged
+
+    def collect_pr(self, repo, pr):
+        pr_label, repo_label = gcp_label_value(pr), gcp_label_value(repo)
+        # Bucket listing can't filter on labels, so prefer the inventory's PR index.
+        if self.inventory:
+            print(f"  🔍 Looking up GCP buckets for PR #{pr} in the inventory index...")
+            return self.inventory.find_by_pr(repo_label, pr_label)
+        print(f"  🔍 Scanning GCP bucket labels for PR #{pr} (no inventory configured)...")
+        with metrics.cloud_call('gcp', 'buckets.list'):
+            buckets = list(self.client.list_buckets())
+        return [
+            ('bucket', b.name) for b in buckets
+            if (b.labels or {}).get(GCP_PR_LABEL) == pr_label and (b.labels or {}).get(GCP_REPO_LABEL) == repo_label
+        ]
+
+    def current_expiry(self, resource_type, resource_id):
         try:
-            for bucket in self.client.list_buckets():
-                labels = bucket.labels
-                if labels and 'driftguard-expiry' in labels:
-                    print(f"    Found Tagged Bucket: {bucket.name}")
-                    # GCP Labels are lowercase
-                    expiry_str = labels['driftguard-expiry']
-                    expiry_date = parser.parse(expiry_str)
-
-                    if expiry_date.tzinfo is None:
-                        expiry_date = expiry_date.replace(tzinfo=datetime.timezone.utc)
-                    
-                    now = datetime.datetime.now(datetime.timezone.utc)
-
-                    if now > expiry_date:
-                        print(f"    💀 EXPIRED: {bucket.name} (Expired at {expiry_str}) - DESTROYING...")
-                        if not dry_run:
-                            try:
-                                # Must empty bucket first
-                                bloblist = list(bucket.list_blobs())
-                                if bloblist:
-                                    bucket.delete_blobs(bloblist)
-                                    print(f"      - Deleted {len(bloblist)} objects")
-                                
-                                bucket.delete()
-                                print(f"    ✔ REAPED: {bucket.name}")
-                            except Exception as del_e:
-                                print(f"    ❌ Failed to delete Bucket {bucket.name}: {del_e}")
-                        else:
-                            print(f"    [Dry Run] Would delete Bucket {bucket.name}")
+            with metrics.cloud_call('gcp', 'buckets.get'):
+                bucket = self.client.get_bucket(resource_id)
         except Exception as e:
-            print(f"  ❌ GCP Error: {e}")
+            if getattr(e, 'code', None) == 404:
+                return None
+            raise
+        return (bucket.labels or {}).get(GCP_EXPIRY_LABEL)
+
+    def reap(self, resource_type, resource_id):
+        bucket = self.client.bucket(resource_id)
+        # Must empty bucket first
+        stats = reaper.empty_gcs_bucket(self.client, bucket, max_inflight=self.delete_concurrency)
+        print(f"      - Deleted {stats['deleted']} objects")
+        if stats['failed']:
+            for key, reason in stats['errors']:
+                print(f"      ❌ {key}: {reason}")
+            raise Exception(f"{stats['failed']} objects could not be deleted, keeping bucket")
+        with metrics.cloud_call('gcp', 'buckets.delete'):
+            bucket.delete()
 
 # ==========================================
 # 🚀 Factory & Entrypoint
 # ==========================================
-def scan_resources(policy_config):
+JANITOR_CLASSES = {'aws': AWSJanitor, 'azure': AzureJanitor, 'gcp': GCPJanitor}
+DEFAULT_PROVIDER_TIMEOUT = 900
+DEADLINE_MARGIN_SECONDS = 30  # Left for a provider to report its results before its timeout
+DEFAULT_REPORT_PATH = ".driftguard/janitor-report.json"
+
+def make_janitor(provider, policy_config):
+    config = policy_config.get(provider)
+    if provider == 'aws' and (config or {}).get('fanout'):
+        return AWSFanoutJanitor(config)
+    return JANITOR_CLASSES[provider](config)
+
+def build_janitors(policy_config):
+    """Returns {provider: CloudJanitor} for the configured targets."""
     targets = policy_config.get('target', ['aws']) # Default to AWS
+    return {provider: make_janitor(provider, policy_config) for provider in JANITOR_CLASSES if provider in targets}
+
+def _provider_timeout(policy_config, provider):
+    return float((policy_config.get(provider) or {}).get('timeout_seconds', DEFAULT_PROVIDER_TIMEOUT))
+
+def _run_providers(targets, policy_config, work, progress=None):
+    """
+    Runs `work(janitor)` for each provider on its own daemon thread, bounded
+    by the provider's `timeout_seconds`. Returns the list of result dicts.
+    `progress(event_type, **data)`, if given, receives per-provider and per-resource events.
+    """
+    started = time.monotonic()
+
+    # Daemon threads: a hung SDK call must not keep the process alive after we give up on it.
+    runs = {}
+    for provider in targets:
+        box = {}
+        @logs.propagate  # Keep the caller's stage/job on events from this thread
+        def target(provider=provider, box=box):
+            with logs.bind(provider=provider):
+                try:
+                    if progress:
+                        progress('provider_started', provider=provider)
+                    janitor = make_janitor(provider, policy_config)
+                    janitor.progress = progress
+                    janitor.deadline = started + _provider_timeout(policy_config, provider) - DEADLINE_MARGIN_SECONDS
+                    box['result'] = work(janitor)
+                except Exception as e:
+                    box['error'] = e
+        thread = threading.Thread(target=target, name=f"janitor-{provider}", daemon=True)
+        thread.start()
+        runs[provider] = (thread, box)
+
+    results = []
+    for provider, (thread, box) in runs.items():
+        timeout = _provider_timeout(policy_config, provider)
+        thread.join(max(0.0, started + timeout - time.monotonic()))
+        if thread.is_alive():
+            logs.event(f"  ⏰ {provider} did not finish within {timeout:.0f}s, abandoning it", level='error',
+                       provider=provider, outcome='timeout')
+            result = new_result(provider)
+            result['status'] = 'timeout'
+            result['errors'].append(f"Timed out after {timeout:.0f}s")
+        elif 'error' in box:
+            logs.event(f"  ❌ {provider} janitor crashed: {box['error']}", level='error', provider=provider, outcome='error')
+            result = new_result(provider)
+            result['status'] = 'error'
+            result['errors'].append(str(box['error']))
+        else:
+            result = box['result']
+        if result['status'] in ('timeout', 'error'):
+            result['duration_seconds'] = round(time.monotonic() - started, 3)
+        if progress:
+            progress('provider_finished', provider=provider, result=result)
+        results.append(result)
+    return results
+
+def _targets(policy_config):
+    return [t for t in policy_config.get('target', ['aws']) if t in JANITOR_CLASSES] # Default to AWS
+
+def scan_resources(policy_config, dry_run=False, report_path=None, progress=None):
+    """
+    Scans every target provider concurrently, each bounded by its own
+    `timeout_seconds`, and returns the merged report (also written to
+    `report_path`, default `report_path` from the config).
+    """
+    targets = _targets(policy_config)
     print(f"🧹 Janitor starting scan for: {targets}")
-    
-    janitors = []
-    
-    if 'aws' in targets:
-        janitors.append(AWSJanitor())
-    if 'azure' in targets:
-        janitors.append(AzureJanitor())
-    if 'gcp' in targets:
-        janitors.append(GCPJanitor())
-        
-    for janitor in janitors:
-        janitor.scan_and_clean()
-
-def cleanup_pr_resources(context, policy_config):
+    started_at = datetime.datetime.now(datetime.timezone.utc)
+    started = time.monotonic()
+
+    results = _run_providers(targets, policy_config, lambda janitor: janitor.scan_and_clean(dry_run), progress)
+
+    report = build_report(results, started_at, time.monotonic() - started, dry_run)
+    print_report(report)
+    write_report(report, report_path or policy_config.get('report_path', DEFAULT_REPORT_PATH))
+    return report
+
+def build_report(results, started_at, duration, dry_run=False):
+    totals = {key: sum(r[key] for r in results) for key in ('scanned', 'expired', 'deleted', 'failed')}
+    healthy = all(r['status'] in ('ok', 'skipped') for r in results)
+    return {
+        'started_at': started_at.isoformat(),
+        'duration_seconds': round(duration, 3),
+        'dry_run': dry_run,
+        'status': 'ok' if healthy and not totals['failed'] else 'degraded',
+        'totals': totals,
+        'providers': results
+    }
+
+def print_report(report):
+    print("📊 Janitor Report")
+    print(f"  {'provider':<8} {'status':<8} {'scanned':>8} {'expired':>8} {'deleted':>8} {'failed':>7} {'time':>8}")
+    for r in report['providers']:
+        print(f"  {r['provider']:<8} {r['status']:<8} {r['scanned']:>8} {r['expired']:>8} "
+              f"{r['deleted']:>8} {r['failed']:>7} {r['duration_seconds']:>7.1f}s")
+    t = report['totals']
+    print(f"  {'total':<8} {report['status']:<8} {t['scanned']:>8} {t['expired']:>8} "
+          f"{t['deleted']:>8} {t['failed']:>7} {report['duration_seconds']:>7.1f}s")
+
+def write_report(report, report_path):
+    if not report_path:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    tmp_path = f"{report_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, report_path)
+
+def read_report(report_path=DEFAULT_REPORT_PATH):
+    """Returns the last written janitor report, or None."""
+    if not os.path.exists(report_path):
+        return None
+    with open(report_path, 'r') as f:
+        return json.load(f)
+
+def run_scheduler(policy_config, dry_run=False):
+    """Long-running mode: reap each resource when it expires instead of sweeping hourly."""
+    settings = policy_config.get('scheduler') or {}
+    sched = scheduler.ExpiryScheduler(
+        build_janitors(policy_config),
+        reconcile_seconds=float(settings.get('reconcile_minutes', 60)) * 60,
+        retry_seconds=float(settings.get('retry_minutes', 5)) * 60,
+        state_path=settings.get('state_path'),
+        dry_run=dry_run
+    )
+    try:
+        sched.run_forever()
+    except KeyboardInterrupt:
+        print("🛑 Janitor scheduler stopped.")
+    finally:
+        sched.drain()
+
+def cleanup_pr_resources(context, policy_config, dry_run=None, progress=None):
     """
     Wrapper for engine.py compatibility.
-    Triggers the resource scan/cleanup process.
+    Reaps only the resources tagged with this PR (driftguard:pr / driftguard:repo),
+    found through tag-filtered lookups, so the cost follows the PR's footprint.
     """
-    print(f"🧹 [PR Cleanup] Triggered for PR #{context.get('pr_number')}")
-    # In a real PR cleanup, we might target specific resources tagged with this PR.
-    # For now, we run the general expiry scan as a safety net.
-    scan_resources(policy_config)
+    pr_number = context.get('pr_number')
+    repo_name = context.get('repo_name')
+    print(f"🧹 [PR Cleanup] Triggered for PR #{pr_number} ({repo_name})")
+    if not pr_number or not repo_name:
+        print("  ⚠️ PR number or repository missing from context, nothing to clean up.")
+        return None
+    if dry_run is None:
+        dry_run = bool(policy_config.get('dry_run', False))
+
+    targets = _targets(policy_config)
+    started_at = datetime.datetime.now(datetime.timezone.utc)
+    started = time.monotonic()
+
+    results = _run_providers(targets, policy_config, lambda janitor: janitor.reap_pr(repo_name, pr_number, dry_run), progress)
+
+    report = build_report(results, started_at, time.monotonic() - started, dry_run)
+    report['pr'] = {'number': str(pr_number), 'repo': repo_name}
+    print_pr_summary(report)
+    return report
+
+def print_pr_summary(report):
+    pr = report['pr']
+    verb = "Would reap" if report['dry_run'] else "Reaped"
+    print(f"📊 PR #{pr['number']} Cleanup Summary ({pr['repo']})")
+    for r in report['providers']:
+        print(f"  {r['provider']:<6} {r['status']:<8} found {r['scanned']}, deleted {r['deleted']}, failed {r['failed']}")
+        for resource in r.get('resources', []):
+            print(f"    - {resource['type']} {resource['id']}")
+    t = report['totals']
+    count = t['scanned'] if report['dry_run'] else t['deleted']
+    print(f"  {verb} {count} resources across {len(report['providers'])} providers in {report['duration_seconds']:.1f}s")
 
 if __name__ == "__main__":
-    # Test Run
-    scan_resources({'target': ['aws', 'azure', 'gcp']})
+    import argparse
+    arg_parser = argparse.ArgumentParser(description="DriftGuard Janitor")
+    arg_parser.add_argument('--daemon', action='store_true', help="Run the expiry scheduler instead of a one-off sweep")
+    arg_parser.add_argument('--dry-run', action='store_true', help="Report expired resources without deleting them")
+    arg_parser.add_argument('--report', type=str, default=None, help="Where to write the JSON report")
+    arg_parser.add_argument('--pr', type=str, default=None, help="Reap only the resources tagged with this PR number")
+    arg_parser.add_argument('--repo', type=str, default=os.environ.get('GITHUB_REPOSITORY'), help="Repository of --pr (owner/name)")
+    args = arg_parser.parse_args()
+
+    # Cron entrypoint: janitor_cleanup config from policy.yaml, all clouds by default
+    metrics.trace_on_exit()
+    config = load_janitor_config()
+    config.setdefault('target', ['aws', 'azure', 'gcp'])
+    if args.pr:
+        report = cleanup_pr_resources({'pr_number': args.pr, 'repo_name': args.repo}, config, dry_run=args.dry_run)
+        sys.exit(0 if report and report['status'] == 'ok' else 1)
+    elif args.daemon:
+        run_scheduler(config, dry_run=args.dry_run)
+    else:
+        report = scan_resources(config, dry_run=args.dry_run, report_path=args.report)
+        sys.exit(0 if report['status'] == 'ok' else 1)
@@ -0,0 +1,59 @@
+import os
+import json
+import time
+import hashlib
+
+# ==========================================
+# 📌 Per-PR Analysis State (Incremental Doc-Guard)
+# ==========================================
+# Remembers, for each pull request, the head SHA that was last analyzed and
+# the verdict given to every file in the PR at that point. The next push only
+# needs the files touched between that SHA and the new head.
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+def split_diff(diff_text):
+    """Splits a unified diff into {filename: section}, one section per 'diff --git' header."""
+    sections = {}
+    current, lines = None, []
+    for line in diff_text.split('\n'):
+        if line.startswith('diff --git '):
+            if current:
+                sections[current] = '\n'.join(lines) + '\n'
+            current = line.rsplit(' b/', 1)[-1]
+            lines = [line]
+        elif current:
+            lines.append(line)
+    if current:
+        sections[current] = '\n'.join(lines) + '\n'
+    return sections
+
+def open_store(config):
+    """Builds the state store when the ai_doc_check config enables incremental mode, else None."""
+    if not (config or {}).get('incremental'):
+        return None
+    return PRStateStore(config.get('state_path', '.driftguard/pr-state'))
+
+class PRStateStore:
+    def __init__(self, path):
+        self.path = path
+
+    def _file(self, repo_name, pr_number):
+        return os.path.join(self.path, repo_name.replace('/', '__'), f"{pr_number}.json")
+
+    def load(self, repo_name, pr_number):
+        """Returns the stored state dict for a PR, or None."""
+        try:
+            with open(self._file(repo_name, pr_number), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, repo_name, pr_number, state):
+        path = self._file(repo_name, pr_number)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({**state, 'updated_at': time.time()}, f, indent=2)
+        os.replace(tmp_path, path)
@@ -0,0 +1,82 @@
+import re
+from collections import Counter
+
+# ==========================================
+# 📚 README Section Index (AI Doc-Guard)
+# ==========================================
+# Splits the README at its headings so each diff chunk can be sent to the model
+# with only the sections that talk about the same things (identifiers, env
+# vars, routes, flags), instead of the first 2000 characters of the file.
+
+HEADING = re.compile(r'^(#{1,6})\s+(.*)$')
+IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_\-]{2,}')
+
+# Words too common in code and prose to say anything about relevance
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'this', 'that', 'from', 'import', 'return', 'def', 'class',
+    'self', 'none', 'true', 'false', 'not', 'are', 'you', 'your', 'can', 'will', 'use', 'diff',
+    'git', 'print', 'file', 'index', 'new', 'get', 'set', 'if', 'else', 'elif', 'try', 'except',
+}
+
+def identifiers(text):
+    """Lower-cased identifier-like tokens of `text`, with snake/kebab parts added."""
+    tokens = Counter()
+    for match in IDENTIFIER.findall(text):
+        word = match.lower()
+        if word in STOPWORDS:
+            continue
+        tokens[word] += 1
+        for part in re.split(r'[_\-]', word):
+            if len(part) > 2 and part not in STOPWORDS and part != word:
+                tokens[part] += 1
+    return tokens
+
+def build_index(readme_content):
+    """Returns [{'title', 'text', 'tokens'}], one entry per heading (plus any preamble)."""
+    sections = []
+    title, lines = '(intro)', []
+    in_code = False
+    for line in readme_content.split('\n'):
+        if line.lstrip().startswith('```'):
+            in_code = not in_code
+        # '#' inside fenced code is a shell comment, not a heading
+        match = None if in_code else HEADING.match(line)
+        if match:
+            if ''.join(lines).strip():
+                sections.append(_section(title, lines))
+            title, lines = match.group(2).strip(), [line]
+        else:
+            lines.append(line)
+    if ''.join(lines).strip():
+        sections.append(_section(title, lines))
+    return sections
+
+def _section(title, lines):
+    text = '\n'.join(lines).strip()
+    return {'title': title, 'text': text, 'tokens': set(identifiers(text))}
+
+def select_sections(index, chunk_text, budget_chars=4000):
+    """
+    Returns the README excerpt for a diff chunk: the sections sharing the most
+    identifiers with the chunk, best first, up to `budget_chars`. Sections are
+    emitted in README order so the excerpt still reads like the document.
+    """
+    chunk_tokens = identifiers(chunk_text)
+    scored = []
+    for position, section in enumerate(index):
+        score = sum(count for token, count in chunk_tokens.items() if token in section['tokens'])
+        if score:
+            scored.append((-score, position))
+
+    chosen, used = [], 0
+    for _, position in sorted(scored):
+        size = len(index[position]['text'])
+        if used + size > budget_chars:
+            continue
+        chosen.append(position)
+        used += size
+
+    # Nothing relevant: give the model the top of the README for orientation
+    if not chosen and index:
+        return index[0]['text'][:budget_chars]
+    return '\n\n'.join(index[position]['text'] for position in sorted(chosen))
@@ -0,0 +1,131 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src import logs, metrics
+
+# ==========================================
+# 🪓 Streaming Bucket Reaper
+# ==========================================
+# Empties buckets page by page: each listing page is split into provider batch
+# calls, and at most `max_inflight` batches are held in memory at once. Memory
+# stays flat whether the bucket holds a hundred objects or a hundred million.
+
+S3_BATCH_SIZE = 1000   # Hard limit of a single S3 DeleteObjects call
+GCS_BATCH_SIZE = 100   # Hard limit of calls inside one GCS JSON batch request
+MAX_ERROR_SAMPLES = 20
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def run_delete_pipeline(batches, delete_batch, max_inflight=4, label="objects", progress_every=10000):
+    """
+    Feeds `batches` (an iterator of lists) to `delete_batch` on a bounded pool.
+    `delete_batch(batch)` returns a list of (key, reason) pairs that failed.
+    Returns {'deleted': int, 'failed': int, 'errors': [(key, reason), ...]}.
+    """
+    stats = {'deleted': 0, 'failed': 0, 'errors': []}
+    lock = threading.Lock()
+    # The listing producer blocks here once max_inflight batches are pending.
+    slots = threading.BoundedSemaphore(max_inflight)
+    next_report = [progress_every]
+
+    def worker(batch):
+        try:
+            failures = delete_batch(batch)
+        except Exception as e:
+            failures = [(f"<batch of {len(batch)}>", str(e))]
+            failed_count = len(batch)
+        else:
+            failed_count = len(failures)
+        finally:
+            slots.release()
+
+        with lock:
+            stats['deleted'] += len(batch) - failed_count
+            stats['failed'] += failed_count
+            room = MAX_ERROR_SAMPLES - len(stats['errors'])
+            if room > 0:
+                stats['errors'].extend(failures[:room])
+            if stats['deleted'] >= next_report[0]:
+                print(f"      - Deleted {stats['deleted']} {label} so far...")
+                next_report[0] = stats['deleted'] + progress_every
+
+    with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+        for batch in batches:
+            if not batch:
+                continue
+            slots.acquire()
+            pool.submit(logs.propagate(worker), batch)
+
+    return stats
+
+# ==========================================
+# ☁️ AWS S3
+# ==========================================
+def empty_s3_bucket(s3, bucket_name, max_inflight=4, progress_every=10000):
+    """Deletes every object version and delete marker in `bucket_name`."""
+
+    def batches():
+        paginator = s3.get_paginator('list_object_versions')
+        pages = paginator.paginate(Bucket=bucket_name, PaginationConfig={'PageSize': S3_BATCH_SIZE})
+        for page in pages:
+            # Unversioned buckets list their objects with VersionId 'null'.
+            keys = [
+                {'Key': v['Key'], 'VersionId': v['VersionId']}
+                for v in page.get('Versions', []) + page.get('DeleteMarkers', [])
+            ]
+            yield from _chunks(keys, S3_BATCH_SIZE)
+
+    def delete_batch(batch):
+        resp = s3.delete_objects(Bucket=bucket_name, Delete={'Objects': batch, 'Quiet': True})
+        errors = resp.get('Errors', [])
+        if errors:
+            # Partial failure: retry just the rejected keys once before giving up.
+            retry = [{'Key': e['Key'], 'VersionId': e['VersionId']} if e.get('VersionId') else {'Key': e['Key']}
+                     for e in errors]
+            resp = s3.delete_objects(Bucket=bucket_name, Delete={'Objects': retry, 'Quiet': True})
+            errors = resp.get('Errors', [])
+        return [(e['Key'], f"{e.get('Code', 'Error')}: {e.get('Message', '')}") for e in errors]
+
+    return run_delete_pipeline(batches(), delete_batch, max_inflight, "S3 objects", progress_every)
+
+# ==========================================
+# 🟧 GCP Cloud Storage
+# ==========================================
+def empty_gcs_bucket(client, bucket, max_inflight=4, progress_every=10000):
+    """Deletes every blob generation in `bucket` using batched JSON API requests."""
+
+    def batches():
+        # versions=True: noncurrent generations of a versioned bucket would otherwise
+        # survive and make bucket.delete() fail with 409 (bucket not empty)
+        pages = iter(bucket.list_blobs(page_size=1000, versions=True).pages)
+        while True:
+            with metrics.cloud_call('gcp', 'objects.list'):
+                page = next(pages, None)
+                blobs = list(page) if page is not None else None
+            if blobs is None:
+                return
+            yield from _chunks(blobs, GCS_BATCH_SIZE)
+
+    def delete_batch(blobs):
+        try:
+            # client.batch() keeps its stack thread-local, so concurrent batches don't mix.
+            with metrics.cloud_call('gcp', 'objects.batch_delete'), client.batch():
+                for blob in blobs:
+                    bucket.delete_blob(blob.name, generation=blob.generation)
+            return []
+        except Exception:
+            # The batch reports only the first error; redo it per blob to isolate failures.
+            failures = []
+            for blob in blobs:
+                try:
+                    with metrics.cloud_call('gcp', 'objects.delete'):
+                        bucket.delete_blob(blob.name, generation=blob.generation)
+                except Exception as e:
+                    if getattr(e, 'code', None) == 404:
+                        continue  # Deleted by the batch before it failed
+                    failures.append((blob.name, str(e)))
+            return failures
+
+    return run_delete_pipeline(batches(), delete_batch, max_inflight, "GCS objects", progress_every)
@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import heapq
+import datetime
+import threading
+from dateutil import parser
+
+# ==========================================
+# ⏰ Expiry Scheduler (Daemon Mode)
+# ==========================================
+# Keeps a min-heap of known expiry times and sleeps until exactly the next one
+# is due, instead of sweeping every provider on a fixed hourly cron. A periodic
+# full reconcile (janitor.collect()) picks up resources created since the last
+# one and drops entries whose tags changed or that were deleted out of band.
+
+MAX_QUEUE_SNAPSHOT = 100
+
+def _to_timestamp(expiry_str):
+    expiry_date = parser.parse(expiry_str)
+    if expiry_date.tzinfo is None:
+        expiry_date = expiry_date.replace(tzinfo=datetime.timezone.utc)
+    return expiry_date.timestamp()
+
+def _iso(ts):
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).isoformat()
+
+def read_state(state_path):
+    """Returns the last snapshot written by a running scheduler, or None."""
+    if not state_path or not os.path.exists(state_path):
+        return None
+    with open(state_path, 'r') as f:
+        return json.load(f)
+
+class ExpiryScheduler:
+    def __init__(self, janitors, reconcile_seconds=3600, retry_seconds=300, state_path=None, dry_run=False):
+        """`janitors` maps provider name -> CloudJanitor."""
+        self.janitors = janitors
+        self.reconcile_seconds = reconcile_seconds
+        self.retry_seconds = retry_seconds
+        self.state_path = state_path
+        self.dry_run = dry_run
+        self.heap = []       # (due_ts, provider, resource_type, resource_id, expiry_str)
+        self.reaped = []     # Most recent reaps, newest last
+        self.next_reconcile = 0.0
+        self.last_reconcile = None
+        self.stop_event = threading.Event()
+
+    def reconcile(self):
+        """Rebuilds the queue from a full collect() on every provider."""
+        print("🔄 Scheduler reconcile: collecting expiry tags from all providers...")
+        entries = []
+        for provider, janitor in self.janitors.items():
+            if not janitor.ready:
+                continue
+            try:
+                for resource_type, resource_id, expiry_str in janitor.collect():
+                    try:
+                        due = _to_timestamp(expiry_str)
+                    except (ValueError, OverflowError):
+                        print(f"    ⚠️ Ignoring {resource_id}: unparseable expiry '{expiry_str}'")
+                        continue
+                    entries.append((due, provider, resource_type, resource_id, expiry_str))
+            except Exception as e:
+                # Keep the previous entries for this provider rather than forgetting them
+                print(f"  ❌ {janitor.name} reconcile failed: {e}")
+                entries.extend(entry for entry in self.heap if entry[1] == provider)
+
+        heapq.heapify(entries)
+        self.heap = entries
+        self.last_reconcile = time.time()
+        self.next_reconcile = self.last_reconcile + self.reconcile_seconds
+        print(f"  📋 {len(self.heap)} resources queued, next due: {_iso(self.heap[0][0]) if self.heap else 'none'}")
+
+    def reap_due(self):
+        """Reaps every queued resource whose expiry has passed."""
+        now = time.time()
+        while self.heap and self.heap[0][0] <= now:
+            due, provider, resource_type, resource_id, expiry_str = heapq.heappop(self.heap)
+            janitor = self.janitors[provider]
+            try:
+                if janitor.can_reap(resource_type):
+                    # The queued expiry is from the last reconcile (or an inventory TTL older);
+                    # the owner may have extended or removed it since.
+                    current = janitor.current_expiry(resource_type, resource_id)
+                    if current is None:
+                        print(f"    ℹ️ {resource_id}: expiry tag or resource gone, dropping it from the queue")
+                        continue
+                    if current != expiry_str:
+                        try:
+                            due = _to_timestamp(current)
+                        except (ValueError, OverflowError):
+                            print(f"    ⚠️ Ignoring {resource_id}: unparseable expiry '{current}'")
+                            continue
+                        expiry_str = current
+                        if due > now:
+                            print(f"    🔁 {resource_id}: expiry moved to {current}, re-queued")
+                            heapq.heappush(self.heap, (due, provider, resource_type, resource_id, expiry_str))
+                            continue
+                outcome = janitor.check_resource(resource_type, resource_id, expiry_str, self.dry_run)
+                if outcome not in ('deleted', 'would_delete'):
+                    continue
+                self.reaped.append({'provider': provider, 'resource_id': resource_id, 'reaped_at': _iso(time.time())})
+                del self.reaped[:-MAX_QUEUE_SNAPSHOT]
+            except Exception as e:
+                print(f"    ❌ Failed to reap {resource_id}: {e} (retrying in {self.retry_seconds}s)")
+                heapq.heappush(self.heap, (now + self.retry_seconds, provider, resource_type, resource_id, expiry_str))
+
+        self.check_deletions()
+
+    def check_deletions(self, wait=False):
+        """
+        Collects the outcome of asynchronous deletes (Azure). One status check per
+        call, so a slow deletion can't hold up other due resources; still-pending
+        ones are checked again at the next wakeup. wait=True (shutdown) blocks until they settle.
+        """
+        for janitor in self.janitors.values():
+            for resource_id, status in janitor.finalize(wait=wait).items():
+                if status != 'succeeded':
+                    print(f"    ⚠️ Deletion of {resource_id} {status}; it will be retried after the next reconcile")
+
+    def next_wakeup(self):
+        wakeup = min(self.heap[0][0], self.next_reconcile) if self.heap else self.next_reconcile
+        polls = [janitor.poll_interval for janitor in self.janitors.values() if janitor.deleting()]
+        if polls:
+            wakeup = min(wakeup, time.time() + min(polls))
+        return wakeup
+
+    def snapshot(self):
+        queue = heapq.nsmallest(MAX_QUEUE_SNAPSHOT, self.heap)
+        return {
+            'updated_at': _iso(time.time()),
+            'dry_run': self.dry_run,
+            'queued': len(self.heap),
+            'next_wakeup': _iso(self.next_wakeup()),
+            'last_reconcile': _iso(self.last_reconcile) if self.last_reconcile else None,
+            'next_reconcile': _iso(self.next_reconcile),
+            'queue': [
+                {'provider': p, 'resource_type': t, 'resource_id': r, 'expiry': e, 'due': _iso(d)}
+                for d, p, t, r, e in queue
+            ],
+            'recently_reaped': list(reversed(self.reaped)),
+        }
+
+    def write_state(self):
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def run_forever(self):
+        print(f"⏰ Janitor scheduler started (reconcile every {self.reconcile_seconds}s, dry_run={self.dry_run})")
+        while not self.stop_event.is_set():
+            if time.time() >= self.next_reconcile:
+                self.reconcile()
+            self.reap_due()
+            self.write_state()
+
+            wakeup = self.next_wakeup()
+            delay = max(0.0, wakeup - time.time())
+            if self.heap and self.heap[0][0] <= wakeup:
+                print(f"💤 Sleeping {delay:.0f}s until {self.heap[0][3]} expires")
+            elif wakeup < self.next_reconcile:
+                print(f"💤 Sleeping {delay:.0f}s until the next deletion status check")
+            else:
+                print(f"💤 Sleeping {delay:.0f}s until next reconcile")
+            self.stop_event.wait(delay)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def drain(self):
+        """On shutdown: waits for in-flight deletions so their outcome is reported."""
+        self.check_deletions(wait=True)
+        self.write_state()
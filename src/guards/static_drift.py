@@ -0,0 +1,159 @@
+import re
+import sys
+
+# ==========================================
+# 🔬 Static Drift Analyzer
+# ==========================================
+# Reads a unified diff line by line and looks only at what the PR adds: new
+# environment variables, CLI flags, FastAPI routes and public function
+# signatures. Each finding is checked against a token index of the README
+# built once per run. Fast enough to run over the whole diff before any model
+# call: chunks with no findings don't need the LLM at all, and it stands in
+# for the LLM when the provider is down.
+
+DOC_EXTENSIONS = ('.md', '.rst', '.txt')
+
+ENV_VAR = re.compile(r"""(?:os\.getenv|os\.environ\.get|os\.environ\.setdefault|getenv)\(\s*['"]([A-Z][A-Z0-9_]*)['"]|os\.environ\[\s*['"]([A-Z][A-Z0-9_]*)['"]\s*\]""")
+CLI_FLAG = re.compile(r"""(?:add_argument|option)\(\s*(?:['"]-[A-Za-z]['"]\s*,\s*)?['"](--[A-Za-z0-9][A-Za-z0-9\-_]*)['"]""")
+ROUTE = re.compile(r"""@\w+\.(get|post|put|patch|delete|websocket|api_route)\(\s*['"](/[^'"]*)['"]""")
+FUNCTION = re.compile(r"""^\s*(?:async\s+)?def\s+([A-Za-z][A-Za-z0-9_]*)\s*\(([^)]*)\)?""")
+
+# Cheap substring checks so most lines never reach a regex
+ENV_HINTS = ('environ', 'getenv')
+FLAG_HINTS = ('add_argument', 'option(')
+ROUTE_HINT = '@'
+FUNCTION_HINT = 'def '
+
+README_TOKEN = re.compile(r"--[A-Za-z0-9][A-Za-z0-9\-_]*|/[A-Za-z0-9_\-./{}<>:]+|[A-Za-z_][A-Za-z0-9_]*")
+PATH_PARAM = re.compile(r"\{[^}]*\}|<[^>]*>|:[A-Za-z_]\w*")
+
+def normalize_route(path):
+    """'/api/jobs/{job_id}', '/api/jobs/<id>' and '/api/jobs/:id' all become '/api/jobs/{}'."""
+    return PATH_PARAM.sub('{}', path).rstrip('/') or '/'
+
+class ReadmeTokens:
+    """Token index of the README: identifiers, --flags and /routes, for O(1) membership checks."""
+
+    def __init__(self, readme_content):
+        self.tokens = set()
+        self.routes = set()
+        for token in README_TOKEN.findall(readme_content):
+            if token.startswith('/'):
+                self.routes.add(normalize_route(token.rstrip('.,:;)')))
+            else:
+                self.tokens.add(token)
+
+    def documents(self, kind, name):
+        if kind == 'route':
+            return normalize_route(name) in self.routes
+        return name in self.tokens
+
+def iter_changes(lines):
+    """
+    Yields (filename, sign, text) for every added ('+') or removed ('-') line
+    of a unified diff, skipping documentation files. `lines` can be any
+    iterable of lines, so a streamed response works as well as a string split.
+    """
+    filename, skip = None, False
+    for line in lines:
+        if line.startswith('diff --git '):
+            filename = line.rsplit(' b/', 1)[-1]
+            skip = filename.lower().endswith(DOC_EXTENSIONS)
+        elif line.startswith('+++ ') or line.startswith('--- '):
+            continue
+        elif skip or filename is None:
+            continue
+        elif line.startswith('+') or line.startswith('-'):
+            yield filename, line[0], line[1:]
+
+def analyze_diff(diff_text, readme_tokens):
+    """
+    Returns {'findings': [...], 'undocumented': [...]}. Each finding is
+    {'kind', 'name', 'file', 'detail'} with kind one of env_var, cli_flag,
+    route, signature (changed) or function (new public function). Undocumented
+    findings are env vars, flags and routes the README never mentions, plus
+    changed signatures of functions the README does mention.
+    """
+    lines = diff_text.split('\n') if isinstance(diff_text, str) else diff_text
+    findings = []
+    seen = set()
+    added_defs, removed_defs = {}, {}
+
+    def add(kind, name, filename, detail=''):
+        key = (kind, name)
+        if key not in seen:
+            seen.add(key)
+            findings.append({'kind': kind, 'name': name, 'file': filename, 'detail': detail})
+
+    for filename, sign, text in iter_changes(lines):
+        if FUNCTION_HINT in text:
+            match = FUNCTION.match(text)
+            if match and not match.group(1).startswith('_'):
+                defs = added_defs if sign == '+' else removed_defs
+                defs[(filename, match.group(1))] = ' '.join(match.group(2).split())
+        if sign != '+':
+            continue
+
+        if any(hint in text for hint in ENV_HINTS):
+            for match in ENV_VAR.finditer(text):
+                add('env_var', match.group(1) or match.group(2), filename)
+        if any(hint in text for hint in FLAG_HINTS):
+            for match in CLI_FLAG.finditer(text):
+                add('cli_flag', match.group(1), filename)
+        if ROUTE_HINT in text:
+            for match in ROUTE.finditer(text):
+                add('route', match.group(2), filename, match.group(1).upper())
+
+    for (filename, name), params in added_defs.items():
+        if (filename, name) not in removed_defs:
+            add('function', name, filename, f"({params})")
+        elif removed_defs[(filename, name)] != params:
+            add('signature', name, filename, f"({removed_defs[(filename, name)]}) -> ({params})")
+
+    undocumented = []
+    for finding in findings:
+        if finding['kind'] == 'function':
+            continue
+        documented = readme_tokens.documents(finding['kind'], finding['name'])
+        # A signature change only matters if the README describes that function
+        if documented == (finding['kind'] == 'signature'):
+            undocumented.append(finding)
+
+    return {'findings': findings, 'undocumented': undocumented}
+
+def describe(finding):
+    labels = {
+        'env_var': 'environment variable',
+        'cli_flag': 'CLI flag',
+        'route': 'API route',
+        'signature': 'documented function signature changed',
+        'function': 'new public function',
+    }
+    detail = f" {finding['detail']}" if finding['detail'] else ''
+    return f"{labels[finding['kind']]} `{finding['name']}`{detail} ({finding['file']})"
+
+def verdict(report):
+    """Turns an analyze_diff() report into a Doc-Guard verdict dict."""
+    if not report['undocumented']:
+        return {
+            "status": "PASS",
+            "reason": f"[Static Analyzer] {len(report['findings'])} interface changes found, all reflected in the README.",
+            "suggested_doc_edit": ""
+        }
+    items = [describe(finding) for finding in report['undocumented']]
+    return {
+        "status": "FAIL",
+        "reason": "[Static Analyzer] README does not cover: " + "; ".join(items) + ".",
+        "suggested_doc_edit": "\n".join(f"- Document the {item}" for item in items)
+    }
+
+if __name__ == "__main__":
+    # Usage: git diff main... | python src/guards/static_drift.py README.md
+    readme_path = sys.argv[1] if len(sys.argv) > 1 else 'README.md'
+    with open(readme_path, 'r', encoding='utf-8') as f:
+        tokens = ReadmeTokens(f.read())
+    result = verdict(analyze_diff((line.rstrip('\n') for line in sys.stdin), tokens))
+    print(f"{result['status']}: {result['reason']}")
+    if result['suggested_doc_edit']:
+        print(result['suggested_doc_edit'])
+    sys.exit(1 if result['status'] == 'FAIL' else 0)
@@ -0,0 +1,142 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+
+# ==========================================
+# 🗄️ AI Doc-Guard Verdict Cache
+# ==========================================
+# Verdicts are stored under a hash of everything that shapes the prompt: the
+# normalized diff, the README, the model and the prompt version. A force-push
+# or rebase that leaves the change itself untouched maps to the same key, so
+# the LLM isn't asked again. One JSON file per verdict; a hit refreshes the
+# file's mtime, and the least recently used files are evicted once the
+# directory grows past its size budget. The size is tracked in memory (seeded
+# by one directory walk), so only an eviction walks the directory, and it
+# trims to LOW_WATER of the budget so the next one is many writes away.
+
+LOW_WATER = 0.8
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@')
+
+def normalize_diff(diff_text):
+    """
+    Drops the parts of a unified diff that change on a rebase without the
+    change itself changing: blob hashes on 'index' lines, hunk line numbers,
+    trailing whitespace and line-ending style.
+    """
+    lines = []
+    for line in diff_text.replace('\r\n', '\n').split('\n'):
+        if line.startswith('index '):
+            continue
+        line = HUNK_HEADER.sub('@@', line)
+        lines.append(line.rstrip())
+    return '\n'.join(lines).strip() + '\n'
+
+def verdict_key(diff_text, readme_content, model, prompt_version):
+    h = hashlib.sha256()
+    for part in (prompt_version, model, readme_content, diff_text):
+        data = str(part).encode('utf-8')
+        # Length-prefix each part so boundaries can't shift between fields
+        h.update(len(data).to_bytes(8, 'big'))
+        h.update(data)
+    return h.hexdigest()
+
+def open_cache(config):
+    """Builds the cache from the ai_doc_check `cache` block, or None if not configured."""
+    settings = (config or {}).get('cache')
+    if not settings or not settings.get('path'):
+        return None
+    return VerdictCache(
+        settings['path'],
+        max_bytes=int(float(settings.get('max_mb', 50)) * 1024 * 1024),
+        ttl_seconds=float(settings.get('ttl_hours', 168)) * 3600
+    )
+
+class VerdictCache:
+    def __init__(self, path, max_bytes=50 * 1024 * 1024, ttl_seconds=7 * 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.total = None  # Bytes on disk, as far as this process knows; None until the first put
+        self.lock = threading.Lock()  # Doc-Guard judges chunks concurrently
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """Returns the cached verdict dict, or None on a miss or an expired entry."""
+        path = self._file(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get('stored_at', 0) > self.ttl_seconds:
+            self._remove(path)
+            return None
+
+        os.utime(path)  # Mark as recently used for LRU eviction
+        return entry.get('verdict')
+
+    def put(self, key, verdict):
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'stored_at': time.time(), 'verdict': verdict}, f)
+        size = os.path.getsize(tmp_path)
+
+        # Publish under the lock: a concurrent seed scan or eviction must not
+        # see the file on disk before its size is added to the total
+        with self.lock:
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            if self.total is None:
+                self.total = self._scan()[1]
+            else:
+                self.total += size - replaced
+            if self.total > self.max_bytes:
+                self.evict()
+
+    def _scan(self):
+        """([(mtime, size, path)], total bytes) for every entry on disk."""
+        entries = []
+        total = 0
+        for root, _, names in os.walk(self.path):
+            for name in names:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # Evicted or expired by another worker since the listing
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return entries, total
+
+    def evict(self):
+        """Removes least recently used entries until the cache is back under LOW_WATER of its budget."""
+        entries, total = self._scan()
+        target = self.max_bytes * LOW_WATER
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            self._remove(path)  # Already gone (another worker) counts as removed too
+            total -= size
+            removed += 1
+        self.total = total
+        return removed
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,122 @@
+import time
+import uuid
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+# 🧵 Background Job Runner
+# ==========================================
+# Long-running work (janitor scans and cleanups) started from the API runs on a
+# bounded thread pool, away from the event loop. Each job records an ordered
+# list of progress events that clients poll or stream. Submitting work whose
+# key matches a queued/running job attaches to that job instead of duplicating it.
+
+MAX_EVENTS_PER_JOB = 2000
+
+class Job:
+    def __init__(self, kind, key):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.key = key
+        self.status = 'queued'  # queued | running | succeeded | failed
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.events = []
+        self.dropped_events = 0
+        self.lock = threading.Lock()
+
+    def emit(self, event_type, **data):
+        """Appends a progress event. Safe to call from any thread."""
+        with self.lock:
+            seq = self.dropped_events + len(self.events) + 1
+            self.events.append({'seq': seq, 'type': event_type, 'at': time.time(), **data})
+            # Keep memory bounded for very chatty jobs; seq numbers stay monotonic.
+            if len(self.events) > MAX_EVENTS_PER_JOB:
+                overflow = len(self.events) - MAX_EVENTS_PER_JOB
+                del self.events[:overflow]
+                self.dropped_events += overflow
+
+    def events_after(self, seq):
+        with self.lock:
+            return [event for event in self.events if event['seq'] > seq]
+
+    @property
+    def done(self):
+        return self.status in ('succeeded', 'failed')
+
+    def to_dict(self, include_result=True):
+        data = {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+            'last_event': self.events[-1] if self.events else None,
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+class JobManager:
+    def __init__(self, max_workers=2, history=50):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="driftguard-job")
+        self.history = history
+        self.jobs = OrderedDict()  # id -> Job, oldest first
+        self.active = {}           # dedupe key -> Job still queued or running
+        self.lock = threading.Lock()
+
+    def submit(self, kind, key, fn):
+        """
+        Queues `fn(job)` unless a job with the same key is queued or running.
+        Returns (job, created).
+        """
+        with self.lock:
+            existing = self.active.get(key)
+            if existing is not None and not existing.done:
+                return existing, False
+
+            job = Job(kind, key)
+            self.jobs[job.id] = job
+            self.active[key] = job
+            self._trim()
+
+        job.emit('queued')
+        self.executor.submit(self._run, job, fn)
+        return job, True
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self):
+        return list(reversed(self.jobs.values()))
+
+    def _run(self, job, fn):
+        job.status = 'running'
+        job.started_at = time.time()
+        job.emit('started')
+        try:
+            job.result = fn(job)
+            job.status = 'succeeded'
+        except Exception as e:
+            traceback.print_exc()
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+            job.emit('finished', status=job.status, error=job.error)
+            with self.lock:
+                if self.active.get(job.key) is job:
+                    del self.active[job.key]
+
+    def _trim(self):
+        # Forget the oldest finished jobs beyond the history limit
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(self.jobs) - self.history)]:
+            del self.jobs[job_id]
@@ -0,0 +1,272 @@
+import os
+import sys
+import glob
+import gzip
+import json
+import time
+import atexit
+import threading
+import contextvars
+from collections import deque
+
+# ==========================================
+# 📜 Structured Event Log
+# ==========================================
+# Guards and the engine emit events ({offset, at, level, message, stage,
+# provider, resource, duration, ...}) instead of bare prints. Events go into a
+# bounded in-memory ring and, when a directory is configured, are rotated into
+# gzipped JSON-lines segments so a client can resume from an older offset
+# without the process holding more than the ring in memory:
+#
+#   DRIFTGUARD_LOG_DIR=.driftguard/logs   write segments here (the API defaults to this)
+#   DRIFTGUARD_LOG_BUFFER=5000            events kept in memory
+#
+# Offsets increase by one per event and continue across restarts from the
+# newest segment on disk, so they work as a resume cursor. One process should
+# own a segment directory.
+#
+# Code that still prints is covered by capture_stdout(): each printed line
+# becomes an event (level guessed from its emoji) carrying whatever context
+# bind() set, e.g. the running stage.
+
+LEVELS = ('debug', 'info', 'warn', 'error')
+SEGMENT_EVENTS = 1000
+MAX_SEGMENTS = 50
+READ_LIMIT = 500
+ERROR_MARKERS = ('❌', '💥', '⛔')
+WARN_MARKERS = ('⚠️', '⏰')
+
+_context = contextvars.ContextVar('driftguard_log_context', default={})
+_console = None  # The real stdout once capture_stdout() has replaced sys.stdout
+
+def _echo(message):
+    stream = _console or sys.stdout
+    stream.write(message + '\n')
+    stream.flush()
+
+class EventLog:
+    def __init__(self, capacity=5000, directory=None, segment_events=SEGMENT_EVENTS, max_segments=MAX_SEGMENTS):
+        self.segment_events = segment_events
+        self.max_segments = max_segments
+        # Every event not yet in a segment must still be in the ring
+        self.ring = deque(maxlen=max(capacity, segment_events))
+        self.pending = []
+        self.directory = directory
+        self.next_offset = 1
+        self.counts = {level: 0 for level in LEVELS}  # Since startup
+        self.stage_counts = {}
+        self.lock = threading.Lock()
+        if directory:
+            try:
+                os.makedirs(directory, exist_ok=True)
+                segments = self._segments()
+                if segments:
+                    self.next_offset = segments[-1][1] + 1
+                atexit.register(self.flush)
+            except OSError as e:
+                _echo(f"⚠️ Event log directory {directory} unusable ({e}); keeping events in memory only.")
+                self.directory = None
+
+    def append(self, record):
+        with self.lock:
+            record['offset'] = self.next_offset
+            self.next_offset += 1
+            self.ring.append(record)
+            self.counts[record['level']] = self.counts.get(record['level'], 0) + 1
+            stage = record.get('stage')
+            if stage:
+                self.stage_counts[stage] = self.stage_counts.get(stage, 0) + 1
+            if self.directory:
+                self.pending.append(record)
+                if len(self.pending) >= self.segment_events:
+                    self._rotate()
+        return record
+
+    # --- Segments ---
+    def _segments(self):
+        """[(first_offset, last_offset, path)] on disk, oldest first."""
+        segments = []
+        for path in glob.glob(os.path.join(self.directory, 'segment-*.jsonl.gz')):
+            try:
+                first, last = os.path.basename(path)[len('segment-'):-len('.jsonl.gz')].split('-')
+                segments.append((int(first), int(last), path))
+            except ValueError:
+                continue
+        return sorted(segments)
+
+    def _rotate(self):
+        # Caller holds the lock
+        if not self.pending:
+            return
+        first, last = self.pending[0]['offset'], self.pending[-1]['offset']
+        path = os.path.join(self.directory, f"segment-{first:012d}-{last:012d}.jsonl.gz")
+        try:
+            with gzip.open(f"{path}.tmp", 'wt', encoding='utf-8', compresslevel=6) as f:
+                for record in self.pending:
+                    f.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+            os.replace(f"{path}.tmp", path)
+            for _, _, old in self._segments()[:-self.max_segments]:
+                os.remove(old)
+        except OSError as e:
+            _echo(f"⚠️ Could not write event segment {path}: {e}")
+        self.pending = []
+
+    def flush(self):
+        """Writes buffered events to a (possibly short) segment."""
+        with self.lock:
+            if self.directory:
+                self._rotate()
+
+    # --- Reading ---
+    def read(self, after=0, stages=None, levels=None, providers=None, limit=READ_LIMIT):
+        """
+        Events with offset > `after` that match every given filter (sets of
+        values), oldest first, at most `limit`. Returns {'events', 'cursor',
+        'missed'}; pass `cursor` back as `after` to continue. The cursor moves
+        past non-matching events too, so filtered readers don't rescan them.
+        `missed` counts events after `after` that were already rotated away.
+        """
+        def matches(event):
+            return ((not stages or event.get('stage') in stages)
+                    and (not levels or event['level'] in levels)
+                    and (not providers or event.get('provider') in providers))
+
+        with self.lock:
+            ring = list(self.ring)
+            newest = self.next_offset - 1
+        ring_first = ring[0]['offset'] if ring else newest + 1
+        cursor = min(after, newest)
+        events = []
+        missed = 0
+
+        if cursor + 1 < ring_first:
+            segments = self._segments() if self.directory else []
+            missed = max(0, (segments[0][0] if segments else ring_first) - cursor - 1)
+            # Older than the ring: replay segments from disk, skipping ones entirely before the cursor
+            for first, last, path in segments:
+                if last <= cursor or first >= ring_first:
+                    continue
+                try:
+                    with gzip.open(path, 'rt', encoding='utf-8') as f:
+                        for line in f:
+                            event = json.loads(line)
+                            if event['offset'] <= cursor:
+                                continue
+                            cursor = event['offset']
+                            if matches(event):
+                                events.append(event)
+                                if len(events) >= limit:
+                                    return {'events': events, 'cursor': cursor, 'missed': missed}
+                except (OSError, EOFError, ValueError):
+                    continue  # Pruned or half-written while we read; the ring covers what's left
+
+        for event in ring:
+            if event['offset'] <= cursor:
+                continue
+            cursor = event['offset']
+            if matches(event):
+                events.append(event)
+                if len(events) >= limit:
+                    break
+        return {'events': events, 'cursor': cursor, 'missed': missed}
+
+    def stats(self):
+        with self.lock:
+            return {
+                'newest': self.next_offset - 1,
+                'buffered': len(self.ring),
+                'capacity': self.ring.maxlen,
+                'levels': dict(self.counts),
+                'stages': dict(self.stage_counts),
+                'directory': self.directory,
+            }
+
+_log = EventLog(capacity=int(os.getenv('DRIFTGUARD_LOG_BUFFER', '5000')), directory=os.getenv('DRIFTGUARD_LOG_DIR'))
+
+def configure(directory=None, capacity=None):
+    """Replaces the process event log (call once at startup, before events are emitted)."""
+    global _log
+    _log = EventLog(capacity=capacity or int(os.getenv('DRIFTGUARD_LOG_BUFFER', '5000')), directory=directory)
+    return _log
+
+def get_log():
+    return _log
+
+# ==========================================
+# ✍️ Emitting
+# ==========================================
+class _Bound:
+    def __init__(self, fields):
+        self.fields = fields
+
+    def __enter__(self):
+        self.token = _context.set({**_context.get(), **self.fields})
+        return self
+
+    def __exit__(self, *exc):
+        _context.reset(self.token)
+        return False
+
+def bind(**fields):
+    """`with logs.bind(stage='janitor_cleanup'):` adds fields to every event emitted inside the block."""
+    return _Bound(fields)
+
+def propagate(fn):
+    """Wraps `fn` so it runs with the caller's bound fields, for work handed to pools and threads."""
+    fields = _context.get()
+
+    def run(*args, **kwargs):
+        token = _context.set(fields)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _context.reset(token)
+    return run
+
+def event(message, level='info', echo=True, **fields):
+    """
+    Records a structured event and (by default) prints `message` as before.
+    Common fields: stage, provider, resource, duration (seconds), outcome.
+    """
+    record = {'at': time.time(), 'level': level, 'message': message.strip(), **_context.get()}
+    record.update((k, v) for k, v in fields.items() if v is not None)
+    if echo:
+        _echo(message)
+    return _log.append(record)
+
+def level_of(line):
+    text = line.lstrip()
+    if text.startswith(ERROR_MARKERS):
+        return 'error'
+    if text.startswith(WARN_MARKERS):
+        return 'warn'
+    return 'info'
+
+class _StdoutTee:
+    """Forwards writes to the real stdout and turns each complete line into an event."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()  # Partial line per thread; print() writes text and '\n' separately
+
+    def write(self, text):
+        self.stream.write(text)
+        buffered = getattr(self.local, 'partial', '') + text
+        *lines, self.local.partial = buffered.split('\n')
+        for line in lines:
+            if line.strip():
+                event(line, level=level_of(line), echo=False, source='stdout')
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+def capture_stdout():
+    """Routes print() output into the event log as well as the console (idempotent)."""
+    global _console
+    if _console is None:
+        _console = sys.stdout
+        sys.stdout = _StdoutTee(sys.stdout)
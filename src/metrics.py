@@ -0,0 +1,284 @@
+import os
+import json
+import time
+import atexit
+import threading
+
+# ==========================================
+# 📈 Metrics & Tracing
+# ==========================================
+# Counters, latency histograms and trace spans for the engine, the guards and
+# the API. Exposed in the Prometheus text format (`/metrics`) and, for CLI
+# runs, written as a JSON trace file when the process exits.
+#
+#   DRIFTGUARD_METRICS=1                     collect (the API serves /metrics)
+#   DRIFTGUARD_TRACE=.driftguard/trace.json  collect, and write a trace on exit
+#
+# Disabled (the default), every call returns after one flag check and timers
+# are a shared no-op object, so instrumented hot paths cost next to nothing.
+
+TRACE_PATH = os.getenv('DRIFTGUARD_TRACE')
+ENABLED = bool(os.getenv('DRIFTGUARD_METRICS') or TRACE_PATH)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+MAX_SPANS = 10000
+THROTTLE_CODES = ('Throttling', 'ThrottlingException', 'SlowDown', 'TooManyRequestsException', 'RequestLimitExceeded')
+
+# name -> (type, help); only families listed here are rendered with HELP/TYPE lines
+FAMILIES = {
+    'driftguard_stage_runs_total': ('counter', "Policy stages run, by stage and outcome."),
+    'driftguard_stage_seconds': ('histogram', "Policy stage duration."),
+    'driftguard_cloud_api_calls_total': ('counter', "Cloud provider API calls, by provider, operation and outcome."),
+    'driftguard_cloud_api_seconds': ('histogram', "Cloud provider API call latency."),
+    'driftguard_cloud_retries_total': ('counter', "Cloud API retries made by the SDK (mostly throttling)."),
+    'driftguard_cloud_throttled_total': ('counter', "Cloud API calls that failed with a throttling error."),
+    'driftguard_llm_calls_total': ('counter', "LLM calls, by model and outcome."),
+    'driftguard_llm_seconds': ('histogram', "LLM call latency."),
+    'driftguard_llm_fallback_total': ('counter', "Verdicts produced by the static fallback because the LLM failed."),
+    'driftguard_verdicts_total': ('counter', "Doc-Guard chunk verdicts, by source (static, cache, llm)."),
+    'driftguard_dispatch_attempts_total': ('counter', "Cross-repo dispatch attempts, by outcome."),
+    'driftguard_dispatch_seconds': ('histogram', "Cross-repo dispatch attempt latency."),
+    'driftguard_github_requests_total': ('counter', "GitHub API requests, by status code."),
+    'driftguard_github_paced_seconds_total': ('counter', "Time spent waiting to stay under the GitHub rate limit."),
+    'driftguard_http_requests_total': ('counter', "API requests served, by route, method and status."),
+    'driftguard_http_request_seconds': ('histogram', "API request latency, by route."),
+}
+
+_lock = threading.Lock()
+_counters = {}    # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts..., +Inf count, sum]
+_spans = []
+_dropped_spans = 0
+_started_at = time.time()
+
+def enable(on=True):
+    """Turns collection on or off for this process (e.g. from a CLI flag)."""
+    global ENABLED
+    ENABLED = on
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def inc(name, value=1, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name, seconds, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(DEFAULT_BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(DEFAULT_BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+        hist[-2] += 1
+        hist[-1] += seconds
+
+class _Noop:
+    """Stands in for timers and spans while collection is disabled."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+NOOP = _Noop()
+
+class _Timer:
+    __slots__ = ('name', 'labels', 'started')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+def timer(name, **labels):
+    """`with metrics.timer('x_seconds', op='y'):` observes the block's duration."""
+    return _Timer(name, labels) if ENABLED else NOOP
+
+class _Span:
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.started = time.time()
+        self.perf = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _dropped_spans
+        record = {
+            'name': self.name,
+            'start': round(self.started - _started_at, 6),
+            'duration': round(time.perf_counter() - self.perf, 6),
+            'thread': threading.current_thread().name,
+            **self.attrs,
+        }
+        if exc_type is not None:
+            record['error'] = f"{exc_type.__name__}: {exc}"
+        with _lock:
+            if len(_spans) < MAX_SPANS:
+                _spans.append(record)
+            else:
+                _dropped_spans += 1
+        return False
+
+def span(name, **attrs):
+    """`with metrics.span('stage', stage=name) as s:` records a trace span; `s.set(...)` adds attributes."""
+    return _Span(name, attrs) if ENABLED else NOOP
+
+class _CloudCall:
+    __slots__ = ('provider', 'operation', 'started')
+
+    def __init__(self, provider, operation):
+        self.provider = provider
+        self.operation = operation
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe('driftguard_cloud_api_seconds', time.perf_counter() - self.started,
+                provider=self.provider, operation=self.operation)
+        outcome = 'ok'
+        if exc_type is not None:
+            # A 404 while polling a deletion is the expected answer, not a failure
+            status = getattr(exc, 'status_code', None) or getattr(exc, 'code', None)
+            outcome = 'not_found' if status == 404 else 'error'
+            if status == 429:
+                inc('driftguard_cloud_throttled_total', provider=self.provider, operation=self.operation)
+        inc('driftguard_cloud_api_calls_total', provider=self.provider, operation=self.operation, outcome=outcome)
+        return False
+
+def cloud_call(provider, operation):
+    """Times and counts one SDK call: `with metrics.cloud_call('gcp', 'buckets.list'):`."""
+    return _CloudCall(provider, operation) if ENABLED else NOOP
+
+def instrument_boto_client(client, provider='aws'):
+    """Counts and times every call a boto3 client makes, including SDK retries and throttling."""
+    if not ENABLED:
+        return client
+
+    def before(context, **kwargs):
+        context['driftguard_started'] = time.perf_counter()
+
+    def after(context, model, parsed, **kwargs):
+        operation = model.name
+        started = context.pop('driftguard_started', None)
+        if started is not None:
+            observe('driftguard_cloud_api_seconds', time.perf_counter() - started, provider=provider, operation=operation)
+        code = (parsed.get('Error') or {}).get('Code')
+        # NoSuchTagSet and friends are answers (an untagged bucket), not failures
+        outcome = 'ok' if not code else 'not_found' if code.startswith('NoSuch') else 'error'
+        inc('driftguard_cloud_api_calls_total', provider=provider, operation=operation, outcome=outcome)
+        retries = (parsed.get('ResponseMetadata') or {}).get('RetryAttempts', 0)
+        if retries:
+            inc('driftguard_cloud_retries_total', retries, provider=provider, operation=operation)
+        if code in THROTTLE_CODES:
+            inc('driftguard_cloud_throttled_total', provider=provider, operation=operation)
+
+    # unique_id: instrumenting a client twice (cached fan-out clients are reused
+    # by every janitor built on them) must not count its calls twice
+    client.meta.events.register('before-call', before, unique_id='driftguard-metrics-before')
+    client.meta.events.register('after-call', after, unique_id='driftguard-metrics-after')
+    return client
+
+# ==========================================
+# 📤 Export
+# ==========================================
+def _labels_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+def render_prometheus():
+    """Every metric in the Prometheus text exposition format (0.0.4)."""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, list(hist)) for key, hist in _histograms.items())
+
+    lines, described = [], set()
+
+    def describe(name, default_type):
+        if name not in described:
+            described.add(name)
+            metric_type, help_text = FAMILIES.get(name, (default_type, ''))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+    for (name, labels), value in counters:
+        describe(name, 'counter')
+        lines.append(f"{name}{_labels_text(labels)} {value}")
+    for (name, labels), hist in histograms:
+        describe(name, 'histogram')
+        for bound, count in zip(DEFAULT_BUCKETS, hist):
+            lines.append(f"{name}_bucket{_labels_text(labels, [('le', bound)])} {count}")
+        lines.append(f"{name}_bucket{_labels_text(labels, [('le', '+Inf')])} {hist[-2]}")
+        lines.append(f"{name}_sum{_labels_text(labels)} {hist[-1]:.6f}")
+        lines.append(f"{name}_count{_labels_text(labels)} {hist[-2]}")
+    return '\n'.join(lines) + '\n'
+
+def snapshot():
+    """Counters and histogram count/sum as plain JSON-able dicts."""
+    with _lock:
+        return {
+            'counters': [{'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in sorted(_counters.items())],
+            'timers': [
+                {'name': name, 'labels': dict(labels), 'count': hist[-2], 'sum_seconds': round(hist[-1], 6)}
+                for (name, labels), hist in sorted(_histograms.items())
+            ],
+        }
+
+def write_trace(path):
+    """Writes the spans and a metrics snapshot as JSON. Returns the path."""
+    with _lock:
+        spans, dropped = list(_spans), _dropped_spans
+    trace = {
+        'started_at': _started_at,
+        'finished_at': time.time(),
+        'spans': spans,
+        'dropped_spans': dropped,
+        'metrics': snapshot(),
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(trace, f, indent=2, default=str)
+    return path
+
+def trace_on_exit():
+    """For CLI entrypoints: writes the trace to DRIFTGUARD_TRACE when the process exits (sys.exit included)."""
+    if not TRACE_PATH:
+        return
+
+    def flush():
+        try:
+            print(f"📈 Trace written to {write_trace(TRACE_PATH)}")
+        except OSError as e:
+            print(f"⚠️ Could not write trace {TRACE_PATH}: {e}")
+
+    atexit.register(flush)
@@ -0,0 +1,290 @@
+import os
+import copy
+import hashlib
+import threading
+from types import MappingProxyType
+from typing import NamedTuple
+
+import yaml
+
+# ==========================================
+# 📜 Policy Compiler
+# ==========================================
+# Parses policy.yaml once, validates it against the schema below (plus each
+# guard's required config keys from the registry), and produces an immutable
+# CompiledPolicy with an event -> stages index. Long-lived processes (the API)
+# keep the compiled policy and only recompile when the file's mtime/size and
+# content hash change.
+
+DEFAULT_POLICY_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'policy.yaml'))
+SECTIONS = ('stages', 'cleanup')  # PR events run `stages`; `closed` runs `cleanup`
+SEVERITIES = ('block', 'warning')
+CLOSE_EVENT = 'closed'
+
+STAGE_KEYS = {
+    'name': str,
+    'type': str,
+    'enabled': bool,
+    'severity': str,
+    'trigger_on': list,
+    'depends_on': (str, list),
+    'timeout_seconds': (int, float),
+    'config': dict,
+}
+
+class PolicyError(Exception):
+    """Raised when a policy doesn't parse or validate. `errors` lists every problem found."""
+
+    def __init__(self, errors, source=None):
+        self.errors = list(errors)
+        self.source = source
+        where = f" in {source}" if source else ""
+        super().__init__(f"Invalid policy{where}: " + "; ".join(self.errors))
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _thaw(value):
+    if isinstance(value, MappingProxyType):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return copy.copy(value)
+
+class Stage(NamedTuple):
+    name: str
+    type: str
+    enabled: bool
+    severity: str
+    trigger_on: frozenset
+    depends_on: tuple
+    timeout_seconds: float
+    config: MappingProxyType
+
+    def config_copy(self):
+        """A plain, mutable (and picklable) copy of the stage config for a guard to use."""
+        return _thaw(self.config)
+
+class CompiledPolicy:
+    """Read-only view of a validated policy. Build with compile_policy()."""
+
+    def __init__(self, raw, sections, digest, source=None):
+        self._raw = _freeze(raw)
+        self._sections = sections  # section -> tuple(Stage)
+        self.digest = digest
+        self.source = source
+        self.version = raw.get('version')
+        # (section, event) -> enabled stages triggered by it, in policy order
+        index = {}
+        for section, stages in sections.items():
+            for stage in stages:
+                if not stage.enabled:
+                    continue
+                for event in stage.trigger_on:
+                    index.setdefault((section, event), []).append(stage)
+        self._index = MappingProxyType({key: tuple(stages) for key, stages in index.items()})
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError("CompiledPolicy is immutable")
+        super().__setattr__(name, value)
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def section(self, name):
+        return self._sections.get(name, ())
+
+    def stages_for(self, action):
+        """Enabled stages triggered by a pull_request action (empty tuple if none)."""
+        section = 'cleanup' if action == CLOSE_EVENT else 'stages'
+        return self._index.get((section, action), ())
+
+    def stage(self, name):
+        """Finds a stage by name in any section, or None."""
+        for stages in self._sections.values():
+            for stage in stages:
+                if stage.name == name:
+                    return stage
+        return None
+
+    def events(self):
+        return sorted({event for _, event in self._index})
+
+    def summary(self):
+        return {
+            'version': self.version,
+            'digest': self.digest,
+            'sections': {
+                section: [
+                    {'name': s.name, 'type': s.type, 'enabled': s.enabled, 'severity': s.severity,
+                     'trigger_on': sorted(s.trigger_on), 'depends_on': list(s.depends_on)}
+                    for s in stages
+                ]
+                for section, stages in self._sections.items()
+            },
+            'events': {f"{section}:{event}": [s.name for s in stages] for (section, event), stages in self._index.items()},
+        }
+
+def find_cycle(graph):
+    """Returns the names left on a dependency cycle in {name: deps} (empty list if acyclic)."""
+    remaining = {name: set(deps) for name, deps in graph.items()}
+    while True:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            break
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return sorted(remaining)
+
+def _validate_stage(raw, where, errors):
+    if not isinstance(raw, dict):
+        errors.append(f"{where}: must be a mapping")
+        return None
+    for key, expected in STAGE_KEYS.items():
+        if key in raw and raw[key] is not None and not isinstance(raw[key], expected):
+            names = ' or '.join(t.__name__ for t in (expected if isinstance(expected, tuple) else (expected,)))
+            errors.append(f"{where}.{key}: expected {names}")
+    unknown = set(raw) - set(STAGE_KEYS)
+    if unknown:
+        errors.append(f"{where}: unknown keys {sorted(unknown)}")
+
+    name = raw.get('name')
+    if not isinstance(name, str) or not name:
+        errors.append(f"{where}.name: required")
+        return None
+    where = f"{where} ({name})"
+    severity = raw.get('severity', 'warning')
+    if severity not in SEVERITIES:
+        errors.append(f"{where}.severity: must be one of {', '.join(SEVERITIES)}")
+    trigger_on = raw.get('trigger_on') or []
+    if not isinstance(trigger_on, list) or not all(isinstance(e, str) for e in trigger_on):
+        errors.append(f"{where}.trigger_on: must be a list of event actions")
+        trigger_on = []
+    depends_on = raw.get('depends_on') or []
+    depends_on = [depends_on] if isinstance(depends_on, str) else depends_on
+    timeout = raw.get('timeout_seconds', 900)
+    if isinstance(timeout, (int, float)) and timeout <= 0:
+        errors.append(f"{where}.timeout_seconds: must be positive")
+    config = raw.get('config') or {}
+
+    # Guard-specific required config keys, declared alongside the guard
+    from src import registry
+    guard = registry.get(name)
+    if guard is None:
+        errors.append(f"{where}: no registered guard named '{name}'")
+    elif isinstance(config, dict):
+        for key in guard.required_config:
+            if key not in config:
+                errors.append(f"{where}.config.{key}: required by the {name} guard")
+
+    return Stage(
+        name=name,
+        type=raw.get('type') or '',
+        enabled=bool(raw.get('enabled', False)),
+        severity=severity if severity in SEVERITIES else 'warning',
+        trigger_on=frozenset(trigger_on),
+        depends_on=tuple(d for d in depends_on if isinstance(d, str)),
+        timeout_seconds=float(timeout) if isinstance(timeout, (int, float)) else 900.0,
+        config=_freeze(config if isinstance(config, dict) else {}),
+    )
+
+def compile_policy(source_text, source=None):
+    """Parses and validates policy YAML. Returns a CompiledPolicy or raises PolicyError."""
+    if isinstance(source_text, bytes):
+        source_text = source_text.decode('utf-8')
+    digest = hashlib.sha256(source_text.encode('utf-8')).hexdigest()
+    try:
+        raw = yaml.safe_load(source_text) or {}
+    except yaml.YAMLError as e:
+        raise PolicyError([f"YAML syntax error: {e}"], source)
+    if not isinstance(raw, dict):
+        raise PolicyError(["top level must be a mapping"], source)
+
+    errors = []
+    if 'version' in raw and not isinstance(raw['version'], (str, int, float)):
+        errors.append("version: expected a string")
+    sections = {}
+    for section in SECTIONS:
+        entries = raw.get(section) or []
+        if not isinstance(entries, list):
+            errors.append(f"{section}: must be a list of stages")
+            entries = []
+        stages = [
+            stage for stage in (_validate_stage(entry, f"{section}[{i}]", errors) for i, entry in enumerate(entries))
+            if stage is not None
+        ]
+        names = [stage.name for stage in stages]
+        for name in sorted({n for n in names if names.count(n) > 1}):
+            errors.append(f"{section}: duplicate stage name '{name}'")
+        for stage in stages:
+            for dep in stage.depends_on:
+                if dep not in names:
+                    errors.append(f"{section} ({stage.name}).depends_on: unknown stage '{dep}'")
+        cycle = find_cycle({stage.name: set(stage.depends_on) & set(names) for stage in stages})
+        if cycle:
+            errors.append(f"{section}: dependency cycle between {', '.join(cycle)}")
+        sections[section] = tuple(stages)
+
+    if errors:
+        raise PolicyError(errors, source)
+    return CompiledPolicy(raw, sections, digest, source)
+
+def load_policy(path=DEFAULT_POLICY_PATH):
+    with open(path, 'rb') as f:
+        return compile_policy(f.read(), source=path)
+
+def save_policy(path, content):
+    """Validates `content`, then replaces the file atomically. Returns the compiled policy."""
+    compiled = compile_policy(content, source=path)
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return compiled
+
+class PolicyCache:
+    """
+    Keeps the compiled policy for one file. get() only stats the file; it
+    re-reads when mtime/size change, and only recompiles when the content
+    hash changes too (e.g. a touch or an identical rewrite is free).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.compiled = None
+
+    def get(self):
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            if stamp != self.stamp:
+                with open(self.path, 'rb') as f:
+                    content = f.read()
+                if self.compiled is None or hashlib.sha256(content).hexdigest() != self.compiled.digest:
+                    self.compiled = compile_policy(content, source=self.path)
+                self.stamp = stamp
+            return self.compiled
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def cached_policy(path=DEFAULT_POLICY_PATH):
+    """Process-wide compiled policy for `path`, recompiled only when the file changes."""
+    path = os.path.abspath(path)
+    with _caches_lock:
+        cache = _caches.setdefault(path, PolicyCache(path))
+    return cache.get()
@@ -0,0 +1,124 @@
+import importlib
+import importlib.util
+import threading
+
+# ==========================================
+# 🧩 Guard Registry
+# ==========================================
+# Every guard is declared by name with a "module:function" target and the
+# third-party packages it needs. Nothing is imported until a stage or an API
+# endpoint first asks for the guard, so a cold start that only renders a page
+# never pays for boto3 or the Gemini SDK.
+#
+# Third-party guards register through the `driftguard.guards` entry point
+# group; the entry point name is the stage name used in policy.yaml:
+#
+#   [project.entry-points."driftguard.guards"]
+#   license_check = "my_package.guards:run"
+
+ENTRY_POINT_GROUP = "driftguard.guards"
+
+class Guard:
+    def __init__(self, name, target, requires=(), description="", required_config=()):
+        self.name = name
+        self.target = target            # "package.module:function"
+        self.requires = tuple(requires)  # Top-level imports the guard needs
+        self.description = description
+        self.required_config = tuple(required_config)  # Keys the policy must set in the stage's `config`
+        self._handler = None
+
+    @property
+    def module_name(self):
+        return self.target.split(':', 1)[0]
+
+    def missing(self):
+        """Required packages that aren't installed (checked without importing them)."""
+        missing = []
+        for name in self.requires:
+            try:
+                if importlib.util.find_spec(name) is None:
+                    missing.append(name)
+            except (ImportError, ValueError):
+                missing.append(name)
+        return missing
+
+    def module(self):
+        """Imports (once) and returns the guard's module."""
+        return importlib.import_module(self.module_name)
+
+    def load(self):
+        """Imports (once) and returns the guard's handler: handler(context, config)."""
+        if self._handler is None:
+            module_name, _, attr = self.target.partition(':')
+            self._handler = getattr(importlib.import_module(module_name), attr)
+        return self._handler
+
+    def __call__(self, context, config):
+        return self.load()(context, config)
+
+class EntryPointGuard(Guard):
+    """A guard contributed by another package; its entry point is resolved on first use."""
+
+    def __init__(self, entry_point):
+        super().__init__(entry_point.name, entry_point.value, description=f"entry point ({entry_point.value})")
+        self.entry_point = entry_point
+
+    def load(self):
+        if self._handler is None:
+            self._handler = self.entry_point.load()
+        return self._handler
+
+BUILTIN_GUARDS = [
+    Guard('ai_doc_check', 'src.guards.ai_sync:run', requires=('google.genai', 'requests'),
+          description="AI Doc-Guard: README drift against the PR diff"),
+    Guard('infrastructure_preview', 'src.guards.infra_preview:run',
+          description="Checks the infrastructure TTL policy", required_config=('ttl_hours',)),
+    Guard('cross_repo_safety', 'src.guards.cross_repo:run', requires=('requests',),
+          description="Dispatches integration tests to downstream repos", required_config=('downstream_repos',)),
+    Guard('janitor_cleanup', 'src.guards.janitor:cleanup_pr_resources', requires=('boto3', 'dateutil', 'yaml'),
+          description="Reaps a closed PR's cloud resources"),
+]
+
+_guards = {guard.name: guard for guard in BUILTIN_GUARDS}
+_entry_points_loaded = False
+_lock = threading.Lock()
+
+def _load_entry_points():
+    """Adds guards advertised by installed packages (once; built-ins win on name clashes)."""
+    global _entry_points_loaded
+    with _lock:
+        if _entry_points_loaded:
+            return
+        _entry_points_loaded = True
+        from importlib.metadata import entry_points
+        try:
+            found = entry_points(group=ENTRY_POINT_GROUP)
+        except TypeError:  # Python < 3.10
+            found = entry_points().get(ENTRY_POINT_GROUP, [])
+        for entry_point in found:
+            if entry_point.name not in _guards:
+                _guards[entry_point.name] = EntryPointGuard(entry_point)
+
+def register(name, target, requires=(), description="", required_config=()):
+    """Registers a guard in-process (e.g. from a plugin module). Returns the Guard."""
+    guard = Guard(name, target, requires, description, required_config)
+    with _lock:
+        _guards[name] = guard
+    return guard
+
+def get(name):
+    """Returns the Guard registered under `name`, or None."""
+    if name not in _guards:
+        _load_entry_points()
+    return _guards.get(name)
+
+def names():
+    _load_entry_points()
+    return sorted(_guards)
+
+def load_module(name):
+    """Imports the module behind a guard. Raises KeyError for unknown guards, ImportError if deps are missing."""
+    guard = get(name)
+    if guard is None:
+        raise KeyError(f"Unknown guard '{name}'")
+    return guard.module()
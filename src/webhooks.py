@@ -0,0 +1,195 @@
+import hmac
+import time
+import hashlib
+import threading
+import traceback
+from collections import OrderedDict, deque
+
+# ==========================================
+# 📬 Webhook Worker Pool
+# ==========================================
+# Lets the API process run the engine directly from GitHub `pull_request`
+# webhooks instead of waiting for an Actions runner to cold start. Deliveries
+# are verified, queued, and picked up by a fixed pool of warm worker threads
+# that keep guards, SDKs and HTTP pools loaded between events.
+#
+# Events for the same PR run one at a time, in arrival order. A `synchronize`
+# that arrives while an earlier `synchronize` for that PR is still queued
+# replaces it, so a burst of pushes only checks the newest head.
+
+SIGNATURE_HEADER = 'X-Hub-Signature-256'
+COALESCED_ACTIONS = ('synchronize',)
+STATUS_CONTEXT = 'DriftGuard'  # Commit status name; make it a required check to gate merges
+
+def verify_signature(secret, body, signature):
+    """Checks GitHub's `sha256=<hex>` HMAC of the raw request body (constant-time)."""
+    if not secret or not signature or not signature.startswith('sha256='):
+        return False
+    expected = 'sha256=' + hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+def post_commit_status(gh, event, state, description):
+    """
+    Sets the DriftGuard commit status on the event's head SHA (pending, success,
+    failure or error). Without it a failing `block` stage couldn't stop a merge,
+    since no Actions job exits non-zero. Returns False if it couldn't be posted.
+    """
+    if not event.head_sha:
+        return False
+    # Imported here so the signature checks don't pull in the HTTP client
+    from src import github_client
+    try:
+        gh.post(f"/repos/{event.repo_name}/statuses/{event.head_sha}", json={
+            'state': state,
+            'context': STATUS_CONTEXT,
+            'description': description[:140],  # GitHub's limit
+        })
+        return True
+    except (github_client.GitHubError, OSError) as e:
+        print(f"⚠️ Could not post the {state} status for {event.repo_name}@{event.head_sha[:7]}: {e}")
+        return False
+
+def status_for(results, blocked):
+    """(state, description) summarizing engine results for the commit status."""
+    if blocked:
+        failing = [name for name, r in results.items() if r['severity'] == 'block' and r['status'] != 'passed']
+        return 'failure', f"Blocked by {', '.join(failing)}"
+    counts = {}
+    for r in results.values():
+        counts[r['status']] = counts.get(r['status'], 0) + 1
+    return 'success', ', '.join(f"{n} {status}" for status, n in sorted(counts.items())) or "No stages ran"
+
+class WebhookEvent:
+    def __init__(self, delivery_id, action, repo_name, pr_number, head_sha=None):
+        self.delivery_id = delivery_id
+        self.action = action
+        self.repo_name = repo_name
+        self.pr_number = pr_number
+        self.head_sha = head_sha
+        self.received_at = time.time()
+        self.coalesced = []  # Delivery ids this event superseded
+
+    @property
+    def pr_key(self):
+        return (self.repo_name, self.pr_number)
+
+    def to_dict(self):
+        return {
+            'delivery_id': self.delivery_id,
+            'action': self.action,
+            'repo_name': self.repo_name,
+            'pr_number': self.pr_number,
+            'head_sha': self.head_sha,
+            'received_at': self.received_at,
+            'coalesced': list(self.coalesced),
+        }
+
+class WebhookWorkers:
+    """
+    Queue plus warm worker threads. `handler(event)` runs the engine for one
+    event and returns its results; it's called from worker threads only.
+    """
+
+    def __init__(self, handler, workers=2, history=100, warmup=None):
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.history = history
+        self.warmup = warmup
+        self.queue = deque()     # Pending events, oldest first
+        self.in_flight = set()   # PR keys a worker is currently processing
+        self.seen = OrderedDict()  # Recent delivery ids, so GitHub redeliveries aren't run twice
+        self.finished = deque(maxlen=history)
+        self.stats = {'received': 0, 'coalesced': 0, 'duplicates': 0, 'processed': 0, 'failed': 0}
+        self.cond = threading.Condition()
+        self.threads = []
+
+    def start(self):
+        """Starts the worker threads (idempotent). Runs `warmup()` first, in the background."""
+        with self.cond:
+            if self.threads:
+                return self
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._loop, daemon=True, name=f"driftguard-webhook-{i}")
+                self.threads.append(thread)
+        if self.warmup:
+            threading.Thread(target=self._warm, daemon=True, name="driftguard-webhook-warmup").start()
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def submit(self, event):
+        """Queues an event. Returns 'queued', 'coalesced' or 'duplicate'."""
+        with self.cond:
+            self.stats['received'] += 1
+            if event.delivery_id in self.seen:
+                self.stats['duplicates'] += 1
+                return 'duplicate'
+            self.seen[event.delivery_id] = True
+            while len(self.seen) > self.history * 10:
+                self.seen.popitem(last=False)
+
+            if event.action in COALESCED_ACTIONS:
+                for i, pending in enumerate(self.queue):
+                    if pending.pr_key == event.pr_key and pending.action == event.action:
+                        # Keep the older event's place in line, but check the newer head
+                        event.coalesced = pending.coalesced + [pending.delivery_id]
+                        self.queue[i] = event
+                        self.stats['coalesced'] += 1
+                        self.cond.notify()
+                        return 'coalesced'
+
+            self.queue.append(event)
+            self.cond.notify()
+            return 'queued'
+
+    def _next(self):
+        # Oldest event whose PR isn't already being processed by another worker
+        for i, event in enumerate(self.queue):
+            if event.pr_key not in self.in_flight:
+                del self.queue[i]
+                self.in_flight.add(event.pr_key)
+                return event
+        return None
+
+    def _loop(self):
+        while True:
+            with self.cond:
+                event = self._next()
+                while event is None:
+                    self.cond.wait()
+                    event = self._next()
+
+            started = time.time()
+            record = event.to_dict()
+            try:
+                record['results'] = self.handler(event)
+                record['status'] = 'succeeded'
+            except Exception as e:
+                traceback.print_exc()
+                record['status'] = 'failed'
+                record['error'] = str(e)
+            record['duration'] = round(time.time() - started, 3)
+
+            with self.cond:
+                self.in_flight.discard(event.pr_key)
+                self.finished.appendleft(record)
+                self.stats['processed' if record['status'] == 'succeeded' else 'failed'] += 1
+                # This PR's next event (if any) can now be picked up
+                self.cond.notify_all()
+
+    def _warm(self):
+        try:
+            self.warmup()
+        except Exception as e:
+            print(f"⚠️ Webhook worker warm-up failed: {e}")
+
+    def snapshot(self):
+        with self.cond:
+            return {
+                'workers': self.workers,
+                'running': len(self.threads) > 0,
+                'stats': dict(self.stats),
+                'queued': [event.to_dict() for event in self.queue],
+                'in_flight': [f"{repo}#{pr}" for repo, pr in sorted(self.in_flight)],
+                'recent': list(self.finished),
+            }
@@ -13,6 +13,11 @@ terraform {
 
 provider "aws" {
   region = "us-east-1"
+
+  # Injected into every resource this configuration creates
+  default_tags {
+    tags = local.driftguard_tags
+  }
 }
 
 resource "random_id" "bucket_suffix" {
@@ -24,6 +29,14 @@ locals {
   # but terraform's time_offset resource is better. strictly sticking to SRD 'Inject a tag').
   # For simplicity in this static file, we will require the tag to be passed in or default to a placeholder.
   # Real implementation would use an input variable for the timestamp.
+
+  # Ownership tags let the Janitor reap exactly this PR's resources when it closes
+  # (tag-filtered lookup on driftguard:pr + driftguard:repo) instead of sweeping the account.
+  driftguard_tags = {
+    "driftguard:expiry" = var.ttl_expiry
+    "driftguard:pr"     = var.pr_number
+    "driftguard:repo"   = var.repo_name
+  }
 }
 
 # Variable moved to variables.tf
@@ -32,9 +45,8 @@ resource "aws_s3_bucket" "ephemeral_env" {
   bucket = "driftguard-env-${random_id.bucket_suffix.hex}"
 
   tags = {
-    Name                 = "DriftGuard Ephemeral"
-    driftguard_ttl_expiry = var.ttl_expiry
-    Environment          = "Preview"
+    Name        = "DriftGuard Ephemeral"
+    Environment = "Preview"
   }
 }
 
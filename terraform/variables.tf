@@ -3,3 +3,24 @@ variable "ttl_expiry" {
   description = "ISO Timestamp for expiry"
   default     = "2024-12-31T23:59:59Z" # Placeholder default
 }
+
+# Required: without them the Janitor's PR cleanup can't find these resources
+variable "pr_number" {
+  type        = string
+  description = "Pull request that owns these resources (driftguard:pr tag)"
+
+  validation {
+    condition     = length(var.pr_number) > 0
+    error_message = "pr_number must be set to the pull request that owns these resources."
+  }
+}
+
+variable "repo_name" {
+  type        = string
+  description = "Repository (owner/name) that owns these resources (driftguard:repo tag)"
+
+  validation {
+    condition     = length(var.repo_name) > 0
+    error_message = "repo_name must be set to the repository (owner/name) that owns these resources."
+  }
+}
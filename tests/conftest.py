@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the project the way the engine does (`from src...`), and reuse
+# the in-process cloud and GitHub fakes that the benchmarks run against.
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+# moto never talks to AWS, but boto3 still wants credentials and a region
+for key, value in {'AWS_ACCESS_KEY_ID': 'testing', 'AWS_SECRET_ACCESS_KEY': 'testing',
+                   'AWS_SESSION_TOKEN': 'testing', 'AWS_DEFAULT_REGION': 'us-east-1'}.items():
+    os.environ[key] = value
+
+EXPIRED = "2020-01-01T00:00:00Z"
+FUTURE = "2099-01-01T00:00:00Z"
+
+@pytest.fixture
+def s3():
+    """A moto S3 client; everything created through it disappears after the test."""
+    moto = pytest.importorskip('moto')
+    import boto3
+    with moto.mock_aws():
+        yield boto3.client('s3', region_name='us-east-1')
+
+def make_buckets(s3, buckets):
+    """Creates moto buckets from {name: tags} ({} leaves the bucket untagged)."""
+    for name, tags in buckets.items():
+        s3.create_bucket(Bucket=name)
+        if tags:
+            s3.put_bucket_tagging(Bucket=name, Tagging={'TagSet': [{'Key': k, 'Value': v} for k, v in tags.items()]})
+
+@pytest.fixture
+def github(monkeypatch):
+    """A local FakeGitHub server that every guard's GitHub client talks to."""
+    from fake_github import FakeGitHub
+    from src import github_client
+    server = FakeGitHub().start()
+    monkeypatch.setenv('GITHUB_API_URL', server.url)
+    monkeypatch.setattr(github_client, '_CLIENTS', {})  # Pooled clients still point at the previous server
+    yield server
+    server.stop()
@@ -0,0 +1,106 @@
+import json
+import types
+import threading
+
+import pytest
+
+from src.guards import ai_sync
+
+README = "# App\n\n## Configuration\n\nSet `APP_PORT` to change the port.\n"
+
+def file_diff(name, line):
+    return (f"diff --git a/{name} b/{name}\n--- a/{name}\n+++ b/{name}\n"
+            f"@@ -1,2 +1,3 @@\n import os\n+{line}\n")
+
+FAIL = {'status': 'FAIL', 'reason': 'APP_PORT renamed', 'suggested_doc_edit': 'Mention APP_LISTEN_PORT'}
+
+class StubLLM:
+    """Stands in for google.genai: answers PASS (FAIL for prompts containing `fail_on`) and records every prompt."""
+
+    def __init__(self):
+        self.verdict = {'status': 'PASS', 'reason': 'stub', 'suggested_doc_edit': ''}
+        self.fail_on = None
+        self.prompts = []
+        self.lock = threading.Lock()
+        self.models = self
+
+    def Client(self, api_key=None):
+        return self
+
+    def generate_content(self, model, contents):
+        with self.lock:
+            self.prompts.append(contents)
+        verdict = FAIL if self.fail_on and self.fail_on in contents else self.verdict
+        return types.SimpleNamespace(text=json.dumps(verdict))
+
+@pytest.fixture
+def llm(monkeypatch):
+    stub = StubLLM()
+    monkeypatch.setattr(ai_sync, 'genai', stub)
+    return stub
+
+def run_guard(github, head_sha, files, config):
+    diff = ''.join(file_diff(name, line) for name, line in files.items())
+    github.add_pull('org/app', 1, head_sha, diff)
+    github.add_content('org/app', 'README.md', README)
+    context = {'token': 't', 'repo_name': 'org/app', 'pr_number': '1', 'gemini_key': 'k'}
+    ai_sync.run(context, {'readme_path': 'README.md', 'static_first_pass': False, **config})
+
+def judged(llm):
+    """Files named in the prompts sent so far."""
+    return sorted({line.rsplit(' b/', 1)[-1] for p in llm.prompts for line in p.split('\n') if line.strip().startswith('diff --git')})
+
+def test_only_files_touched_since_the_last_push_are_reanalyzed(github, llm, tmp_path):
+    config = {'incremental': True, 'state_path': str(tmp_path / 'state')}
+    files = {'a.py': "PORT = os.getenv('APP_PORT')", 'b.py': "x = 1", 'c.py': "y = 2"}
+    run_guard(github, 'sha1', files, config)
+    assert judged(llm) == ['a.py', 'b.py', 'c.py']
+
+    llm.prompts.clear()
+    github.add_compare('org/app', 'sha1', 'sha2', 'ahead', ['b.py'])
+    run_guard(github, 'sha2', {**files, 'b.py': "x = 2"}, config)
+
+    assert judged(llm) == ['b.py']
+
+@pytest.mark.parametrize('status, changed', [('diverged', ['b.py']), ('ahead', [f"f{i}.py" for i in range(ai_sync.COMPARE_FILE_LIMIT)])])
+def test_force_pushes_and_truncated_compares_reanalyze_everything(github, llm, tmp_path, status, changed):
+    config = {'incremental': True, 'state_path': str(tmp_path / 'state')}
+    files = {'a.py': "x = 1", 'b.py': "y = 2"}
+    run_guard(github, 'sha1', files, config)
+    llm.prompts.clear()
+
+    github.add_compare('org/app', 'sha1', 'sha2', status, changed)
+    run_guard(github, 'sha2', files, config)
+
+    assert judged(llm) == ['a.py', 'b.py']
+
+def big_diff(name, hunks, lines_per_hunk=20):
+    body = ''.join(
+        f"@@ -{h * 100},{lines_per_hunk} +{h * 100},{lines_per_hunk} @@\n" + ''.join(f"+value_{h}_{i} = {i}\n" for i in range(lines_per_hunk))
+        for h in range(hunks)
+    )
+    return f"diff --git a/{name} b/{name}\n--- a/{name}\n+++ b/{name}\n{body}"
+
+def test_large_sections_are_chunked_between_hunks_with_the_header_repeated():
+    section = big_diff('app.py', hunks=10)
+
+    chunks = ai_sync.chunk_file('app.py', section, max_chars=1000)
+
+    assert len(chunks) > 1
+    assert chunks[0][0] == f"app.py (part 1/{len(chunks)})"
+    assert all(text.startswith('diff --git a/app.py b/app.py') and len(text) <= 1000 for _, text in chunks)
+    assert sum(text.count('@@ -') for _, text in chunks) == 10
+
+def test_oversized_hunks_are_truncated():
+    (_, text), = ai_sync.chunk_file('app.py', big_diff('app.py', hunks=1, lines_per_hunk=500), max_chars=500)
+
+    assert len(text) <= 500 and text.endswith('... (hunk truncated)\n')
+
+def test_one_failing_chunk_fails_the_file(llm):
+    analyzer = ai_sync.DocAnalyzer({'static_first_pass': False, 'max_chunk_chars': 1000, 'max_concurrency': 4}, README, 'k')
+    llm.fail_on = 'value_7_'  # Only the chunk holding hunk 7
+
+    verdicts = analyzer.judge_files({'app.py': big_diff('app.py', hunks=10), 'small.py': file_diff('small.py', 'x = 1')})
+
+    assert verdicts['app.py']['status'] == 'FAIL' and 'APP_PORT renamed' in verdicts['app.py']['reason']
+    assert verdicts['small.py']['status'] == 'PASS'
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+import bench_scale
+
+def test_every_scenario_has_a_baseline():
+    with open(bench_scale.BASELINE_PATH) as f:
+        baseline = json.load(f)
+
+    assert set(baseline['scenarios']) == set(bench_scale.SCENARIOS)
+
+def test_regressions_are_reported_against_the_baseline():
+    baseline = {'scan': {'wall_seconds': 1.0, 'api_calls': 100, 'peak_rss_mb': 50.0},
+                'poll': {'wall_seconds': 1.0, 'api_calls': 100, 'calls_tolerance': 0.5, 'peak_rss_mb': 50.0}}
+    compare = lambda name, **m: bench_scale.compare(name, {'wall_seconds': 1.0, 'api_calls': 100, 'peak_rss_mb': 50.0, **m},
+                                                    baseline, time_tolerance=0.5, rss_tolerance=0.25)
+
+    assert compare('scan', wall_seconds=1.4, peak_rss_mb=60) == []
+    assert compare('scan', api_calls=101) == ["API calls 100 -> 101"]
+    assert compare('poll', api_calls=140) == []
+    assert compare('scan', wall_seconds=2.0, peak_rss_mb=70) == ["wall time 1.0s -> 2.0s", "peak RSS 50.0 MB -> 70 MB"]
+    assert compare('new_scenario', api_calls=10**6) == []
+
+@pytest.mark.parametrize('name', sorted(bench_scale.SCENARIOS))
+def test_scenarios_run_at_a_small_scale(name):
+    if name.startswith('aws_'):
+        pytest.importorskip('moto')
+
+    metrics = bench_scale.run_in_child(name, scale=0.01, verbose=False)
+
+    assert 'error' not in metrics, metrics.get('error')
+    assert metrics['wall_seconds'] >= 0 and metrics['api_calls'] >= 0 and metrics['peak_rss_mb'] > 0
@@ -0,0 +1,83 @@
+import time
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.guards import cross_repo
+
+DISPATCH_ID = 'a1b2c3d4e5f6'
+
+def created(offset):
+    return datetime.datetime.fromtimestamp(time.time() + offset, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def run(title, offset=0, status='completed', conclusion='success'):
+    return {'display_title': title, 'created_at': created(offset), 'status': status, 'conclusion': conclusion,
+            'html_url': f"https://github.com/org/consumer/actions/runs/{title}"}
+
+class Runs:
+    """A GitHub client whose run listing is `rounds[i]` on the i-th poll (the last one repeats)."""
+
+    def __init__(self, *rounds):
+        self.rounds = list(rounds)
+        self.polls = 0
+
+    def get_json(self, path, params=None):
+        self.polls += 1
+        return {'workflow_runs': self.rounds[min(self.polls, len(self.rounds)) - 1]}
+
+def find(runs, dispatched_at=None):
+    return cross_repo.find_run(Runs(runs), 'org/consumer', DISPATCH_ID, dispatched_at or time.time())
+
+def test_labelled_runs_are_matched_by_dispatch_id():
+    ours = run(f"DriftGuard {DISPATCH_ID}")
+
+    assert find([run('DriftGuard 000000000000'), ours]) is ours
+    assert find([run('DriftGuard 000000000000')]) is None  # Ours hasn't started yet
+
+def test_short_shas_in_titles_are_not_dispatch_labels():
+    ours = run('Merge 3f2a9c1d0b7e into main', offset=-10)
+
+    assert find([ours]) is ours
+
+def test_our_run_is_found_despite_clock_skew():
+    ours = run('integration tests', offset=-(cross_repo.CLOCK_SKEW_SECONDS - 5))
+
+    assert find([ours]) is ours
+    assert find([run('older push', offset=-(cross_repo.CLOCK_SKEW_SECONDS + 60))]) is None
+
+def test_several_unlabelled_candidates_are_ambiguous():
+    assert find([run('integration tests', offset=-5), run('integration tests', offset=-1)]) == cross_repo.UNMATCHED
+
+def wait(gh, timeout=0.5):
+    results = {'org/consumer': {'status': 'dispatched', 'dispatch_id': DISPATCH_ID, 'dispatched_at': time.time(),
+                                'attempts': 1, 'error': None, 'url': None, 'duration_seconds': None, 'ambiguous': False}}
+    with ThreadPoolExecutor(2) as pool:
+        cross_repo.wait_for_runs(gh, results, pool, timeout_seconds=timeout, poll_interval=0.05, max_poll_interval=0.05)
+    return results['org/consumer']
+
+def test_ambiguity_keeps_polling_and_resolves_when_our_run_is_labelled():
+    ambiguous = [run('integration tests', offset=-5), run('integration tests', offset=-1)]
+    gh = Runs(ambiguous, ambiguous, ambiguous + [run(f"DriftGuard {DISPATCH_ID}")])
+
+    result = wait(gh)
+
+    assert result['status'] == 'success' and gh.polls == 3
+
+def test_runs_still_ambiguous_at_the_deadline_are_unmatched():
+    result = wait(Runs([run('integration tests', offset=-5), run('integration tests', offset=-1)]), timeout=0.2)
+
+    assert result['status'] == cross_repo.UNMATCHED and 'run-name' in result['error']
+
+def test_dispatches_retry_and_report_every_consumer(github, monkeypatch):
+    monkeypatch.setattr(cross_repo.random, 'uniform', lambda a, b: 0)
+    github.dispatch_failures['org/flaky'] = 2
+    github.run_conclusions['org/broken'] = 'failure'
+    config = {'downstream_repos': ['org/flaky', 'org/broken', 'org/fine'], 'wait_for_status': True,
+              'timeout_seconds': 10, 'poll_interval_seconds': 0.1}
+
+    with pytest.raises(Exception, match='org/broken'):
+        cross_repo.run({'token': 't', 'repo_name': 'org/app', 'pr_number': '7'}, config)
+
+    assert sorted(repo for repo, _ in github.dispatches) == ['org/broken', 'org/fine', 'org/flaky']
+    assert all(payload['client_payload']['ref'] == 'refs/pull/7/head' for _, payload in github.dispatches)
@@ -0,0 +1,44 @@
+import boto3
+import pytest
+
+from conftest import EXPIRED, FUTURE, make_buckets
+from src.guards import discovery, janitor
+
+@pytest.mark.parametrize('arn, expected', [
+    ('arn:aws:s3:::my-bucket', ('s3', 'my-bucket')),
+    ('arn:aws:ec2:us-east-1:123456789012:instance/i-0abc', ('ec2:instance', 'i-0abc')),
+    ('arn:aws:rds:us-east-1:123456789012:db:orders', ('rds:db', 'orders')),
+])
+def test_parse_arn(arn, expected):
+    assert discovery.parse_arn(arn) == expected
+
+def test_tagging_discovery_only_returns_tagged_resources(s3):
+    buckets = {f"untagged-{i:03d}": {} for i in range(20)}
+    buckets.update({'old-bucket': {janitor.EXPIRY_TAG: EXPIRED}, 'new-bucket': {janitor.EXPIRY_TAG: FUTURE}})
+    make_buckets(s3, buckets)
+    tagging = boto3.client('resourcegroupstaggingapi', region_name='us-east-1')
+
+    found = list(discovery.discover_tagged(tagging, janitor.EXPIRY_TAG, ['s3']))
+
+    assert sorted(r['id'] for r in found) == ['new-bucket', 'old-bucket']
+    assert all(r['type'] == 's3' and janitor.EXPIRY_TAG in r['tags'] for r in found)
+
+def test_janitor_collects_through_the_tagging_api(s3):
+    make_buckets(s3, {'old-bucket': {janitor.EXPIRY_TAG: EXPIRED}, 'plain-bucket': {}})
+    tagging = boto3.client('resourcegroupstaggingapi', region_name='us-east-1')
+    aws = janitor.AWSJanitor({'discovery': 'tagging'}, s3_client=s3, tagging_client=tagging)
+
+    assert aws.collect() == [('s3', 'old-bucket', EXPIRED)]
+    assert aws.scanned_count == 1
+
+def test_tag_values_and_extra_filters_are_anded(s3):
+    make_buckets(s3, {
+        'pr-7': {janitor.PR_TAG: '7', janitor.REPO_TAG: 'org/app'},
+        'pr-7-other-repo': {janitor.PR_TAG: '7', janitor.REPO_TAG: 'org/other'},
+        'pr-8': {janitor.PR_TAG: '8', janitor.REPO_TAG: 'org/app'},
+    })
+    tagging = boto3.client('resourcegroupstaggingapi', region_name='us-east-1')
+
+    found = discovery.discover_tagged(tagging, janitor.PR_TAG, tag_values=['7'], also_match={janitor.REPO_TAG: 'org/app'})
+
+    assert [r['id'] for r in found] == ['pr-7']
@@ -0,0 +1,79 @@
+import time
+import threading
+from types import MappingProxyType
+
+import pytest
+
+from src import engine, policy
+
+def stage(name, severity='warning', depends_on=(), timeout=5):
+    return policy.Stage(name, 'test', True, severity, frozenset(['opened']), tuple(depends_on), float(timeout), MappingProxyType({}))
+
+@pytest.fixture
+def guards(monkeypatch):
+    """Stage name -> guard callable, served to the engine in place of the registry."""
+    registered = {}
+    monkeypatch.setattr(engine.registry, 'get', registered.get)
+    return registered
+
+def sleeps(seconds):
+    return lambda context, config: time.sleep(seconds)
+
+def fails(context, config):
+    raise RuntimeError("boom")
+
+def statuses(results):
+    return {name: r['status'] for name, r in results.items()}
+
+def test_independent_stages_run_concurrently(guards):
+    guards.update(docs=sleeps(0.3), infra=sleeps(0.3), integration=sleeps(0.3))
+
+    started = time.time()
+    results = engine.run_stages([stage('docs'), stage('infra'), stage('integration')], {})
+
+    assert time.time() - started < 0.6
+    assert set(statuses(results).values()) == {'passed'}
+
+def test_dependents_wait_for_their_dependencies(guards):
+    order = []
+    guards.update(docs=lambda c, cfg: (time.sleep(0.2), order.append('docs')), dispatch=lambda c, cfg: order.append('dispatch'))
+
+    results = engine.run_stages([stage('dispatch', depends_on=['docs']), stage('docs')], {})
+
+    assert order == ['docs', 'dispatch'] and list(results) == ['dispatch', 'docs']
+
+def test_failures_skip_every_transitive_dependent(guards):
+    guards.update(docs=fails, dispatch=sleeps(0), report=sleeps(0), infra=sleeps(0))
+
+    results = engine.run_stages([
+        stage('docs'), stage('dispatch', depends_on=['docs']), stage('report', depends_on=['dispatch']), stage('infra'),
+    ], {})
+
+    assert statuses(results) == {'docs': 'failed', 'dispatch': 'skipped', 'report': 'skipped', 'infra': 'passed'}
+
+def test_hung_stages_time_out_and_are_tracked_as_abandoned(guards):
+    release = threading.Event()
+    guards.update(hung=lambda c, cfg: release.wait(5), after=sleeps(0))
+
+    started = time.time()
+    results = engine.run_stages([stage('hung', timeout=0.2), stage('after', depends_on=['hung'])], {})
+
+    assert time.time() - started < 1
+    assert statuses(results) == {'hung': 'timed_out', 'after': 'skipped'}
+    assert 'stage-hung' in engine.abandoned_stages()
+    release.set()
+
+def test_a_failing_blocking_stage_cancels_the_rest(guards):
+    guards.update(docs=fails, slow=sleeps(0.5), later=sleeps(0))
+
+    results = engine.run_stages([stage('docs', severity='block'), stage('slow'), stage('later', depends_on=['slow'])], {})
+
+    assert statuses(results) == {'docs': 'failed', 'slow': 'cancelled', 'later': 'cancelled'}
+    assert engine.blocked(results)
+
+def test_a_skipped_blocking_stage_blocks_the_merge(guards):
+    guards.update(docs=fails, deploy_check=sleeps(0))
+
+    results = engine.run_stages([stage('docs'), stage('deploy_check', severity='block', depends_on=['docs'])], {})
+
+    assert results['deploy_check']['status'] == 'skipped' and engine.blocked(results)
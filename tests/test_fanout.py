@@ -0,0 +1,61 @@
+import boto3
+import pytest
+
+from conftest import EXPIRED, FUTURE
+from src.guards import fanout, janitor, scheduler
+
+ACCOUNTS = {'prod': '111111111111', 'staging': '222222222222'}
+REGIONS = ['us-east-1', 'eu-west-1']
+
+@pytest.fixture
+def fanout_config(s3, monkeypatch):
+    """Two accounts x two regions of moto buckets: one expired and one live bucket per shard."""
+    monkeypatch.setattr(fanout, '_SESSIONS', {})
+    monkeypatch.setattr(fanout, '_CLIENTS', {})
+    for account in ACCOUNTS.values():
+        creds = boto3.client('sts', region_name='us-east-1').assume_role(
+            RoleArn=f"arn:aws:iam::{account}:role/DriftGuardJanitor", RoleSessionName='test-setup')['Credentials']
+        client = boto3.client('s3', region_name='us-east-1', aws_access_key_id=creds['AccessKeyId'],
+                              aws_secret_access_key=creds['SecretAccessKey'], aws_session_token=creds['SessionToken'])
+        for region in REGIONS:
+            location = {} if region == 'us-east-1' else {'CreateBucketConfiguration': {'LocationConstraint': region}}
+            for state, expiry in (('old', EXPIRED), ('live', FUTURE)):
+                name = f"{state}-{account[:3]}-{region}"
+                client.create_bucket(Bucket=name, **location)
+                client.put_bucket_tagging(Bucket=name, Tagging={'TagSet': [{'Key': janitor.EXPIRY_TAG, 'Value': expiry}]})
+    return {
+        'discovery': 'scan',
+        'fanout': {'max_processes': 0, 'regions': REGIONS, 'accounts': [
+            {'name': name, 'role_arn': f"arn:aws:iam::{account}:role/DriftGuardJanitor"} for name, account in ACCOUNTS.items()
+        ]},
+    }
+
+def test_plan_shards_crosses_accounts_and_regions():
+    shards = fanout.plan_shards({'accounts': [{'name': 'prod', 'role_arn': 'arn:prod'}, {'role_arn': 'arn:dev'}],
+                                 'regions': ['us-east-1', 'eu-west-1']})
+
+    assert [(s['account'], s['region']) for s in shards] == [
+        ('prod', 'us-east-1'), ('prod', 'eu-west-1'), ('arn:dev', 'us-east-1'), ('arn:dev', 'eu-west-1')]
+
+def test_fanout_sweep_merges_every_shard(fanout_config):
+    aws = janitor.make_janitor('aws', {'aws': fanout_config})
+
+    result = aws.scan_and_clean(dry_run=True)
+
+    assert isinstance(aws, janitor.AWSFanoutJanitor)
+    assert result['status'] == 'ok'
+    assert len(result['shards']) == 4
+    assert (result['scanned'], result['expired']) == (8, 4)
+    # One role session per account, reused by both of its regions
+    assert len(fanout._SESSIONS) == 2
+
+def test_scheduler_reaps_fanout_resources_in_their_shard(fanout_config):
+    aws = janitor.make_janitor('aws', {'aws': fanout_config})
+    sched = scheduler.ExpiryScheduler({'aws': aws})
+
+    sched.reconcile()
+    sched.reap_due()
+
+    assert sorted(r['resource_id'] for r in sched.reaped) == sorted(
+        f"old-{account[:3]}-{region}" for account in ACCOUNTS.values() for region in REGIONS)
+    assert aws.scan_and_clean(dry_run=True)['expired'] == 0
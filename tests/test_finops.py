@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from src import finops
+from src.guards import inventory
+
+from conftest import EXPIRED, FUTURE
+
+HOUR = 3600
+
+@pytest.fixture
+def inventory_path(tmp_path):
+    """One AWS inventory: an expired live bucket, a live instance and a reaped database."""
+    path = str(tmp_path / 'inventory.db')
+    started = time.time()
+    inv = inventory.Inventory(path, 'aws')
+    inv.record([
+        ('dg-pr-7', 's3', EXPIRED, {'driftguard:team': 'platform', 'driftguard:repo': 'org/app', 'driftguard:pr': '7'},
+         {'size_bytes': 100 * finops.GB, 'created_at': started - 10 * 24 * HOUR}),
+        ('i-0abc', 'ec2:instance', FUTURE, {}, {'size_class': 't3.micro', 'created_at': started - 50 * HOUR}),
+        ('db-pr-8', 'rds:db', EXPIRED, {'driftguard:team': 'data'}, {'created_at': started - 5 * 24 * HOUR}),
+    ])
+    inv.mark_reaped('db-pr-8')
+    inv.close()
+    return path, started
+
+def test_compute_prices_the_inventory(inventory_path):
+    path, started = inventory_path
+    summary = finops.compute(finops.load_records([path]), finops.price_table(), now=started + HOUR)
+
+    assert (summary['records'], summary['live'], summary['reaped'], summary['expired_live']) == (3, 2, 1, 1)
+    teams = {group['team']: group for group in summary['by_team']}
+    assert set(teams) == {'platform', 'unassigned', 'data'}
+    assert teams['unassigned']['spend_to_date'] == round(0.0104 * 51, 2)
+    # The bucket was past its expiry from the moment we knew of it: all of its spend is waste
+    assert teams['platform']['waste_to_date'] == teams['platform']['spend_to_date'] == round(0.023 * 100 / 730 * 241, 2)
+    assert teams['data']['avoided_monthly'] == round(0.068 * finops.HOURS_PER_MONTH, 2)
+    assert teams['data']['run_rate_monthly'] == 0
+    assert [group['pr'] for group in summary['by_pr']] == ['org/app#7']
+
+def test_price_overrides_merge_over_the_defaults(inventory_path):
+    path, started = inventory_path
+    prices = finops.price_table({'aws': {'ec2:instance': {'classes': {'t3.micro': {'hourly': 0.02}}}}})
+
+    assert prices['aws']['ec2:instance']['classes']['m5.large'] == {'hourly': 0.096}
+    assert finops.DEFAULT_PRICES['aws']['ec2:instance']['classes']['t3.micro'] == {'hourly': 0.0104}
+
+    summary = finops.compute(finops.load_records([path]), prices, now=started + HOUR)
+    teams = {group['team']: group for group in summary['by_team']}
+    assert teams['unassigned']['spend_to_date'] == round(0.02 * 51, 2)
+
+def test_empty_and_missing_inventories(tmp_path):
+    summary = finops.compute(finops.load_records([str(tmp_path / 'missing.db')]), finops.price_table())
+
+    assert summary['records'] == 0
+    assert summary['totals']['spend_to_date'] == 0.0
+    assert summary['by_team'] == []
+
+def test_cache_recomputes_only_when_the_inventory_changes(inventory_path):
+    path, _ = inventory_path
+    cache = finops.FinOpsCache([path])
+
+    first = cache.get()
+    assert cache.get() is first
+
+    inv = inventory.Inventory(path, 'aws')
+    inv.record([('dg-pr-9', 's3', FUTURE, {'driftguard:team': 'platform'})])
+    inv.close()
+
+    assert cache.get()['records'] == 4
@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from src import github_client
+
+def test_unchanged_resources_are_revalidated_for_free(github):
+    github.add_content('org/app', 'README.md', '# App\n')
+    gh = github_client.get_client('t')
+
+    first = gh.get('/repos/org/app/contents/README.md', accept=github_client.RAW_MEDIA_TYPE)
+    remaining = gh.rate_remaining
+    second = gh.get('/repos/org/app/contents/README.md', accept=github_client.RAW_MEDIA_TYPE)
+
+    assert second.text == first.text == '# App\n'
+    assert github.not_modified == 1 and gh.stats['not_modified'] == 1
+    assert gh.rate_remaining == remaining  # 304s don't count against the limit
+
+def test_changed_resources_are_fetched_again(github):
+    github.add_content('org/app', 'README.md', 'v1')
+    gh = github_client.get_client('t')
+    gh.get('/repos/org/app/contents/README.md', accept=github_client.RAW_MEDIA_TYPE)
+
+    github.add_content('org/app', 'README.md', 'v2')
+
+    assert gh.get('/repos/org/app/contents/README.md', accept=github_client.RAW_MEDIA_TYPE).text == 'v2'
+    assert github.not_modified == 0
+
+def test_one_pooled_client_per_token_and_url(github):
+    assert github_client.get_client('t') is github_client.get_client('t')
+    assert github_client.get_client('t') is not github_client.get_client('other')
+
+def test_errors_carry_the_status_code(github):
+    with pytest.raises(github_client.GitHubError) as error:
+        github_client.get_client('t').get_json('/repos/org/app/pulls/404')
+
+    assert error.value.status_code == 404 and 'Not Found' in str(error.value)
+
+def test_low_quota_spreads_requests_over_the_reset_window(github, monkeypatch):
+    github.add_content('org/app', 'README.md', '# App\n')
+    gh = github_client.get_client('t')
+    gh.rate_remaining, gh.rate_reset = 10, time.time() + 5
+    slept = []
+    monkeypatch.setattr(github_client.time, 'sleep', slept.append)
+
+    gh.get('/repos/org/app/contents/README.md')
+
+    assert slept and 0.3 < slept[0] <= 0.5  # ~5s window / 10 calls left
+    assert gh.rate_remaining == github.remaining  # Quota re-read from the response
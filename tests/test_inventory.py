@@ -0,0 +1,64 @@
+import sqlite3
+from collections import Counter
+
+from conftest import EXPIRED, FUTURE, make_buckets
+from src.guards import inventory, janitor
+
+OLD_SCHEMA = """
+CREATE TABLE resources (
+    provider TEXT NOT NULL, resource_id TEXT NOT NULL, resource_type TEXT, expiry TEXT,
+    tag_hash TEXT, last_seen REAL NOT NULL, checked_at REAL NOT NULL,
+    PRIMARY KEY (provider, resource_id)
+);
+"""
+
+def test_old_inventory_files_are_migrated_on_open(tmp_path):
+    path = str(tmp_path / 'inventory.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(OLD_SCHEMA)
+    conn.execute("INSERT INTO resources VALUES ('aws', 'legacy', 's3', ?, 'h', 1, 1)", (EXPIRED,))
+    conn.commit()
+    conn.close()
+
+    inv = inventory.Inventory(path, 'aws')
+
+    columns = {row[1] for row in inv.conn.execute("PRAGMA table_info(resources)")}
+    assert set(inventory.MIGRATIONS) <= columns
+    expiry_at = inv.conn.execute("SELECT expiry_at FROM resources WHERE resource_id = 'legacy'").fetchone()[0]
+    assert expiry_at == inventory.expiry_epoch(EXPIRED)
+    # Reopening an already migrated file is a no-op
+    inventory.Inventory(path, 'aws').close()
+    inv.close()
+
+def test_fresh_prune_and_reaped_rows(tmp_path):
+    inv = inventory.Inventory(str(tmp_path / 'inventory.db'), 'gcp')
+    inv.record([
+        ('kept', 'bucket', FUTURE, {'driftguard-pr': '7', 'driftguard-repo': 'org_app'}),
+        ('gone', 'bucket', FUTURE, {}),
+        ('reaped', 'bucket', EXPIRED, {}),
+    ])
+    inv.mark_reaped('reaped')
+
+    assert inv.prune(['kept', 'reaped']) == 1
+    assert set(inv.fresh()) == {'kept'}
+    assert inv.find_by_pr('org_app', '7') == [('bucket', 'kept')]
+    # Reaped rows stay for savings reports, but not as live resources
+    assert [row['resource_id'] for row in inventory.read_inventory(inv.path)] == ['kept']
+    inv.close()
+
+def test_second_scan_only_reads_tags_of_new_or_expired_buckets(s3, tmp_path):
+    make_buckets(s3, {f"live-{i}": {janitor.EXPIRY_TAG: FUTURE} for i in range(10)})
+    make_buckets(s3, {'old-bucket': {janitor.EXPIRY_TAG: EXPIRED}})
+    calls = Counter()
+    s3.meta.events.register('before-call.s3.GetBucketTagging', lambda **kwargs: calls.update(['GetBucketTagging']))
+    config = {'discovery': 'scan', 'inventory': {'path': str(tmp_path / 'inventory.db')}}
+
+    first = janitor.AWSJanitor(config, s3_client=s3).scan_and_clean(dry_run=True)
+    make_buckets(s3, {'new-bucket': {janitor.EXPIRY_TAG: FUTURE}})
+    calls.clear()
+    second = janitor.AWSJanitor(config, s3_client=s3).scan_and_clean(dry_run=True)
+
+    assert first['expired'] == second['expired'] == 1
+    assert second['scanned'] == 12
+    # The new bucket, plus the cached one that looks expired (its owner may have extended it)
+    assert calls['GetBucketTagging'] == 2
@@ -0,0 +1,131 @@
+import time
+
+from conftest import EXPIRED, FUTURE, make_buckets
+from fake_clouds import FakeGCSClient, FakeResourceClient
+from src.guards import janitor
+
+def test_bucket_scan_reads_every_bucket_concurrently(s3):
+    buckets = {}
+    for i in range(30):
+        tags = {janitor.EXPIRY_TAG: EXPIRED if i % 3 == 0 else FUTURE} if i % 2 == 0 else {}
+        buckets[f"scan-{i:03d}"] = tags
+    make_buckets(s3, buckets)
+    aws = janitor.AWSJanitor({'discovery': 'scan', 'max_workers': 8}, s3_client=s3)
+
+    result = aws.scan_and_clean(dry_run=True)
+
+    assert result['status'] == 'ok'
+    assert result['scanned'] == 30
+    assert result['expired'] == sum(1 for i in range(30) if i % 6 == 0)
+    assert result['deleted'] == 0
+    assert len(s3.list_buckets()['Buckets']) == 30
+
+def test_expired_buckets_are_emptied_and_deleted(s3):
+    make_buckets(s3, {'old-bucket': {janitor.EXPIRY_TAG: EXPIRED}, 'live-bucket': {janitor.EXPIRY_TAG: FUTURE}})
+    for i in range(5):
+        s3.put_object(Bucket='old-bucket', Key=f"k{i}", Body=b'x')
+    aws = janitor.AWSJanitor({'discovery': 'scan'}, s3_client=s3)
+
+    result = aws.scan_and_clean()
+
+    assert (result['expired'], result['deleted'], result['failed']) == (1, 1, 0)
+    assert [b['Name'] for b in s3.list_buckets()['Buckets']] == ['live-bucket']
+
+def provider_janitor(provider, seconds=0.0, crash=False):
+    class Janitor(janitor.CloudJanitor):
+        name = provider.upper()
+
+        def __init__(self, config=None):
+            self.provider = provider
+
+        def scan_and_clean(self, dry_run=False):
+            time.sleep(seconds)
+            if crash:
+                raise RuntimeError("credentials expired")
+            result = janitor.new_result(provider)
+            result['scanned'] = 3
+            return result
+    return Janitor
+
+def test_providers_run_concurrently_into_one_report(monkeypatch, tmp_path):
+    monkeypatch.setattr(janitor, 'JANITOR_CLASSES', {p: provider_janitor(p, 0.3) for p in ('aws', 'azure', 'gcp')})
+    report_path = str(tmp_path / 'report.json')
+
+    started = time.monotonic()
+    report = janitor.scan_resources({'target': ['aws', 'azure', 'gcp']}, report_path=report_path)
+
+    assert time.monotonic() - started < 0.8
+    assert report['status'] == 'ok'
+    assert report['totals']['scanned'] == 9
+    assert [r['provider'] for r in report['providers']] == ['aws', 'azure', 'gcp']
+    assert janitor.read_report(report_path) == report
+
+def test_hung_and_crashed_providers_degrade_the_report(monkeypatch, tmp_path):
+    monkeypatch.setattr(janitor, 'JANITOR_CLASSES', {
+        'aws': provider_janitor('aws'),
+        'azure': provider_janitor('azure', seconds=5),
+        'gcp': provider_janitor('gcp', crash=True),
+    })
+    config = {'target': ['aws', 'azure', 'gcp'], 'azure': {'timeout_seconds': 0.3}}
+
+    report = janitor.scan_resources(config, report_path=str(tmp_path / 'report.json'))
+
+    statuses = {r['provider']: r['status'] for r in report['providers']}
+    assert statuses == {'aws': 'ok', 'azure': 'timeout', 'gcp': 'error'}
+    assert report['status'] == 'degraded'
+    assert 'credentials expired' in report['providers'][2]['errors'][0]
+
+def test_azure_lists_tagged_groups_and_tracks_deletions():
+    groups = {f"rg-{i}": {janitor.EXPIRY_TAG: EXPIRED} for i in range(3)}
+    groups.update({f"untagged-{i}": {} for i in range(10)})
+    client = FakeResourceClient(groups, delete_seconds=0.2)
+    azure = janitor.AzureJanitor({'poll_interval_seconds': 0.05}, resource_client=client)
+
+    result = azure.scan_and_clean()
+
+    assert result['scanned'] == 3  # Filtered server-side
+    assert (result['deleted'], result['failed']) == (3, 0)
+    assert result['deletions'] == {f"rg-{i}": 'succeeded' for i in range(3)}
+    assert not any(name.startswith('rg-') for name in client.groups)
+
+def test_azure_finalize_without_wait_checks_once():
+    client = FakeResourceClient({'rg-slow': {janitor.EXPIRY_TAG: EXPIRED}}, delete_seconds=0.3)
+    azure = janitor.AzureJanitor({'poll_interval_seconds': 0.05}, resource_client=client)
+    azure.reap('resourcegroup', 'rg-slow')
+
+    assert azure.finalize(wait=False) == {}
+    assert azure.deleting() == 1
+    time.sleep(0.35)
+    assert azure.finalize(wait=False) == {'rg-slow': 'succeeded'}
+    assert azure.deleting() == 0
+
+def test_pr_cleanup_reaps_only_that_prs_resources(s3):
+    pr_tags = lambda pr, repo: {janitor.PR_TAG: pr, janitor.REPO_TAG: repo}
+    make_buckets(s3, {
+        'pr-7-assets': pr_tags('7', 'org/app'),
+        'pr-7-logs': pr_tags('7', 'org/app'),
+        'pr-7-elsewhere': pr_tags('7', 'org/other'),
+        'pr-8-assets': pr_tags('8', 'org/app'),
+    })
+    config = {'target': ['aws'], 'aws': {'regions': ['us-east-1']}}
+    context = {'pr_number': 7, 'repo_name': 'org/app'}
+
+    preview = janitor.cleanup_pr_resources(context, config, dry_run=True)
+    report = janitor.cleanup_pr_resources(context, config)
+
+    assert preview['totals']['scanned'] == 2 and preview['totals']['deleted'] == 0
+    assert report['status'] == 'ok' and report['totals']['deleted'] == 2
+    assert sorted(b['Name'] for b in s3.list_buckets()['Buckets']) == ['pr-7-elsewhere', 'pr-8-assets']
+
+def test_gcp_pr_cleanup_uses_the_inventory_index(tmp_path):
+    labels = lambda pr: {janitor.GCP_PR_LABEL: pr, janitor.GCP_REPO_LABEL: janitor.gcp_label_value('Org/App')}
+    client = FakeGCSClient({'pr-7-bucket': (labels('7'), 3), 'pr-8-bucket': (labels('8'), 3)})
+    gcp = janitor.GCPJanitor({'inventory': {'path': str(tmp_path / 'inventory.db')}}, client=client)
+    gcp.collect()  # A regular scan fills the index
+    client.calls.clear()
+
+    result = gcp.reap_pr('Org/App', 7)
+
+    assert result['resources'] == [{'type': 'bucket', 'id': 'pr-7-bucket'}]
+    assert client.removed == {'pr-7-bucket'}
+    assert client.calls['buckets.list'] == 0
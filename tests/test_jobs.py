@@ -0,0 +1,69 @@
+import time
+import threading
+
+from src import jobs
+from src.guards import janitor
+
+def wait(job, timeout=5):
+    for _ in range(int(timeout / 0.01)):
+        if job.done:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job.id} still {job.status}")
+
+def test_matching_submissions_attach_to_the_running_job():
+    manager = jobs.JobManager(max_workers=2)
+    release = threading.Event()
+
+    first, created = manager.submit('janitor_scan', ('janitor', True), lambda job: release.wait(5) and 'done')
+    second, attached = manager.submit('janitor_scan', ('janitor', True), lambda job: 'duplicate')
+    release.set()
+    wait(first)
+
+    assert created and not attached and second is first
+    assert first.status == 'succeeded' and first.result == 'done'
+    # Once finished, the same key starts a new job
+    third, created = manager.submit('janitor_scan', ('janitor', True), lambda job: 'again')
+    assert created and wait(third).result == 'again'
+
+def test_failed_jobs_record_their_error():
+    manager = jobs.JobManager()
+
+    def explode(job):
+        raise RuntimeError("no credentials")
+    job = wait(manager.submit('janitor_cleanup', 'k', explode)[0])
+
+    assert job.status == 'failed' and job.error == 'no credentials'
+    assert job.events[-1]['type'] == 'finished'
+
+def test_events_stay_bounded_with_monotonic_sequence_numbers(monkeypatch):
+    monkeypatch.setattr(jobs, 'MAX_EVENTS_PER_JOB', 10)
+    job = jobs.Job('janitor_scan', 'k')
+    for i in range(25):
+        job.emit('resource', n=i)
+
+    assert len(job.events) == 10 and job.dropped_events == 15
+    assert [e['seq'] for e in job.events_after(20)] == [21, 22, 23, 24, 25]
+
+def test_janitor_scan_streams_provider_progress(monkeypatch, tmp_path):
+    class StubJanitor(janitor.CloudJanitor):
+        provider = 'aws'
+
+        def __init__(self, config=None):
+            pass
+
+        def collect(self):
+            self.scanned_count = 2
+            return [('s3', 'old', '2020-01-01T00:00:00Z'), ('s3', 'live', '2099-01-01T00:00:00Z')]
+
+    monkeypatch.setattr(janitor, 'JANITOR_CLASSES', {'aws': StubJanitor})
+    manager = jobs.JobManager()
+
+    job = wait(manager.submit('janitor_scan', 'scan', lambda job: janitor.scan_resources(
+        {'target': ['aws']}, dry_run=True, report_path=str(tmp_path / 'report.json'), progress=job.emit))[0])
+
+    types = [e['type'] for e in job.events]
+    assert types[:3] == ['queued', 'started', 'provider_started']
+    assert {'type': 'resource', 'provider': 'aws', 'resource_id': 'old', 'outcome': 'would_delete'}.items() <= \
+        next(e for e in job.events if e['type'] == 'resource').items()
+    assert job.result['totals']['expired'] == 1
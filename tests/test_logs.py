@@ -0,0 +1,95 @@
+import io
+import os
+import threading
+
+import pytest
+
+from src import logs
+
+@pytest.fixture
+def log(monkeypatch):
+    """A fresh in-memory process log, so events from other tests don't leak in."""
+    fresh = logs.EventLog(capacity=100)
+    monkeypatch.setattr(logs, '_log', fresh)
+    return fresh
+
+def emit(log, count, **fields):
+    for n in range(count):
+        log.append({'at': 0, 'level': 'info', 'message': f"event {n}", **fields})
+
+def offsets(result):
+    return [event['offset'] for event in result['events']]
+
+def test_ring_is_bounded_and_reports_missed_events():
+    log = logs.EventLog(capacity=3, segment_events=3)
+    emit(log, 5)
+
+    result = log.read(after=0)
+    assert offsets(result) == [3, 4, 5]
+    assert (result['cursor'], result['missed']) == (5, 2)
+    assert log.read(after=result['cursor']) == {'events': [], 'cursor': 5, 'missed': 0}
+
+def test_filters_move_the_cursor_past_skipped_events():
+    log = logs.EventLog(capacity=10)
+    log.append({'at': 0, 'level': 'info', 'message': "scan", 'stage': 'janitor', 'provider': 'aws'})
+    log.append({'at': 0, 'level': 'error', 'message': "boom", 'stage': 'janitor', 'provider': 'gcp'})
+    log.append({'at': 0, 'level': 'error', 'message': "drift", 'stage': 'doc_guard'})
+    log.append({'at': 0, 'level': 'error', 'message': "again", 'stage': 'janitor', 'provider': 'gcp'})
+
+    first = log.read(stages={'janitor'}, levels={'error'}, limit=1)
+    assert [e['message'] for e in first['events']] == ["boom"]
+    rest = log.read(after=first['cursor'], stages={'janitor'}, levels={'error'})
+    assert [e['message'] for e in rest['events']] == ["again"]
+    assert offsets(log.read(providers={'aws'})) == [1]
+
+def test_rotated_segments_are_replayed_and_pruned(tmp_path):
+    log = logs.EventLog(capacity=2, directory=str(tmp_path), segment_events=2, max_segments=2)
+    emit(log, 7)
+
+    assert sorted(os.listdir(tmp_path)) == ['segment-000000000003-000000000004.jsonl.gz',
+                                           'segment-000000000005-000000000006.jsonl.gz']
+    result = log.read(after=0)
+    assert offsets(result) == [3, 4, 5, 6, 7]
+    assert (result['cursor'], result['missed']) == (7, 2)
+    assert offsets(log.read(after=4, limit=2)) == [5, 6]
+
+def test_offsets_continue_after_a_restart(tmp_path):
+    log = logs.EventLog(capacity=10, directory=str(tmp_path), segment_events=10)
+    emit(log, 3)
+    log.flush()
+
+    reopened = logs.EventLog(capacity=10, directory=str(tmp_path), segment_events=10)
+    assert reopened.append({'at': 0, 'level': 'info', 'message': "after restart"})['offset'] == 4
+    assert offsets(reopened.read(after=0)) == [1, 2, 3, 4]
+
+def test_bound_fields_follow_work_handed_to_threads(log):
+    def work(name):
+        logs.event(name, echo=False)
+
+    with logs.bind(stage='janitor_cleanup', provider='aws'):
+        logs.event("inline", echo=False, provider='gcp')
+        plain = threading.Thread(target=work, args=("plain",))
+        wrapped = threading.Thread(target=logs.propagate(work), args=("propagated",))
+        plain.start(), wrapped.start()
+        plain.join(), wrapped.join()
+    logs.event("outside", echo=False)
+
+    events = {e['message']: e for e in log.read()['events']}
+    assert (events['inline']['stage'], events['inline']['provider']) == ('janitor_cleanup', 'gcp')
+    assert events['propagated']['stage'] == 'janitor_cleanup'
+    assert 'stage' not in events['plain'] and 'stage' not in events['outside']
+
+def test_printed_lines_become_events(log):
+    console = io.StringIO()
+    tee = logs._StdoutTee(console)
+
+    tee.write("⚠️ slow listing\n❌ delete fai")
+    tee.write("led\n")
+    tee.write("\n")
+    tee.write("🧹 reaped dg-pr-7")
+
+    assert console.getvalue() == "⚠️ slow listing\n❌ delete failed\n\n🧹 reaped dg-pr-7"
+    assert [(e['level'], e['message'], e['source']) for e in log.read()['events']] == [
+        ('warn', "⚠️ slow listing", 'stdout'),
+        ('error', "❌ delete failed", 'stdout'),
+    ]
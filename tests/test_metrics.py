@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from src import metrics
+
+@pytest.fixture(autouse=True)
+def collecting(monkeypatch):
+    """Collection on, with empty counters/histograms/spans for every test."""
+    monkeypatch.setattr(metrics, 'ENABLED', True)
+    monkeypatch.setattr(metrics, '_counters', {})
+    monkeypatch.setattr(metrics, '_histograms', {})
+    monkeypatch.setattr(metrics, '_spans', [])
+    monkeypatch.setattr(metrics, '_dropped_spans', 0)
+
+def counter(name, **labels):
+    return metrics._counters.get(metrics._key(name, labels), 0)
+
+def test_disabled_collects_nothing(monkeypatch):
+    monkeypatch.setattr(metrics, 'ENABLED', False)
+    metrics.inc('driftguard_verdicts_total', source='llm')
+    metrics.observe('driftguard_llm_seconds', 0.2)
+
+    assert metrics.timer('driftguard_llm_seconds') is metrics.NOOP
+    assert metrics.span('stage') is metrics.NOOP
+    assert metrics._counters == {} and metrics._histograms == {}
+
+def test_prometheus_text():
+    metrics.inc('driftguard_verdicts_total', source='cache')
+    metrics.inc('driftguard_verdicts_total', 2, source='cache')
+    metrics.observe('driftguard_stage_seconds', 0.03, stage='doc "guard"')
+
+    text = metrics.render_prometheus()
+
+    assert '# TYPE driftguard_verdicts_total counter' in text
+    assert 'driftguard_verdicts_total{source="cache"} 3' in text
+    assert '# TYPE driftguard_stage_seconds histogram' in text
+    assert 'driftguard_stage_seconds_bucket{stage="doc \\"guard\\"",le="0.025"} 0' in text
+    assert 'driftguard_stage_seconds_bucket{stage="doc \\"guard\\"",le="0.05"} 1' in text
+    assert 'driftguard_stage_seconds_bucket{stage="doc \\"guard\\"",le="+Inf"} 1' in text
+    assert 'driftguard_stage_seconds_count{stage="doc \\"guard\\""} 1' in text
+
+def test_cloud_call_outcomes():
+    class NotFound(Exception):
+        status_code = 404
+
+    class Throttled(Exception):
+        code = 429
+
+    with metrics.cloud_call('gcp', 'buckets.list'):
+        pass
+    with pytest.raises(NotFound), metrics.cloud_call('gcp', 'buckets.delete'):
+        raise NotFound()
+    with pytest.raises(Throttled), metrics.cloud_call('gcp', 'buckets.delete'):
+        raise Throttled()
+
+    assert counter('driftguard_cloud_api_calls_total', provider='gcp', operation='buckets.list', outcome='ok') == 1
+    assert counter('driftguard_cloud_api_calls_total', provider='gcp', operation='buckets.delete', outcome='not_found') == 1
+    assert counter('driftguard_cloud_api_calls_total', provider='gcp', operation='buckets.delete', outcome='error') == 1
+    assert counter('driftguard_cloud_throttled_total', provider='gcp', operation='buckets.delete') == 1
+
+def test_boto_calls_counted_once_on_a_reinstrumented_client(s3):
+    s3.create_bucket(Bucket='dg-pr-1')
+    metrics.instrument_boto_client(s3)
+    metrics.instrument_boto_client(s3)  # A cached fan-out client handed to a second janitor
+
+    s3.list_buckets()
+    with pytest.raises(s3.exceptions.ClientError):
+        s3.get_bucket_tagging(Bucket='dg-pr-1')
+
+    assert counter('driftguard_cloud_api_calls_total', provider='aws', operation='ListBuckets', outcome='ok') == 1
+    assert counter('driftguard_cloud_api_calls_total', provider='aws', operation='GetBucketTagging', outcome='not_found') == 1
+    assert metrics.snapshot()['timers'][0]['count'] == 1
+
+def test_spans_written_to_the_trace(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, 'MAX_SPANS', 2)
+    with metrics.span('stage', stage='doc_guard') as span:
+        span.set(status='PASS')
+    with pytest.raises(ValueError), metrics.span('stage', stage='infra_guard'):
+        raise ValueError("boom")
+    with metrics.span('stage', stage='dropped'):
+        pass
+    metrics.inc('driftguard_stage_runs_total', stage='doc_guard', status='PASS')
+
+    trace = json.loads(open(metrics.write_trace(str(tmp_path / 'out' / 'trace.json'))).read())
+
+    assert [s['stage'] for s in trace['spans']] == ['doc_guard', 'infra_guard']
+    assert trace['spans'][0]['status'] == 'PASS'
+    assert trace['spans'][1]['error'] == "ValueError: boom"
+    assert trace['dropped_spans'] == 1
+    assert trace['metrics']['counters'][0]['value'] == 1
@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from src import policy
+
+VALID = """
+version: "1.0"
+stages:
+  - name: ai_doc_check
+    enabled: true
+    severity: block
+    trigger_on: [opened, synchronize]
+  - name: cross_repo_safety
+    enabled: true
+    trigger_on: [opened]
+    depends_on: ai_doc_check
+    config: {downstream_repos: [org/consumer]}
+cleanup:
+  - name: janitor_cleanup
+    enabled: true
+    trigger_on: [closed]
+    config: {aws: {regions: [us-east-1]}}
+"""
+
+def test_the_shipped_policy_compiles():
+    compiled = policy.load_policy()
+
+    assert [s.name for s in compiled.stages_for('closed')] == ['janitor_cleanup']
+    assert 'ai_doc_check' in [s.name for s in compiled.stages_for('opened')]
+
+def test_events_are_indexed_to_enabled_stages_in_order():
+    compiled = policy.compile_policy(VALID)
+
+    assert [s.name for s in compiled.stages_for('opened')] == ['ai_doc_check', 'cross_repo_safety']
+    assert [s.name for s in compiled.stages_for('synchronize')] == ['ai_doc_check']
+    assert compiled.stages_for('labeled') == ()
+    assert compiled.stage('cross_repo_safety').depends_on == ('ai_doc_check',)
+
+def test_every_problem_is_reported_at_once():
+    with pytest.raises(policy.PolicyError) as error:
+        policy.compile_policy("""
+stages:
+  - name: ai_doc_check
+    severity: fatal
+    depends_on: [cross_repo_safety]
+    timeout_seconds: 0
+  - name: cross_repo_safety
+    depends_on: [ai_doc_check, nowhere]
+  - name: made_up_guard
+    colour: blue
+  - name: made_up_guard
+""")
+
+    errors = '\n'.join(error.value.errors)
+    for expected in ("severity: must be one of", "timeout_seconds: must be positive",
+                     "config.downstream_repos: required by the cross_repo_safety guard",
+                     "unknown stage 'nowhere'", "no registered guard named 'made_up_guard'", "unknown keys ['colour']",
+                     "duplicate stage name 'made_up_guard'", "dependency cycle between ai_doc_check, cross_repo_safety"):
+        assert expected in errors
+    assert len(error.value.errors) >= 8
+
+def test_yaml_syntax_errors_are_policy_errors():
+    with pytest.raises(policy.PolicyError, match='YAML syntax error'):
+        policy.compile_policy("stages: [unclosed")
+
+def test_compiled_policies_are_immutable():
+    compiled = policy.compile_policy(VALID)
+    stage = compiled.stage('janitor_cleanup')
+
+    with pytest.raises(AttributeError):
+        compiled.version = '2'
+    with pytest.raises(TypeError):
+        stage.config['aws'] = {}
+    config = stage.config_copy()
+    config['aws']['regions'].append('eu-west-1')
+    assert stage.config['aws']['regions'] == ('us-east-1',)
+
+def test_cache_recompiles_only_when_the_content_changes(tmp_path):
+    path = tmp_path / 'policy.yaml'
+    path.write_text(VALID)
+    cache = policy.PolicyCache(str(path))
+
+    first = cache.get()
+    os.utime(path, (1, 1))  # Touched, same content
+    assert cache.get() is first
+    path.write_text(VALID.replace('"1.0"', '"1.1"'))
+    assert cache.get().version == '1.1'
+
+def test_invalid_policies_are_never_saved(tmp_path):
+    path = tmp_path / 'policy.yaml'
+    path.write_text(VALID)
+
+    with pytest.raises(policy.PolicyError):
+        policy.save_policy(str(path), "stages:\n  - name: made_up_guard\n")
+
+    assert path.read_text() == VALID
+    assert os.listdir(tmp_path) == ['policy.yaml']
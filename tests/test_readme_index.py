@@ -0,0 +1,42 @@
+from src.guards import readme_index
+
+README = """# Service
+
+Intro text.
+
+## Deployment
+
+Run `make deploy` against the cluster.
+
+## Configuration
+
+| Variable | Meaning |
+| `CACHE_TTL_SECONDS` | How long responses are cached |
+
+```bash
+# Not a heading: a shell comment
+export CACHE_TTL_SECONDS=60
+```
+
+## Contributing
+
+Open a pull request.
+"""
+
+def test_headings_split_sections_but_code_comments_do_not():
+    titles = [section['title'] for section in readme_index.build_index(README)]
+
+    assert titles == ['Service', 'Deployment', 'Configuration', 'Contributing']
+
+def test_the_sections_sharing_identifiers_with_the_chunk_are_selected():
+    index = readme_index.build_index(README)
+    chunk = "+    ttl = int(os.getenv('CACHE_TTL_SECONDS', '30'))\n"
+
+    excerpt = readme_index.select_sections(index, chunk, budget_chars=4000)
+
+    assert excerpt.startswith('## Configuration') and 'Deployment' not in excerpt
+
+def test_unrelated_chunks_get_the_top_of_the_readme_within_budget():
+    index = readme_index.build_index(README)
+
+    assert readme_index.select_sections(index, "+zzz_qqq = 1\n", budget_chars=10) == index[0]['text'][:10]
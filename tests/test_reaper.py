@@ -0,0 +1,55 @@
+from conftest import EXPIRED
+from fake_clouds import FakeGCSClient, FakeS3Objects
+from src.guards import janitor, reaper
+
+def test_versioned_gcs_bucket_is_emptied_of_every_generation():
+    client = FakeGCSClient({'versioned': ({janitor.GCP_EXPIRY_LABEL: EXPIRED}, 250)}, generations=3)
+    gcp = janitor.GCPJanitor({'delete_concurrency': 4}, client=client)
+
+    gcp.reap('bucket', 'versioned')
+
+    assert client.deleted['versioned'] == 750
+    assert 'versioned' in client.removed
+
+def test_versioned_s3_bucket_is_emptied_of_versions_and_delete_markers(s3):
+    s3.create_bucket(Bucket='versioned')
+    s3.put_bucket_versioning(Bucket='versioned', VersioningConfiguration={'Status': 'Enabled'})
+    for i in range(3):
+        s3.put_object(Bucket='versioned', Key='config.json', Body=str(i).encode())
+    s3.delete_object(Bucket='versioned', Key='config.json')
+
+    stats = reaper.empty_s3_bucket(s3, 'versioned')
+
+    assert stats == {'deleted': 4, 'failed': 0, 'errors': []}
+    s3.delete_bucket(Bucket='versioned')
+
+def test_s3_batches_stream_through_bounded_deletes():
+    s3 = FakeS3Objects({'huge': 2500})
+
+    stats = reaper.empty_s3_bucket(s3, 'huge', max_inflight=2)
+
+    assert stats['deleted'] == 2500 and stats['failed'] == 0
+    assert s3.calls['DeleteObjects'] == 3  # 1000 + 1000 + 500
+
+class RejectingS3(FakeS3Objects):
+    """Rejects `key` in every DeleteObjects call, and everything else only the first time."""
+
+    def __init__(self, buckets, key):
+        super().__init__(buckets)
+        self.key = key
+        self.attempts = 0
+
+    def delete_objects(self, Bucket, Delete):
+        self.attempts += 1
+        keys = [o['Key'] for o in Delete['Objects']]
+        rejected = keys if self.attempts == 1 else [k for k in keys if k == self.key]
+        return {'Errors': [{'Key': k, 'VersionId': 'null', 'Code': 'AccessDenied', 'Message': 'denied'} for k in rejected]}
+
+def test_s3_partial_failures_are_retried_once_then_reported():
+    s3 = RejectingS3({'locked': 10}, key='obj/00000003')
+
+    stats = reaper.empty_s3_bucket(s3, 'locked')
+
+    assert s3.attempts == 2
+    assert (stats['deleted'], stats['failed']) == (9, 1)
+    assert stats['errors'] == [('obj/00000003', 'AccessDenied: denied')]
@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+from src import registry
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+HEAVY_MODULES = ['boto3', 'botocore', 'google.genai', 'google.cloud.storage', 'azure.identity']
+
+@pytest.fixture
+def guards(monkeypatch):
+    monkeypatch.setattr(registry, '_guards', dict(registry._guards))
+
+@pytest.mark.parametrize('module', ['src.engine', 'api.index'])
+def test_cold_start_imports_no_cloud_or_ai_sdk(module, tmp_path):
+    probe = f"import sys, json; import {module}; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    env = dict(os.environ, DRIFTGUARD_LOG_DIR=str(tmp_path))
+
+    proc = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+    assert json.loads(proc.stdout.strip().splitlines()[-1]) == []
+
+def test_guards_are_imported_on_first_call(guards):
+    guard = registry.register('adder', 'operator:add', description="test guard")
+
+    assert guard._handler is None
+    assert registry.get('adder')(2, 3) == 5
+    assert guard._handler is not None
+
+def test_missing_requirements_are_reported_without_importing(guards):
+    guard = registry.register('needs_sdk', 'operator:add', requires=('json', 'no_such_sdk_package'))
+
+    assert guard.missing() == ['no_such_sdk_package']
+    assert 'no_such_sdk_package' not in sys.modules
+
+def test_unknown_guards(guards):
+    assert registry.get('not_a_guard') is None
+    with pytest.raises(KeyError):
+        registry.load_module('not_a_guard')
+
+def test_builtin_guards_are_registered():
+    assert {'ai_doc_check', 'infrastructure_preview', 'cross_repo_safety', 'janitor_cleanup'} <= set(registry.names())
@@ -0,0 +1,91 @@
+import time
+import datetime
+
+from conftest import EXPIRED, FUTURE
+from fake_clouds import FakeResourceClient
+from src.guards import janitor, scheduler
+
+def in_seconds(seconds):
+    return (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=seconds)).isoformat()
+
+class StubJanitor(janitor.CloudJanitor):
+    """Serves expiry tags from a dict and records reaps."""
+    name = "Stub"
+    provider = "stub"
+
+    def __init__(self, tags):
+        self.tags = dict(tags)  # resource_id -> expiry (None: tag removed)
+        self.reaped = []
+        self.fail = set()
+
+    def collect(self):
+        return [('bucket', rid, expiry) for rid, expiry in self.tags.items() if expiry is not None]
+
+    def current_expiry(self, resource_type, resource_id):
+        return self.tags.get(resource_id)
+
+    def reap(self, resource_type, resource_id):
+        if resource_id in self.fail:
+            raise Exception("throttled")
+        self.reaped.append(resource_id)
+
+def test_reconcile_queues_by_expiry_and_skips_unparseable():
+    stub = StubJanitor({'later': FUTURE, 'due': EXPIRED, 'junk': 'next tuesday-ish'})
+    sched = scheduler.ExpiryScheduler({'stub': stub})
+
+    sched.reconcile()
+
+    assert [entry[3] for entry in sorted(sched.heap)] == ['due', 'later']
+    assert sched.next_wakeup() == sched.heap[0][0]
+
+def test_reap_due_reaps_only_expired_resources():
+    stub = StubJanitor({'due': EXPIRED, 'later': FUTURE})
+    sched = scheduler.ExpiryScheduler({'stub': stub})
+    sched.reconcile()
+
+    sched.reap_due()
+
+    assert stub.reaped == ['due']
+    assert [entry[3] for entry in sched.heap] == ['later']
+    assert [r['resource_id'] for r in sched.reaped] == ['due']
+
+def test_expiry_is_reread_before_reaping():
+    stub = StubJanitor({'extended': EXPIRED, 'untagged': EXPIRED})
+    sched = scheduler.ExpiryScheduler({'stub': stub})
+    sched.reconcile()
+    # Changed by their owners after the reconcile
+    stub.tags['extended'] = in_seconds(3600)
+    stub.tags['untagged'] = None
+
+    sched.reap_due()
+
+    assert stub.reaped == []
+    assert [(entry[3], entry[4]) for entry in sched.heap] == [('extended', stub.tags['extended'])]
+
+def test_failed_reaps_are_retried_later():
+    stub = StubJanitor({'flaky': EXPIRED})
+    stub.fail.add('flaky')
+    sched = scheduler.ExpiryScheduler({'stub': stub}, retry_seconds=60)
+    sched.reconcile()
+
+    sched.reap_due()
+
+    due, *_ = sched.heap[0]
+    assert stub.reaped == [] and due > time.time() + 50
+
+def test_slow_azure_deletions_do_not_block_the_scheduler():
+    client = FakeResourceClient({f"rg-{i}": {janitor.EXPIRY_TAG: EXPIRED} for i in range(2)}, delete_seconds=1.0)
+    azure = janitor.AzureJanitor({'poll_interval_seconds': 0.2}, resource_client=client)
+    sched = scheduler.ExpiryScheduler({'azure': azure})
+    sched.reconcile()
+
+    started = time.monotonic()
+    sched.reap_due()
+
+    assert time.monotonic() - started < 0.5
+    assert azure.deleting() == 2
+    assert sched.next_wakeup() <= time.time() + 0.2  # Wakes up for the next status check
+
+    sched.drain()  # Shutdown waits for them
+    assert azure.deleting() == 0
+    assert not client.groups
@@ -0,0 +1,72 @@
+from src.guards import static_drift
+
+README = """# Service
+
+Set `SERVICE_URL` and pass `--verbose` for more output.
+`GET /api/jobs/{job_id}` returns a job. `connect(host)` opens a session.
+"""
+
+DIFF = """diff --git a/app.py b/app.py
+--- a/app.py
++++ b/app.py
+@@ -1,6 +1,9 @@
++url = os.environ.get('SERVICE_URL')
++token = os.getenv('SERVICE_TOKEN')
++parser.add_argument('-v', '--verbose', action='store_true')
++parser.add_argument('--dry-run', action='store_true')
++@app.get("/api/jobs/<id>")
++@app.post("/api/jobs/{job_id}/cancel")
+-def connect(host):
++def connect(host, timeout=30):
++def _private_helper(x):
++def export_report(path):
+diff --git a/README.md b/README.md
+--- a/README.md
++++ b/README.md
+@@ -1 +1 @@
++os.getenv('DOCS_ONLY_VAR')
+"""
+
+def undocumented(diff, readme=README):
+    report = static_drift.analyze_diff(diff, static_drift.ReadmeTokens(readme))
+    return {(f['kind'], f['name']) for f in report['undocumented']}, report
+
+def test_interface_changes_missing_from_the_readme_are_reported():
+    missing, report = undocumented(DIFF)
+
+    assert missing == {
+        ('env_var', 'SERVICE_TOKEN'),
+        ('cli_flag', '--dry-run'),
+        ('route', '/api/jobs/{job_id}/cancel'),
+        ('signature', 'connect'),  # Documented in the README, so its change matters
+    }
+    names = {f['name'] for f in report['findings']}
+    assert 'export_report' in names and '_private_helper' not in names and 'DOCS_ONLY_VAR' not in names
+
+def test_route_parameters_match_whatever_their_syntax():
+    assert static_drift.normalize_route('/api/jobs/<id>') == static_drift.normalize_route('/api/jobs/:id/') == '/api/jobs/{}'
+
+def test_verdicts():
+    missing_diff = "diff --git a/a.py b/a.py\n+x = os.getenv('NEW_FLAG')\n"
+    internal_diff = "diff --git a/a.py b/a.py\n+total += 1\n"
+
+    fail = static_drift.verdict(undocumented(missing_diff)[1])
+    passed = static_drift.verdict(undocumented(internal_diff)[1])
+
+    assert fail['status'] == 'FAIL' and 'environment variable `NEW_FLAG`' in fail['reason']
+    assert passed['status'] == 'PASS'
+
+def test_internal_changes_skip_the_model(monkeypatch):
+    from src.guards import ai_sync
+
+    class NoLLM:
+        models = None
+
+        def Client(self, api_key=None):
+            return self
+    monkeypatch.setattr(ai_sync, 'genai', NoLLM())
+    analyzer = ai_sync.DocAnalyzer({}, README, 'k')
+
+    verdict = analyzer.judge("diff --git a/a.py b/a.py\n@@ -1 +1 @@\n+total += 1\n")
+
+    assert verdict['status'] == 'PASS' and verdict['static']
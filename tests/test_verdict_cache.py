@@ -0,0 +1,75 @@
+import os
+import threading
+
+from src.guards import verdict_cache
+
+DIFF = """diff --git a/app.py b/app.py
+index 3b18e51..a9c2f7d 100644
+--- a/app.py
++++ b/app.py
+@@ -10,6 +10,7 @@ def main():
++    retry = True
+"""
+
+def key(n):
+    return verdict_cache.verdict_key(f"diff {n}", "readme", "model", "v1")
+
+def entry_size(cache, k):
+    return os.path.getsize(cache._file(k))
+
+def test_rebased_diffs_share_a_key():
+    rebased = DIFF.replace('index 3b18e51..a9c2f7d', 'index 77aa01c..0c1d2e3').replace('@@ -10,6 +10,7 @@', '@@ -42,6 +42,7 @@')
+
+    assert verdict_cache.normalize_diff(rebased) == verdict_cache.normalize_diff(DIFF.replace('\n', '\r\n'))
+    assert verdict_cache.verdict_key('ab', 'c', 'm', 'v1') != verdict_cache.verdict_key('a', 'bc', 'm', 'v1')
+
+def test_round_trip_and_ttl(tmp_path):
+    cache = verdict_cache.VerdictCache(str(tmp_path), ttl_seconds=60)
+    cache.put(key(1), {'status': 'PASS'})
+
+    assert cache.get(key(1)) == {'status': 'PASS'}
+    assert cache.get(key(2)) is None
+    cache.ttl_seconds = -1
+    assert cache.get(key(1)) is None and not os.path.exists(cache._file(key(1)))
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = verdict_cache.VerdictCache(str(tmp_path), max_bytes=10_000)
+    for n in range(3):
+        cache.put(key(n), {'status': 'PASS', 'n': n})
+        os.utime(cache._file(key(n)), (1000 + n, 1000 + n))
+    cache.get(key(0))  # Refreshes entry 0, so entry 1 is now the oldest
+    cache.max_bytes = 3 * entry_size(cache, key(0))
+
+    cache.put(key(3), {'status': 'PASS', 'n': 3})
+
+    kept = [n for n in range(4) if cache.get(key(n))]
+    assert 1 not in kept and 0 in kept and 3 in kept
+    assert cache.total <= cache.max_bytes * verdict_cache.LOW_WATER
+
+def test_puts_under_budget_do_not_walk_the_cache(tmp_path, monkeypatch):
+    walks = []
+    real_walk = os.walk
+    monkeypatch.setattr(verdict_cache.os, 'walk', lambda path: walks.append(path) or real_walk(path))
+    cache = verdict_cache.VerdictCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+
+    for n in range(50):
+        cache.put(key(n), {'status': 'PASS'})
+    cache.put(key(0), {'status': 'FAIL'})  # Overwrites count only their difference
+
+    assert len(walks) == 1  # The seed on the first put
+    assert cache.total == cache._scan()[1]
+
+def test_concurrent_puts_keep_the_size_in_step_with_the_disk(tmp_path):
+    cache = verdict_cache.VerdictCache(str(tmp_path), max_bytes=20_000)
+
+    def writer(worker):
+        for n in range(200):
+            cache.put(key(f"{worker}-{n}"), {'status': 'PASS', 'reason': 'x' * 100})
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.total == cache._scan()[1] <= cache.max_bytes
+    assert not [name for _, _, names in os.walk(str(tmp_path)) for name in names if name.endswith('.tmp')]
@@ -0,0 +1,69 @@
+import hmac
+import time
+import hashlib
+import threading
+
+from src import github_client, webhooks
+
+def event(delivery, action='synchronize', pr=1, sha=None):
+    return webhooks.WebhookEvent(delivery, action, 'org/app', pr, sha or f"sha-{delivery}")
+
+def test_signatures():
+    body = b'{"action": "opened"}'
+    signature = 'sha256=' + hmac.new(b'secret', body, hashlib.sha256).hexdigest()
+
+    assert webhooks.verify_signature('secret', body, signature)
+    assert not webhooks.verify_signature('secret', body + b' ', signature)
+    assert not webhooks.verify_signature('', body, signature)
+    assert not webhooks.verify_signature('secret', body, signature.replace('sha256=', 'sha1='))
+
+def test_pushes_to_a_queued_pr_are_coalesced_to_the_newest_head():
+    workers = webhooks.WebhookWorkers(handler=None)  # Not started: events stay queued
+
+    outcomes = [workers.submit(event('d1', 'opened')), workers.submit(event('d2')), workers.submit(event('d3')),
+                workers.submit(event('d4', pr=2)), workers.submit(event('d3'))]
+
+    assert outcomes == ['queued', 'queued', 'coalesced', 'queued', 'duplicate']
+    queued = workers.snapshot()['queued']
+    assert [(e['action'], e['pr_number'], e['head_sha']) for e in queued] == [
+        ('opened', 1, 'sha-d1'), ('synchronize', 1, 'sha-d3'), ('synchronize', 2, 'sha-d4')]
+    assert queued[1]['coalesced'] == ['d2']
+
+def test_events_for_one_pr_run_in_order_while_other_prs_run_alongside():
+    lock = threading.Lock()
+    running, overlaps, order = set(), [], []
+
+    def handler(e):
+        with lock:
+            overlaps.append(set(running))
+            running.add(e.pr_number)
+            order.append(e.delivery_id)
+        time.sleep(0.1)
+        with lock:
+            running.discard(e.pr_number)
+        return {}
+
+    workers = webhooks.WebhookWorkers(handler, workers=3)
+    for delivery, action, pr in (('a1', 'opened', 1), ('a2', 'synchronize', 1), ('b1', 'opened', 2)):
+        workers.submit(event(delivery, action, pr))
+    workers.start()
+    for _ in range(100):
+        if workers.snapshot()['stats']['processed'] == 3:
+            break
+        time.sleep(0.02)
+
+    assert workers.snapshot()['stats']['processed'] == 3
+    assert order.index('a1') < order.index('a2')
+    assert all(1 not in seen for seen, delivery in zip(overlaps, order) if delivery.startswith('a'))
+    assert any(seen for seen in overlaps)  # PR 2 overlapped with PR 1
+
+def test_commit_status_reflects_blocking_stages(github):
+    results = {'ai_doc_check': {'status': 'failed', 'severity': 'block'},
+               'cross_repo_safety': {'status': 'passed', 'severity': 'warning'}}
+
+    state, description = webhooks.status_for(results, blocked=True)
+    posted = webhooks.post_commit_status(github_client.get_client('t'), event('d1', sha='abc1234'), state, description)
+
+    assert posted and (state, description) == ('failure', 'Blocked by ai_doc_check')
+    assert github.statuses == [('org/app', 'abc1234', {'state': 'failure', 'context': 'DriftGuard', 'description': description})]
+    assert webhooks.status_for({'x': {'status': 'passed', 'severity': 'block'}}, blocked=False) == ('success', '1 passed')